@@ -5,55 +5,84 @@ import os
 import sqlite3
 import json
 from datetime import datetime, timedelta, timezone
-import requests
 import configparser
-from collections import defaultdict
 import re
-from typing import List, Dict, Any
+import itertools
+import tempfile
+from typing import List, Dict, Any, Iterable, Iterator, Tuple, Union
 import logging
-import urllib3
-import certifi
-import base64
-import socks
-import socket
-import praw
-from textblob import TextBlob
-from sklearn.feature_extraction.text import CountVectorizer
-from sklearn.decomposition import LatentDirichletAllocation
-import numpy as np
-
-# Configure SOCKS proxy for Tor
-socks.set_default_proxy(socks.SOCKS5, "localhost", 9150)
-socket.socket = socks.socksocket
-
-# Set up logging
-logging.basicConfig(
-    filename='data/crawler.log',
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+import signal
+import threading
+import analysis_backends
+import text_analysis
+import noun_chunk_topics
+import scoring
+import topic_listing
+import topic_keys
+import sql_trace
+from analysis_pool import AnalysisExecutor
+from analysis_cache import AnalysisCache, normalize_text
+from comment_mining import CommentBudget, praw_comments, select_comments
+from topic_accumulator import TopicAccumulator
+from dtm_store import DTMStore
+from text_store import TextStore, phrases_of
+from crawl_scheduler import CrawlScheduler
+from crawl_leases import LeaseCoordinator
+from rate_limit import COMMENTS, call_with_retries
+from reddit_fetch import AsyncRedditFetcher, REDDIT_OAUTH_URL, engagement_from_record
+
+DB_PATH = 'data/ideaengine.db'
+
+# Merged topics clustered per analysis pool call while streaming them to the database
+CLUSTER_BATCH_SIZE = 500
+# Seconds a worker waits before claiming again when another one holds the database lock
+CLAIM_RETRY_SECONDS = 5
+
+# Relevant subreddits for SaaS opportunities
+SUBREDDITS = [
+    'startups', 'SaaS', 'Entrepreneur', 'smallbusiness', 'programming',
+    'webdev', 'technology', 'software', 'business', 'productivity'
+]
 
 class DataCrawler:
     def __init__(self):
         self.setup_logging()
         self.ensure_data_directory()
+        # SQL_TRACE=1 times every statement and logs the slow ones
+        self.query_log = sql_trace.QueryLog.from_env()
         self.initialize_database()
         self.load_reddit_config()
         
         # Frustration keywords for sentiment analysis
-        self.frustration_keywords = [
-            'hate', 'annoying', 'struggling', 'difficult', 'frustrated', 
-            'tired of', 'sick of', 'pain point', 'problem', 'issue',
-            'challenge', 'headache', 'nightmare', 'waste', 'inefficient'
-        ]
-        
-        # Initialize topic modeling
-        self.vectorizer = CountVectorizer(
-            max_df=0.95, min_df=2, stop_words='english'
-        )
-        self.lda = LatentDirichletAllocation(
-            n_components=5, random_state=42
-        )
+        self.frustration_keywords = text_analysis.FRUSTRATION_KEYWORDS
+
+        # CPU-bound analysis runs in a process pool sized by [ANALYSIS] workers
+        config = configparser.ConfigParser()
+        config.read('config.ini')
+        self.analysis = AnalysisExecutor.from_config(config)
+        # Results for texts already analyzed by an earlier crawl or by the API
+        self.analysis_cache = AnalysisCache.from_config(config)
+        # How much of each downloaded comment tree is mined for phrases
+        self.comment_budget = CommentBudget.from_config(config)
+
+        # Cap on topics aggregated in memory per run; evicted topics spill to disk if enabled
+        self.max_topics = config.getint('ANALYSIS', 'max_topics', fallback=0) or None
+        spill = config.getboolean('ANALYSIS', 'spill', fallback=True)
+        self.topic_spill_dir = 'data' if spill else None
+
+        # Topic extraction: 'regex' or batched spaCy noun chunks ('spacy')
+        self.topic_backend = config.get('ANALYSIS', 'topic_backend', fallback='regex')
+        self.spacy_processes = config.getint('ANALYSIS', 'spacy_processes', fallback=1)
+        self.spacy_batch_size = config.getint('ANALYSIS', 'spacy_batch_size',
+                                              fallback=noun_chunk_topics.DEFAULT_BATCH_SIZE)
+
+        # Crawled submissions are vectorized once into the persistent corpus matrix
+        dtm_path = config.get('ANALYSIS', 'dtm_store', fallback='data/dtm')
+        self.dtm_store = DTMStore(dtm_path) if dtm_path else None
+
+        # Source texts and phrase postings for drilling down from extracted phrases
+        text_path = config.get('ANALYSIS', 'text_store', fallback='data/texts')
+        self.text_store = TextStore(text_path) if text_path else None
 
     def setup_logging(self):
         """Set up logging configuration"""
@@ -74,7 +103,8 @@ class DataCrawler:
     def initialize_database(self):
         """Initialize the SQLite database with required tables"""
         self.ensure_data_directory()
-        self.db = sqlite3.connect('data/ideaengine.db')
+        # Workers on other processes or hosts may hold the write lock briefly
+        self.db = sql_trace.connect(DB_PATH, self.query_log, timeout=30)
         cursor = self.db.cursor()
         
         # Create tables if they don't exist
@@ -98,6 +128,10 @@ class DataCrawler:
             updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
         ''')
+        topic_listing.ensure_indexes(self.db)
+        
+        # Variants of a topic name resolve to one row through the alias table
+        topic_keys.ensure_aliases(self.db)
         
         self.db.commit()
         logging.info("Database initialized")
@@ -108,15 +142,20 @@ class DataCrawler:
         config.read('config.ini')
         
         try:
+            import praw
+            from crawler_transport import CrawlerTransport
             auth = {
                 'client_id': config['REDDIT']['client_id'],
                 'client_secret': config['REDDIT']['client_secret'],
                 'user_agent': config['REDDIT']['user_agent']
             }
+            # Pooled sessions with the proxy scoped to Reddit hosts only
+            self.transport = CrawlerTransport.from_config(user_agent=auth['user_agent'])
             self.reddit = praw.Reddit(
                 client_id=auth['client_id'],
                 client_secret=auth['client_secret'],
-                user_agent=auth['user_agent']
+                user_agent=auth['user_agent'],
+                requestor_kwargs={'session': self.transport.session()}
             )
             logging.info("Reddit configuration loaded successfully")
         except Exception as e:
@@ -125,64 +164,19 @@ class DataCrawler:
 
     def extract_potential_topics(self, text: str) -> List[str]:
         """Extract potential SaaS topics from text using regex patterns"""
-        # Common SaaS-related keywords
-        saas_keywords = r'(app|platform|software|tool|solution|system|service|automation|management|analytics)'
-        
-        # Pattern to match potential SaaS topics
-        pattern = r'(\b\w+(?:\s+\w+)*)\s+(' + saas_keywords + r')\b'
-        
-        matches = re.findall(pattern, text.lower())
-        # Extract the topic name from the match tuples and combine with the keyword
-        topics = [f"{match[0]} {match[1]}" for match in matches]
-        return list(set(topics))
+        return text_analysis.extract_potential_topics(text)
 
     def extract_pain_points(self, text: str) -> List[Dict[str, Any]]:
         """Extract pain points from text"""
-        pain_patterns = [
-            r'(?:struggling|frustrated|difficult|hard|impossible|annoying|hate)\s+(?:with|to|when|that|how)\s+([^.!?]+)',
-            r'(?:wish|need|want)\s+(?:there\s+was|to\s+find|to\s+have)\s+([^.!?]+)',
-            r'(?:problem|issue|challenge)\s+(?:with|is|when)\s+([^.!?]+)'
-        ]
-        
-        results = []
-        for pattern in pain_patterns:
-            matches = re.findall(pattern, text.lower())
-            for match in matches:
-                if match.strip() not in [p['text'] for p in results]:
-                    results.append({'text': match.strip(), 'count': 1})
-        return results
+        return text_analysis.extract_pain_points(text)
 
     def extract_solution_requests(self, text: str) -> List[Dict[str, Any]]:
         """Extract solution requests from text"""
-        solution_patterns = [
-            r'(?:looking\s+for|need|want)\s+(?:a|an|some)\s+(?:way|tool|solution|app)\s+to\s+([^.!?]+)',
-            r'(?:how\s+can\s+I|what\'s\s+the\s+best\s+way\s+to)\s+([^.!?]+)',
-            r'(?:recommend|suggest)\s+(?:a|an|any)\s+(?:tool|app|solution|software)\s+for\s+([^.!?]+)'
-        ]
-        
-        results = []
-        for pattern in solution_patterns:
-            matches = re.findall(pattern, text.lower())
-            for match in matches:
-                if match.strip() not in [s['text'] for s in results]:
-                    results.append({'text': match.strip(), 'count': 1})
-        return results
+        return text_analysis.extract_solution_requests(text)
 
     def extract_app_ideas(self, text: str) -> List[Dict[str, Any]]:
         """Extract app ideas from text"""
-        idea_patterns = [
-            r'(?:should\s+build|could\s+create|idea\s+for)\s+(?:a|an|some)\s+(?:app|tool|platform|solution)\s+(?:that|to|for)\s+([^.!?]+)',
-            r'(?:what\s+if|imagine)\s+(?:there\s+was|we\s+had)\s+(?:a|an|some)\s+(?:app|tool|platform)\s+that\s+([^.!?]+)',
-            r'(?:potential|opportunity)\s+for\s+(?:a|an|some)\s+(?:app|tool|platform)\s+to\s+([^.!?]+)'
-        ]
-        
-        results = []
-        for pattern in idea_patterns:
-            matches = re.findall(pattern, text.lower())
-            for match in matches:
-                if match.strip() not in [i['text'] for i in results]:
-                    results.append({'text': match.strip(), 'count': 1})
-        return results
+        return text_analysis.extract_app_ideas(text)
 
     def categorize_topic(self, topic_name: str) -> str:
         """Categorize a topic based on keywords"""
@@ -204,160 +198,428 @@ class DataCrawler:
                 return category
         return 'Other'
 
-    def process_subreddit_data(self, subreddit_name: str):
-        """Process data from a subreddit with enhanced analysis."""
+    def submission_to_record(self, submission) -> Dict[str, Any]:
+        """Convert a PRAW submission into the plain record used by the analysis code"""
+        return {
+            'id': submission.id,
+            'subreddit': str(submission.subreddit),
+            'title': submission.title,
+            'selftext': submission.selftext,
+            'score': submission.score,
+            'num_comments': submission.num_comments,
+            'created_utc': submission.created_utc,
+            # Collected first: it picks the order the comment tree is fetched in
+            'comments': self.collect_comments(submission),
+            'engagement': self.collect_engagement_metrics(submission)
+        }
+
+    def analyze_records(self, records: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Aggregate per-topic analysis over plain submission records."""
+        with self.aggregate_records(records) as accumulator:
+            return dict(self.iter_topic_data(accumulator))
+
+    def aggregate_records(self, records: List[Dict[str, Any]]) -> TopicAccumulator:
+        """Analyze the records and add them to a TopicAccumulator, which the caller closes"""
+        # Skip if too old
+        records = [
+            record for record in records
+            if (datetime.utcnow() - datetime.fromtimestamp(record['created_utc'])) <= timedelta(days=30)
+        ]
+
+        # Analyze title and body of every submission in one batched pass
+        texts = [f"{record['title']} {record['selftext']}" for record in records]
+        analyses = self.analyze_texts(texts)
+        self.store_vectors(records, texts, analyses)
+        self.store_texts(records, texts, analyses)
+        self.analyze_comments(records, analyses)
+
+        accumulator = TopicAccumulator(self.max_topics, self.topic_spill_dir)
         try:
-            subreddit = self.reddit.subreddit(subreddit_name)
-            topics_data = defaultdict(lambda: {
-                'mention_count': 0,
-                'pain_points': [],
-                'solution_requests': [],
-                'app_ideas': [],
-                'trend_data': [],
-                'sentiment_scores': {"frustration": 0, "urgency": 0, "impact": 0},
-                'engagement_metrics': {"upvotes": 0, "comments": 0, "unique_users": 0}
-            })
-
-            for submission in subreddit.hot(limit=100):
-                # Skip if too old
-                if (datetime.utcnow() - datetime.fromtimestamp(submission.created_utc)) > timedelta(days=30):
+            for record, analysis in zip(records, analyses):
+                if not analysis['topics']:
                     continue
+                accumulator.add(
+                    analysis['topics'],
+                    analysis['sentiment'],
+                    record.get('engagement') or engagement_from_record(record),
+                    analysis['pain_points'],
+                    analysis['solution_requests'],
+                    analysis['app_ideas']
+                )
+        except Exception:
+            accumulator.close()
+            raise
+        return accumulator
 
-                # Analyze title and body
-                text = f"{submission.title} {submission.selftext}"
-                extracted_topics = self.extract_potential_topics(text)
-                
-                for topic in extracted_topics:
-                    topic_data = topics_data[topic]
-                    
-                    # Update mention count
-                    topic_data['mention_count'] += 1
-                    
-                    # Analyze sentiment
-                    sentiment = self.analyze_sentiment(text)
-                    for key in sentiment:
-                        topic_data['sentiment_scores'][key] = max(
-                            topic_data['sentiment_scores'][key],
-                            sentiment[key]
-                        )
-                    
-                    # Collect engagement metrics
-                    engagement = self.collect_engagement_metrics(submission)
-                    for key in engagement:
-                        topic_data['engagement_metrics'][key] += engagement[key]
-                    
-                    # Extract pain points and other data
-                    pain_points = self.extract_pain_points(text)
-                    if pain_points:
-                        topic_data['pain_points'].extend(pain_points)
-                    
-                    solutions = self.extract_solution_requests(text)
-                    if solutions:
-                        topic_data['solution_requests'].extend(solutions)
-                    
-                    app_ideas = self.extract_app_ideas(text)
-                    if app_ideas:
-                        topic_data['app_ideas'].extend(app_ideas)
+    def iter_topic_data(self, accumulator: TopicAccumulator) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yield (topic, data) merged across name variants, with topic clusters.
 
+        Topics stream out of the accumulator in canonical key order, so only
+        one batch of merged topics is held at a time, however many spilled.
+        """
+        merged = topic_keys.merge_sorted_variants(accumulator.items(key=topic_keys.canonical_key))
+        while True:
+            batch = list(itertools.islice(merged, CLUSTER_BATCH_SIZE))
+            if not batch:
+                return
             # Process topic clusters for each topic
-            for topic_name, data in topics_data.items():
-                all_texts = [
-                    point['text'] for point in 
+            cluster_inputs = [
+                [
+                    point['text'] for point in
                     data['pain_points'] + data['solution_requests'] + data['app_ideas']
                 ]
-                data['topic_clusters'] = self.extract_topic_clusters(all_texts)
+                for _, data in batch
+            ]
+            clusters = self.analysis.map(text_analysis.extract_topic_clusters, cluster_inputs)
+            for (_, data), topic_clusters in zip(batch, clusters):
+                data['topic_clusters'] = topic_clusters
+            yield from batch
 
-            # Update database
-            self.update_database(topics_data)
-            
+    def analyze_texts(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """analyze_text over every text, reusing cached results for texts seen before"""
+        kind = f"analyze_text:{self.topic_backend}"
+        analyses = self.analysis_cache.get_many(kind, texts)
+        missing = [i for i, analysis in enumerate(analyses) if analysis is None]
+        if not missing:
+            return analyses
+
+        # Results are cached under the normalized text, so that is what gets analyzed
+        missing_texts = [normalize_text(texts[i]) for i in missing]
+        topics = self.extract_batch_topics(missing_texts)
+        if topics is None:
+            computed = self.analysis.map(text_analysis.analyze_text, missing_texts)
+        else:
+            computed = self.analysis.map(text_analysis.analyze_text_with_topics, list(zip(missing_texts, topics)))
+        for i, analysis in zip(missing, computed):
+            analyses[i] = analysis
+        # The spaCy backend may have fallen back to regex topics while extracting
+        self.analysis_cache.put_many(f"analyze_text:{self.topic_backend}", missing_texts, computed)
+        logging.info(f"Analyzed {len(missing)} texts, {len(texts) - len(missing)} from the analysis cache")
+        return analyses
+
+    def analyze_comments(self, records: List[Dict[str, Any]], analyses: List[Dict[str, Any]]):
+        """Add the phrases of each topical post's best comments to the post's analysis"""
+        selected = [
+            (record, analysis, comment)
+            for record, analysis in zip(records, analyses) if analysis['topics']
+            for comment in select_comments(record.get('comments') or [], self.comment_budget)
+        ]
+        if not selected:
+            return
+
+        texts = [comment['body'] for _, _, comment in selected]
+        found = self.analysis_cache.map('analyze_comment', text_analysis.analyze_comment, texts, self.analysis.map)
+        for (_, analysis, _), phrases in zip(selected, found):
+            for kind, points in phrases.items():
+                analysis[kind] = analysis[kind] + points
+        self.store_texts(
+            [
+                {
+                    'id': f"t1_{comment['id']}",
+                    'subreddit': record.get('subreddit'),
+                    'created_utc': record.get('created_utc')
+                }
+                for record, _, comment in selected
+            ],
+            texts, found
+        )
+        logging.info(f"Mined {len(selected)} comments for phrases")
+
+    def extract_batch_topics(self, texts: List[str]):
+        """Topics of every text from the spaCy backend, or None to use the per-text regex"""
+        if self.topic_backend != 'spacy' or not texts:
+            return None
+        try:
+            return noun_chunk_topics.extract_topics(texts, self.spacy_processes, self.spacy_batch_size)
+        except (ImportError, OSError) as e:
+            # spaCy or its en_core_web_sm model is not installed
+            logging.warning(f"spaCy topic backend unavailable, falling back to regex topics: {e}")
+            self.topic_backend = 'regex'
+            return None
+
+    def store_vectors(self, records: List[Dict[str, Any]], texts: List[str], analyses: List[Dict[str, Any]]):
+        """Append the crawled submissions to the corpus matrix store"""
+        if self.dtm_store is None:
+            return
+        try:
+            self.dtm_store.append(
+                {
+                    'id': record['id'],
+                    'text': text,
+                    'subreddit': record.get('subreddit'),
+                    'created_utc': record.get('created_utc'),
+                    'topics': analysis['topics']
+                }
+                for record, text, analysis in zip(records, texts, analyses)
+            )
+        except Exception as e:
+            logging.error(f"Error appending to the corpus matrix: {e}")
+
+    def store_texts(self, records: List[Dict[str, Any]], texts: List[str], analyses: List[Dict[str, Any]]):
+        """Keep the submission texts and which phrases were extracted from each"""
+        if self.text_store is None:
+            return
+        try:
+            self.text_store.append(
+                {
+                    'id': record['id'],
+                    'text': text,
+                    'subreddit': record.get('subreddit'),
+                    'created_utc': record.get('created_utc'),
+                    'phrases': phrases_of(analysis)
+                }
+                for record, text, analysis in zip(records, texts, analyses)
+            )
+        except Exception as e:
+            logging.error(f"Error appending to the text store: {e}")
+
+    def process_records(self, subreddit_name: str, records: List[Dict[str, Any]]):
+        """Analyze already-fetched submission records and store the results."""
+        try:
+            with self.aggregate_records(records) as accumulator:
+                self.update_database(self.iter_topic_data(accumulator))
+        except Exception as e:
+            logging.error(f"Error processing subreddit {subreddit_name}: {str(e)}")
+
+    def fetch_subreddit_records(self, subreddit_name: str) -> List[Dict[str, Any]]:
+        """Fetch the hot listing of a subreddit through PRAW as plain records"""
+        subreddit = self.reddit.subreddit(subreddit_name)
+        return [
+            self.submission_to_record(submission)
+            for submission in subreddit.hot(limit=100)
+        ]
+
+    def process_subreddit_data(self, subreddit_name: str):
+        """Process data from a subreddit with enhanced analysis."""
+        try:
+            # Throttled or failed listings are retried with backoff rather than dropped
+            records = call_with_retries(self.fetch_subreddit_records, subreddit_name)
         except Exception as e:
             logging.error(f"Error processing subreddit {subreddit_name}: {str(e)}")
+            return
+
+        self.process_records(subreddit_name, records)
 
-    def collect_data(self, time_period: str):
+    def create_fetcher(self, concurrency: int = None) -> AsyncRedditFetcher:
+        """Create an asynchronous fetcher from the [REDDIT] and [CRAWLER] config"""
+        config = configparser.ConfigParser()
+        config.read('config.ini')
+        crawler_config = config['CRAWLER'] if config.has_section('CRAWLER') else {}
+
+        return AsyncRedditFetcher(
+            user_agent=config['REDDIT']['user_agent'],
+            client_id=config['REDDIT']['client_id'],
+            client_secret=config['REDDIT']['client_secret'],
+            base_url=crawler_config.get('base_url', REDDIT_OAUTH_URL),
+            concurrency=concurrency or int(crawler_config.get('concurrency', 8)),
+            transport=self.transport
+        )
+
+    def collect_data(self, time_period: str, async_fetch: bool = False, concurrency: int = None):
         """Collect real data from Reddit"""
         logging.info(f"Starting data collection for time period: {time_period}")
         
-        # Define relevant subreddits for SaaS opportunities
-        subreddits = [
-            'startups', 'SaaS', 'Entrepreneur', 'smallbusiness', 'programming',
-            'webdev', 'technology', 'software', 'business', 'productivity'
-        ]
-        
-        for subreddit_name in subreddits:
-            try:
-                self.process_subreddit_data(subreddit_name)
-            except Exception as e:
-                logging.error(f"Error processing subreddit {subreddit_name}: {e}")
-                continue
+        subreddits = SUBREDDITS
+
+        if async_fetch:
+            # Listings and comment trees are fetched concurrently up front
+            fetched = self.create_fetcher(concurrency).fetch_all(subreddits)
+            for subreddit_name, records in fetched.items():
+                self.process_records(subreddit_name, records)
+        else:
+            for subreddit_name in subreddits:
+                try:
+                    self.process_subreddit_data(subreddit_name)
+                except Exception as e:
+                    logging.error(f"Error processing subreddit {subreddit_name}: {e}")
+                    continue
         
+        self.analysis.shutdown()
+        self.rescore_opportunities()
+        logging.info(f"Transport stats: {self.transport.stats()}")
+        if self.transport.limiter:
+            logging.info(f"Rate limit stats: {self.transport.limiter.stats()}")
+        if self.query_log:
+            logging.info(f"Slowest SQL statements: {self.query_log.stats(top=5)['statements']}")
         logging.info("Data collection completed successfully")
 
+    def create_fetch(self, async_fetch: bool = False, concurrency: int = None):
+        """Return a function fetching one subreddit's records through the chosen path"""
+        fetcher = self.create_fetcher(concurrency) if async_fetch else None
+
+        def fetch(subreddit_name):
+            if fetcher is None:
+                return call_with_retries(self.fetch_subreddit_records, subreddit_name)
+            records = fetcher.fetch_all([subreddit_name]).get(subreddit_name)
+            if records is None:
+                raise RuntimeError(f"Fetching r/{subreddit_name} failed")
+            return records
+
+        return fetch
+
+    def run_daemon(self, async_fetch: bool = False, concurrency: int = None):
+        """Keep crawling every subreddit on its own adaptive interval until signalled"""
+        config = configparser.ConfigParser()
+        config.read('config.ini')
+        rescore_interval = config.getint('SCHEDULER', 'rescore_interval', fallback=900)
+
+        # Models stay loaded for the life of the process
+        analysis_backends.warm_up(self.analysis.backends)
+        fetch = self.create_fetch(async_fetch, concurrency)
+
+        def crawl(subreddit_name):
+            records = fetch(subreddit_name)
+            self.process_records(subreddit_name, records)
+            return records
+
+        scheduler = CrawlScheduler.from_config(self.db, crawl, SUBREDDITS)
+        scheduler.scheduler.every(rescore_interval).seconds.do(self.rescore_opportunities)
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: scheduler.stop())
+
+        try:
+            scheduler.run_forever()
+        finally:
+            self.analysis.shutdown()
+            self.rescore_opportunities()
+
+    def run_worker(self, subreddits: List[str] = None, once: bool = False,
+                   async_fetch: bool = False, concurrency: int = None):
+        """Claim and crawl subreddit shards from the shared database until signalled.
+
+        Any number of workers, on any host sharing the database file, can run
+        this at once; leases make sure each due shard is crawled by one of them.
+        With ``once`` the worker exits when no shard is due.
+        """
+        config = configparser.ConfigParser()
+        config.read('config.ini')
+        batch_size = config.getint('SHARDING', 'batch_size', fallback=1)
+        poll_interval = config.getfloat('SHARDING', 'poll_interval', fallback=30)
+
+        coordinator = LeaseCoordinator.from_config(self.db)
+        added = coordinator.register(subreddits or SUBREDDITS)
+        logging.info(f"Worker {coordinator.owner} started ({added} new shards registered)")
+
+        analysis_backends.warm_up(self.analysis.backends)
+        fetch = self.create_fetch(async_fetch, concurrency)
+        stopped = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: stopped.set())
+
+        try:
+            while not stopped.is_set():
+                try:
+                    leases = coordinator.claim(batch_size)
+                except sqlite3.OperationalError as e:
+                    # Usually "database is locked": another worker held the write lock past the timeout
+                    logging.warning(f"Could not claim shards, retrying: {e}")
+                    stopped.wait(min(poll_interval, CLAIM_RETRY_SECONDS))
+                    continue
+                if not leases:
+                    if once:
+                        break
+                    due_in = coordinator.next_due_in()
+                    stopped.wait(poll_interval if due_in is None else min(poll_interval, max(1, due_in)))
+                    continue
+                for lease in leases:
+                    self.crawl_shard(coordinator, lease, fetch)
+        finally:
+            self.analysis.shutdown()
+            self.rescore_opportunities()
+            logging.info(f"Worker {coordinator.owner} stopped: {coordinator.status()}")
+
+    def crawl_shard(self, coordinator: LeaseCoordinator, lease, fetch) -> bool:
+        """Crawl one leased subreddit and commit its results only if the lease is still held"""
+        try:
+            with coordinator.heartbeat(lease, DB_PATH) as heartbeat:
+                records = fetch(lease.subreddit)
+                with self.aggregate_records(records) as accumulator:
+                    spool = self.spool_topic_data(accumulator)
+        except Exception as e:
+            logging.error(f"Error crawling shard r/{lease.subreddit}: {e}")
+            self.release_shard(coordinator, lease)
+            return False
+        with spool:
+            if heartbeat.lost.is_set():
+                return False
+
+            # Results and completion are committed together, fenced by the lease generation;
+            # the write lock is only held while the finished rows are written
+            try:
+                self.db.execute("BEGIN IMMEDIATE")
+                if not coordinator.owns(lease):
+                    self.db.rollback()
+                    logging.warning(f"Discarding results for r/{lease.subreddit}: lease was taken over")
+                    return False
+                if not self.update_database((tuple(json.loads(line)) for line in spool), commit=False):
+                    self.release_shard(coordinator, lease)
+                    return False
+                coordinator.complete(lease, commit=False)
+                self.db.commit()
+                return True
+            except sqlite3.OperationalError as e:
+                logging.error(f"Error writing results for r/{lease.subreddit}: {e}")
+                if self.db.in_transaction:
+                    self.db.rollback()
+                self.release_shard(coordinator, lease)
+                return False
+
+    def release_shard(self, coordinator: LeaseCoordinator, lease):
+        """Give a lease back for a retry; if the database stays locked it expires on its own"""
+        try:
+            coordinator.release(lease)
+        except sqlite3.OperationalError as e:
+            logging.warning(f"Could not release r/{lease.subreddit}, its lease will expire: {e}")
+
+    def spool_topic_data(self, accumulator: TopicAccumulator):
+        """Merge and cluster every topic into a temporary file of JSON lines, rewound for reading"""
+        spool = tempfile.TemporaryFile('w+', encoding='utf-8', dir=self.topic_spill_dir)
+        try:
+            for name, data in self.iter_topic_data(accumulator):
+                spool.write(json.dumps([name, data]) + '\n')
+            spool.seek(0)
+        except Exception:
+            spool.close()
+            raise
+        return spool
+
+    def rescore_opportunities(self):
+        """Recompute opportunity scores for every topic in one vectorized pass"""
+        try:
+            count = scoring.rescore_database(self.db, scoring.load_weights())
+            logging.info(f"Updated opportunity scores for {count} topics")
+        except Exception as e:
+            logging.error(f"Error updating opportunity scores: {str(e)}")
+            self.db.rollback()
+
     def analyze_sentiment(self, text: str) -> Dict[str, float]:
         """Analyze sentiment and frustration levels in text."""
-        blob = TextBlob(text.lower())
-        
-        # Calculate base sentiment
-        sentiment = blob.sentiment.polarity
-        
-        # Calculate frustration score
-        frustration_score = sum(
-            1 for keyword in self.frustration_keywords 
-            if keyword in text.lower()
-        ) / len(self.frustration_keywords)
-        
-        # Calculate urgency based on time-related words and exclamation marks
-        urgency_words = ['asap', 'urgent', 'immediately', 'critical', 'emergency']
-        urgency_score = (
-            sum(1 for word in urgency_words if word in text.lower()) +
-            text.count('!')
-        ) / (len(urgency_words) + 1)
-        
-        # Calculate impact based on mentions of scale/importance
-        impact_words = ['everyone', 'all', 'major', 'significant', 'huge']
-        impact_score = sum(1 for word in impact_words if word in text.lower()) / len(impact_words)
-        
-        return {
-            "frustration": min(frustration_score, 1.0),
-            "urgency": min(urgency_score, 1.0),
-            "impact": min(impact_score, 1.0)
-        }
+        return text_analysis.analyze_sentiment(text)
 
     def extract_topic_clusters(self, texts: List[str]) -> List[Dict[str, Any]]:
         """Use LDA to identify topic clusters in the texts."""
-        if not texts:
-            return []
-            
-        # Prepare the document-term matrix
-        dtm = self.vectorizer.fit_transform(texts)
-        
-        # Fit LDA model
-        lda_output = self.lda.fit_transform(dtm)
-        
-        # Get feature names (words)
-        feature_names = self.vectorizer.get_feature_names_out()
-        
-        # Extract topics
-        topics = []
-        for topic_idx, topic in enumerate(self.lda.components_):
-            top_words = [
-                feature_names[i] 
-                for i in topic.argsort()[:-10 - 1:-1]
-            ]
-            topics.append({
-                "id": topic_idx,
-                "words": top_words,
-                "weight": float(np.mean(lda_output[:, topic_idx]))
-            })
-        
-        return topics
+        return text_analysis.extract_topic_clusters(texts)
     
+    def collect_comments(self, submission) -> List[Dict[str, Any]]:
+        """Comment records of a submission within the comment budget"""
+        if self.comment_budget.max_comments <= 0:
+            return []
+        try:
+            with self.transport.priority(COMMENTS):
+                return praw_comments(submission, self.comment_budget)
+        except Exception as e:
+            logging.warning(f"Error collecting comments: {e}")
+            return []
+
     def collect_engagement_metrics(self, submission) -> Dict[str, int]:
         """Collect engagement metrics from a Reddit submission."""
         try:
             unique_users = set()
-            for comment in submission.comments.list():
-                if hasattr(comment, 'author') and comment.author:
-                    unique_users.add(comment.author.name)
+            # Comment expansion yields to listing fetches when the request budget is low
+            with self.transport.priority(COMMENTS):
+                for comment in submission.comments.list():
+                    if hasattr(comment, 'author') and comment.author:
+                        unique_users.add(comment.author.name)
             
             return {
                 "upvotes": submission.score,
@@ -372,20 +634,25 @@ class DataCrawler:
                 "unique_users": 0
             }
 
-    def update_database(self, topics_data: Dict[str, Dict[str, Any]]):
-        """Update database with the collected and analyzed data."""
+    def update_database(self, topics_data: Union[Dict[str, Dict[str, Any]], Iterable[Tuple[str, Dict[str, Any]]]],
+                        commit: bool = True) -> bool:
+        """Update database with the collected and analyzed data.
+
+        ``topics_data`` is a dict or a stream of (topic, data) pairs. All
+        topics are written in one transaction, committed unless ``commit``
+        is False. Returns False if the write failed and was rolled back.
+        """
+        if isinstance(topics_data, dict):
+            topics_data = topics_data.items()
         try:
-            for topic_name, data in topics_data.items():
+            topic_keys.ensure_aliases(self.db)
+            for topic_name, data in topics_data:
                 cursor = self.db.cursor()
                 
-                # Check if topic exists
-                cursor.execute(
-                    "SELECT id FROM reddit_topics WHERE name = ?", 
-                    (topic_name,)
-                )
-                result = cursor.fetchone()
+                # Check if the topic or a variant of it exists
+                topic_id = topic_keys.resolve(self.db, topic_name)
                 
-                if result:
+                if topic_id:
                     # Update existing topic
                     cursor.execute("""
                         UPDATE reddit_topics 
@@ -406,7 +673,7 @@ class DataCrawler:
                         json.dumps(data['sentiment_scores']),
                         json.dumps(data['topic_clusters']),
                         json.dumps(data['engagement_metrics']),
-                        result[0]
+                        topic_id
                     ))
                 else:
                     # Insert new topic
@@ -427,24 +694,49 @@ class DataCrawler:
                         json.dumps(data['topic_clusters']),
                         json.dumps(data['engagement_metrics'])
                     ))
-                
-                self.db.commit()
+                    topic_keys.add_alias(self.db, topic_name, cursor.lastrowid)
             
+            if commit:
+                self.db.commit()
+            return True
         except Exception as e:
             logging.error(f"Error updating database: {str(e)}")
             self.db.rollback()
+            return False
 
 def main():
     parser = argparse.ArgumentParser(description='Reddit Data Collector for SaaS Opportunities')
     parser.add_argument('--collect', action='store_true', help='Start data collection')
+    parser.add_argument('--daemon', action='store_true',
+                        help='Keep running and crawl each subreddit on an adaptive interval')
+    parser.add_argument('--worker', action='store_true',
+                        help='Claim subreddit shards from the shared database alongside other workers')
+    parser.add_argument('--once', action='store_true',
+                        help='With --worker, exit once no shard is due instead of waiting')
+    parser.add_argument('--subreddits', default=None,
+                        help='Comma-separated subreddits to register as shards for --worker')
     parser.add_argument('--time-period', choices=['hour', 'day', 'week'], default='day',
                         help='Time period for data collection (default: day)')
+    parser.add_argument('--async-fetch', action='store_true',
+                        help='Fetch listings and comments concurrently instead of through PRAW')
+    parser.add_argument('--concurrency', type=int, default=None,
+                        help='Maximum concurrent Reddit requests for --async-fetch (default: 8)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Analysis worker processes (default: [ANALYSIS] workers or CPU count)')
     
     args = parser.parse_args()
     
-    if args.collect:
+    if args.collect or args.daemon or args.worker:
         crawler = DataCrawler()
-        crawler.collect_data(args.time_period)
+        if args.workers:
+            crawler.analysis.workers = args.workers
+        if args.worker:
+            subreddits = [name.strip() for name in args.subreddits.split(',') if name.strip()] if args.subreddits else None
+            crawler.run_worker(subreddits, args.once, args.async_fetch, args.concurrency)
+        elif args.daemon:
+            crawler.run_daemon(args.async_fetch, args.concurrency)
+        else:
+            crawler.collect_data(args.time_period, args.async_fetch, args.concurrency)
     else:
         parser.print_help()
 
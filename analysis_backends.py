@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+"""Registry of analysis backends that are imported on first use.
+
+TextBlob (via nltk/scipy), scikit-learn and numpy take seconds to import,
+so neither DataCrawler.py nor app.py imports them at module level. Callers
+ask for a backend by name with ``get()``; long-running servers can call
+``warm_up()`` once at startup to pay the cost before the first request.
+"""
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+_loaders: Dict[str, Callable[[], Any]] = {}
+_optional = set()
+_backends: Dict[str, Any] = {}
+_lock = threading.Lock()
+
+
+def register(name: str, loader: Callable[[], Any], optional: bool = False):
+    """Register a zero-argument loader under ``name``; optional backends are not warmed up by default"""
+    _loaders[name] = loader
+    if optional:
+        _optional.add(name)
+
+
+def get(name: str) -> Any:
+    """Return the backend registered under ``name``, loading it on first use"""
+    backend = _backends.get(name)
+    if backend is not None:
+        return backend
+
+    with _lock:
+        if name not in _backends:
+            start = time.perf_counter()
+            _backends[name] = _loaders[name]()
+            logging.info(f"Loaded analysis backend '{name}' in {time.perf_counter() - start:.2f}s")
+        return _backends[name]
+
+
+def is_loaded(name: str) -> bool:
+    """Whether the backend has already been loaded"""
+    return name in _backends
+
+
+def loaded() -> List[str]:
+    """Names of the backends loaded so far"""
+    return list(_backends)
+
+
+def warm_up(names: Optional[List[str]] = None) -> Dict[str, float]:
+    """Load the given backends (all but the optional ones by default) and return per-backend load times"""
+    timings = {}
+    for name in names or [name for name in _loaders if name not in _optional]:
+        start = time.perf_counter()
+        get(name)
+        timings[name] = round(time.perf_counter() - start, 3)
+    return timings
+
+
+def _load_textblob():
+    from textblob import TextBlob
+    # The sentiment lexicon is read lazily on the first analysis call
+    TextBlob("warm up").sentiment
+    return TextBlob
+
+
+def _load_topic_model():
+    from sklearn.feature_extraction.text import CountVectorizer
+    from sklearn.decomposition import LatentDirichletAllocation
+    return CountVectorizer, LatentDirichletAllocation
+
+
+def _load_numpy():
+    import numpy
+    return numpy
+
+
+def _load_sparse():
+    import scipy.sparse
+    return scipy.sparse
+
+
+def _load_spacy():
+    import spacy
+    # Noun chunks need the tagger and parser; entity recognition is never used
+    return spacy.load('en_core_web_sm', exclude=['ner'])
+
+
+register('textblob', _load_textblob)
+register('topic_model', _load_topic_model)
+register('numpy', _load_numpy)
+register('sparse', _load_sparse)
+register('spacy', _load_spacy, optional=True)
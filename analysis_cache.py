@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+"""Persistent cache of per-text analysis results.
+
+Hot listings overlap heavily between crawls, and clients send app.py the
+same texts again and again. Results are stored in a SQLite file keyed by a
+hash of the analysis kind, ``text_analysis.ANALYZER_VERSION`` and the
+NFC-normalized text, so the crawler and every API worker process share them
+and unchanged content is analyzed once. Bumping the analyzer version
+makes old entries unreachable; they age out through LRU eviction, which
+keeps the file under ``max_bytes``.
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Any, Callable, Dict, List, Optional
+import text_analysis
+
+CACHE_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS analysis_cache (
+        key BLOB PRIMARY KEY,
+        value TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        last_used REAL NOT NULL
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_analysis_cache_used ON analysis_cache(last_used);
+"""
+
+# A hit refreshes last_used at most this often, so reads rarely turn into writes
+TOUCH_INTERVAL = 300
+# Eviction trims the cache to this fraction of max_bytes so it does not run on every write
+EVICT_TO = 0.9
+
+
+def normalize_text(text: str) -> str:
+    """NFC form of a text; whitespace is kept, since extractors return sentences verbatim.
+
+    Canonically equivalent texts share a cache entry, so results stored for
+    a key must be computed from this form of the text.
+    """
+    return unicodedata.normalize('NFC', text)
+
+
+def cache_key(kind: str, text: str, version: str = text_analysis.ANALYZER_VERSION) -> bytes:
+    return hashlib.sha256(f"{kind}\0{version}\0{normalize_text(text)}".encode('utf-8')).digest()
+
+
+class AnalysisCache:
+    """SQLite-backed LRU cache of analysis results shared across processes.
+
+    ``path=None`` disables it: lookups miss and stores are dropped.
+    """
+
+    def __init__(self, path: Optional[str], max_bytes: int = 256 * 1024 * 1024,
+                 version: str = text_analysis.ANALYZER_VERSION):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self._lock = threading.Lock()
+        self._db = None
+        self._pid = None
+        self._written = 0
+
+    @classmethod
+    def from_config(cls, config) -> 'AnalysisCache':
+        """Build a cache from [ANALYSIS] analysis_cache and analysis_cache_mb of a ConfigParser"""
+        section = config['ANALYSIS'] if config.has_section('ANALYSIS') else {}
+        path = section.get('analysis_cache', 'data/analysis_cache.db')
+        return cls(path or None, max_bytes=int(float(section.get('analysis_cache_mb', 256)) * 1024 * 1024))
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    def _connection(self) -> sqlite3.Connection:
+        # Connections are not carried across fork() into pre-forked or pool workers
+        if self._db is None or self._pid != os.getpid():
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript(CACHE_SCHEMA)
+            self._pid = os.getpid()
+        return self._db
+
+    def get_many(self, kind: str, texts: List[str]) -> List[Optional[Any]]:
+        """Cached results for each text, None where there is none"""
+        if not self.enabled or not texts:
+            return [None] * len(texts)
+        keys = [cache_key(kind, text, self.version) for text in texts]
+        now = time.time()
+        found = {}
+        with self._lock:
+            db = self._connection()
+            try:
+                for i in range(0, len(keys), 500):
+                    chunk = list(set(keys[i:i + 500]))
+                    found.update((row[0], row[1:]) for row in db.execute(
+                        f"SELECT key, value, last_used FROM analysis_cache WHERE key IN ({','.join('?' * len(chunk))})",
+                        chunk))
+                stale = [(now, key) for key, (_, used) in found.items() if now - used > TOUCH_INTERVAL]
+                if stale:
+                    db.executemany("UPDATE analysis_cache SET last_used = ? WHERE key = ?", stale)
+                    db.commit()
+            except sqlite3.Error as e:
+                logging.warning(f"Analysis cache lookup failed: {e}")
+                db.rollback()
+                found = {}
+            results = [json.loads(found[key][0]) if key in found else None for key in keys]
+            hits = sum(result is not None for result in results)
+            self.hits += hits
+            self.misses += len(results) - hits
+        return results
+
+    def put_many(self, kind: str, texts: List[str], values: List[Any]):
+        """Store results, evicting the least recently used entries beyond max_bytes"""
+        if not self.enabled or not texts:
+            return
+        now = time.time()
+        rows = []
+        for text, value in zip(texts, values):
+            encoded = json.dumps(value, separators=(',', ':'))
+            rows.append((cache_key(kind, text, self.version), encoded, len(encoded), now))
+        with self._lock:
+            db = self._connection()
+            try:
+                db.executemany("INSERT OR REPLACE INTO analysis_cache VALUES (?, ?, ?, ?)", rows)
+                db.commit()
+                self._written += sum(row[2] for row in rows)
+                # Other processes write too, so the real size is only checked every few MB
+                if self._written >= min(self.max_bytes * (1 - EVICT_TO), 4 * 1024 * 1024):
+                    self._written = 0
+                    self._evict(db)
+            except sqlite3.Error as e:
+                logging.warning(f"Analysis cache store failed: {e}")
+                db.rollback()
+
+    def _evict(self, db: sqlite3.Connection):
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM analysis_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        cursor = db.execute("""
+            DELETE FROM analysis_cache WHERE key IN (
+                SELECT key FROM (
+                    SELECT key, SUM(size) OVER (ORDER BY last_used DESC, key) AS kept
+                    FROM analysis_cache
+                ) WHERE kept > ?
+            )
+        """, (self.max_bytes * EVICT_TO,))
+        db.commit()
+        self.evicted += cursor.rowcount
+        logging.info(f"Evicted {cursor.rowcount} analysis cache entries")
+
+    def map(self, kind: str, func: Callable[[str], Any], texts: List[str],
+            mapper: Optional[Callable[[Callable[[str], Any], List[str]], List[Any]]] = None) -> List[Any]:
+        """``[func(text) for text in texts]``, computing only the texts not cached.
+
+        ``mapper`` runs ``func`` over the misses, e.g. AnalysisExecutor.map.
+        ``func`` is given the normalized texts.
+        """
+        texts = [normalize_text(text) for text in texts]
+        results = self.get_many(kind, texts)
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            missing_texts = [texts[i] for i in missing]
+            computed = (mapper or (lambda f, items: [f(item) for item in items]))(func, missing_texts)
+            for i, value in zip(missing, computed):
+                results[i] = value
+            self.put_many(kind, missing_texts, computed)
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {'enabled': self.enabled, 'hits': self.hits, 'misses': self.misses, 'evicted': self.evicted}
+        lookups = self.hits + self.misses
+        stats['hit_rate'] = round(self.hits / lookups, 4) if lookups else 0.0
+        if self.enabled:
+            with self._lock:
+                entries, size = self._connection().execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM analysis_cache").fetchone()
+            stats.update(entries=entries, bytes=size, max_bytes=self.max_bytes)
+        return stats
+
+    def close(self):
+        with self._lock:
+            if self._db is not None and self._pid == os.getpid():
+                self._db.close()
+            self._db = None
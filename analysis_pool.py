@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+import logging
+import os
+import signal
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError
+from typing import Any, Callable, Dict, List, Optional
+import analysis_backends
+
+DEFAULT_BATCH_SIZE = 32
+
+
+def _init_worker(backends: List[str]):
+    """Preload the analysis models once per worker process"""
+    # Forked from a server process: don't inherit its graceful-shutdown handler
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    analysis_backends.warm_up(backends)
+
+
+def _run_batch(func: Callable[[Any], Any], batch: List[Any]) -> List[Any]:
+    return [func(item) for item in batch]
+
+
+class AnalysisExecutor:
+    """Run CPU-bound text analysis across a pool of worker processes.
+
+    Inputs are shipped in batches of ``batch_size`` items so each round trip
+    to a worker carries enough work to amortize pickling. ``func`` must be a
+    module-level function (see text_analysis) so it can be sent to workers.
+    With ``workers <= 1``, or for inputs smaller than ``min_parallel``, work
+    runs inline in the calling process.
+    """
+
+    def __init__(self, workers: Optional[int] = None, batch_size: int = DEFAULT_BATCH_SIZE,
+                 backends: Optional[List[str]] = None, min_parallel: Optional[int] = None):
+        self.workers = (os.cpu_count() or 1) if workers is None else max(1, int(workers))
+        self.batch_size = max(1, int(batch_size))
+        self.backends = backends if backends is not None else ['textblob', 'topic_model']
+        self.min_parallel = min_parallel if min_parallel is not None else 2 * self.batch_size
+        self._pool = None
+
+    @classmethod
+    def from_config(cls, config) -> 'AnalysisExecutor':
+        """Build an executor from the [ANALYSIS] section of a ConfigParser"""
+        section = config['ANALYSIS'] if config.has_section('ANALYSIS') else {}
+        workers = int(section.get('workers', 0))
+        return cls(
+            workers=workers or None,
+            batch_size=int(section.get('batch_size', DEFAULT_BATCH_SIZE))
+        )
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self.backends,)
+            )
+            logging.info(f"Started analysis pool with {self.workers} workers")
+        return self._pool
+
+    def map(self, func: Callable[[Any], Any], items: List[Any]) -> List[Any]:
+        """Apply ``func`` to every item, preserving order"""
+        items = list(items)
+        if self.workers <= 1 or len(items) < self.min_parallel:
+            return [func(item) for item in items]
+
+        # Never make batches so large that some workers sit idle
+        size = max(1, min(self.batch_size, -(-len(items) // self.workers)))
+        batches = [items[i:i + size] for i in range(0, len(items), size)]
+        pool = self._executor()
+        results = []
+        for batch_result in pool.map(_run_batch, [func] * len(batches), batches):
+            results.extend(batch_result)
+        return results
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+
+class ExecutorBusy(RuntimeError):
+    """Raised when a BoundedExecutor already holds as much work as it may queue"""
+
+
+class BoundedExecutor:
+    """Run long analyses in worker processes, off the request threads.
+
+    At most ``workers`` calls run at once and ``max_queue`` more may wait;
+    beyond that ``submit`` raises ExecutorBusy instead of letting a burst of
+    expensive requests pile up behind each other. ``run`` waits at most
+    ``timeout`` seconds for a result. A call that timed out keeps its slot
+    until the worker finishes it, so abandoned work still counts as load.
+    """
+
+    def __init__(self, workers: int = 1, max_queue: int = 4, timeout: float = 30,
+                 backends: Optional[List[str]] = None):
+        self.workers = max(1, int(workers))
+        self.max_queue = max(0, int(max_queue))
+        self.timeout = timeout
+        self.backends = backends if backends is not None else ['textblob', 'topic_model']
+        self.pending = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self._lock = threading.Lock()
+        self._pool = None
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self.backends,)
+            )
+        return self._pool
+
+    def _done(self, future: Future):
+        with self._lock:
+            self.pending -= 1
+
+    def submit(self, func: Callable[..., Any], *args) -> Future:
+        with self._lock:
+            if self.pending >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise ExecutorBusy(f"{self.pending} analyses are already running or queued")
+            self.pending += 1
+            try:
+                future = self._executor().submit(func, *args)
+            except Exception:
+                self.pending -= 1
+                raise
+        future.add_done_callback(self._done)
+        return future
+
+    def run(self, func: Callable[..., Any], *args, timeout: Optional[float] = None) -> Any:
+        """Call ``func(*args)`` in a worker; raises ExecutorBusy or TimeoutError"""
+        future = self.submit(func, *args)
+        try:
+            return future.result(timeout if timeout is not None else self.timeout)
+        except TimeoutError:
+            future.cancel()
+            with self._lock:
+                self.timed_out += 1
+            raise
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'pending': self.pending,
+                'max_queue': self.max_queue,
+                'rejected': self.rejected,
+                'timed_out': self.timed_out
+            }
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
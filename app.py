@@ -2,14 +2,23 @@
 import os
 import json
 import sqlite3
+import concurrent.futures
 from datetime import datetime, timedelta
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
-import pandas as pd
-import numpy as np
-from textblob import TextBlob
-from sklearn.feature_extraction.text import CountVectorizer
-from sklearn.decomposition import LatentDirichletAllocation
+import analysis_backends
+import text_analysis
+from analysis_pool import AnalysisExecutor, BoundedExecutor, ExecutorBusy
+from analysis_cache import AnalysisCache
+from response_cache import ResponseCache
+import scoring
+import topic_listing
+import topic_export
+import stream_analysis
+import dtm_store
+import sql_trace
+from dtm_store import parse_time
+from text_store import TextStore
 
 app = Flask(__name__)
 CORS(app)
@@ -19,12 +28,97 @@ data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
 if not os.path.exists(data_dir):
     os.makedirs(data_dir)
 
+# Process pool for CPU-bound analysis; ANALYSIS_WORKERS=0 means one per CPU core
+analysis_executor = AnalysisExecutor(
+    workers=int(os.environ.get('ANALYSIS_WORKERS', 0)) or None,
+    batch_size=int(os.environ.get('ANALYSIS_BATCH_SIZE', 32))
+)
+
+# Long LDA fits run here so they cannot tie up the threads serving cheap requests;
+# past HEAVY_QUEUE waiting fits new ones get a 503, and callers give up after HEAVY_TIMEOUT
+heavy_executor = BoundedExecutor(
+    workers=int(os.environ.get('HEAVY_WORKERS', 1)),
+    max_queue=int(os.environ.get('HEAVY_QUEUE', 4)),
+    timeout=float(os.environ.get('HEAVY_TIMEOUT', 30))
+)
+
+# Readiness reported by /health: 'cold' (models load on first use), 'warming' or 'warm'
+warmup = {'state': 'cold', 'timings': {}}
+
+def warm_up():
+    """Load every analysis backend now, e.g. before forking workers that share them"""
+    warmup['state'] = 'warming'
+    warmup['timings'] = analysis_backends.warm_up()
+    warmup['state'] = 'warm'
+    return warmup['timings']
+
+def shutdown_executors():
+    """Stop the analysis worker processes when this server process exits"""
+    heavy_executor.shutdown()
+    analysis_executor.shutdown()
+    analysis_cache.close()
+
+# Per-text results shared with the crawler; ANALYSIS_CACHE= (empty) disables it
+analysis_cache = AnalysisCache(
+    os.environ.get('ANALYSIS_CACHE', os.path.join(data_dir, 'analysis_cache.db')) or None,
+    max_bytes=int(float(os.environ.get('ANALYSIS_CACHE_MB', 256)) * 1024 * 1024)
+)
+
+def find_pain_sentences_cached(texts):
+    """find_pain_sentences over texts, analyzing only those not seen before"""
+    return analysis_cache.map('pain_sentences', text_analysis.find_pain_sentences, texts, analysis_executor.map)
+
+# Cache of identical analysis requests (dashboards poll with the same bodies)
+response_cache = ResponseCache(
+    max_entries=int(os.environ.get('RESPONSE_CACHE_ENTRIES', 256)),
+    max_bytes=int(os.environ.get('RESPONSE_CACHE_BYTES', 16 * 1024 * 1024)),
+    ttl=float(os.environ.get('RESPONSE_CACHE_TTL', 60))
+)
+
+# Texts per chunk for NDJSON bulk analysis, overridable with ?chunk_size=
+stream_chunk_size = int(os.environ.get('STREAM_CHUNK_SIZE', stream_analysis.DEFAULT_CHUNK_SIZE))
+
+# Opportunity score weights from the [SCORING] section of config.ini
+scoring_weights = scoring.load_weights(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.ini')
+)
+
+# SQL_TRACE=1 times every statement of this process (see /api/python/db/queries)
+query_log = sql_trace.QueryLog.from_env()
+
 # Database connection helper
 def get_db_connection():
-    conn = sqlite3.connect(os.path.join(data_dir, 'ideaengine.db'))
+    conn = sql_trace.connect(os.path.join(data_dir, 'ideaengine.db'), query_log)
     conn.row_factory = sqlite3.Row
     return conn
 
+_topic_indexes_ready = False
+
+def get_topics_connection():
+    """Connection for the listing endpoints, creating the sort-key indexes once"""
+    global _topic_indexes_ready
+    conn = get_db_connection()
+    if not _topic_indexes_ready:
+        topic_listing.ensure_indexes(conn)
+        _topic_indexes_ready = True
+    return conn
+
+def get_dtm_store_path():
+    """Directory of the crawler's corpus matrix store"""
+    return os.environ.get('DTM_STORE', os.path.join(data_dir, 'dtm'))
+
+def get_text_store():
+    """Open the crawler's source text store (texts are memory-mapped on use)"""
+    return TextStore(os.environ.get('TEXT_STORE', os.path.join(data_dir, 'texts')))
+
+def ndjson_stream_response(lines):
+    """Stream NDJSON lines produced while reading the request body"""
+    return Response(stream_with_context(lines), mimetype=stream_analysis.NDJSON_MIMETYPE)
+
+def requested_chunk_size():
+    chunk_size = request.args.get('chunk_size', stream_chunk_size, type=int)
+    return max(1, min(stream_analysis.MAX_CHUNK_SIZE, chunk_size))
+
 # Error handling
 @app.errorhandler(404)
 def not_found(error):
@@ -34,12 +128,156 @@ def not_found(error):
 def server_error(error):
     return jsonify({'error': 'Server error'}), 500
 
+@app.errorhandler(ExecutorBusy)
+def analysis_busy(error):
+    return jsonify({'error': 'Too many analyses in progress, retry shortly'}), 503, {'Retry-After': '1'}
+
+@app.errorhandler(concurrent.futures.TimeoutError)
+def analysis_timeout(error):
+    return jsonify({'error': 'Analysis timed out'}), 504
+
 # API Routes
 @app.route('/api/python/test', methods=['GET'])
 def test_api():
     return jsonify({'message': 'Python API is working correctly!'})
 
+@app.route('/health', methods=['GET'])
+def health():
+    """Readiness: 503 while models are still loading"""
+    ready = warmup['state'] != 'warming'
+    return jsonify({
+        'status': 'ready' if ready else 'warming',
+        'warmup': warmup['state'],
+        'warmup_seconds': warmup['timings'],
+        'backends': analysis_backends.loaded(),
+        'heavy_executor': heavy_executor.stats(),
+        'pid': os.getpid()
+    }), 200 if ready else 503
+
+@app.route('/api/python/cache/stats', methods=['GET'])
+def cache_stats():
+    """Report response and analysis cache size and hit rate"""
+    return jsonify({
+        'response_cache': response_cache.stats(),
+        'analysis_cache': analysis_cache.stats()
+    })
+
+@app.route('/api/python/db/queries', methods=['GET'])
+def db_queries():
+    """Report this worker's statement latencies and recent slow queries (SQL_TRACE=1)"""
+    if query_log is None:
+        return jsonify({'enabled': False})
+    return jsonify({'enabled': True, **query_log.stats(top=request.args.get('top', 20, type=int))})
+
+@app.route('/api/python/topics', methods=['GET'])
+@response_cache.cached
+def list_topics():
+    """List topics one keyset-paginated page at a time"""
+    try:
+        fields = topic_listing.parse_fields(request.args.get('fields'))
+        conn = get_topics_connection()
+        try:
+            topics, next_cursor = topic_listing.list_topics(
+                conn,
+                sort=request.args.get('sort', 'score'),
+                order=request.args.get('order', 'desc'),
+                limit=request.args.get('limit', 50, type=int),
+                cursor=request.args.get('cursor'),
+                fields=fields,
+                category=request.args.get('category')
+            )
+        finally:
+            conn.close()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify({
+        'topics': topics,
+        'next_cursor': next_cursor
+    })
+
+@app.route('/api/python/topics/top', methods=['GET'])
+@response_cache.cached
+def top_topics():
+    """Return the best N topics by an indexed or JSON-derived key"""
+    try:
+        fields = topic_listing.parse_fields(request.args.get('fields'))
+        conn = get_topics_connection()
+        try:
+            topics = topic_listing.top_topics(
+                conn,
+                k=request.args.get('k', 10, type=int),
+                by=request.args.get('by', 'score'),
+                fields=fields,
+                category=request.args.get('category')
+            )
+        finally:
+            conn.close()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify({
+        'topics': topics
+    })
+
+@app.route('/api/python/export/<kind>', methods=['GET'])
+def export_data(kind):
+    """Stream topics or extracted phrases as NDJSON or CSV"""
+    fmt = request.args.get('format', 'ndjson')
+    category = request.args.get('category')
+    
+    if kind not in topic_export.KINDS:
+        return jsonify({'error': f"Unknown export kind: {kind}"}), 400
+    if fmt not in topic_export.FORMATS:
+        return jsonify({'error': f"Unknown export format: {fmt}"}), 400
+    try:
+        since = topic_export.parse_since(request.args.get('since'))
+    except ValueError as e:
+        return jsonify({'error': f"Invalid since: {e}"}), 400
+    
+    def generate():
+        # The connection lives as long as the response is being streamed
+        conn = get_db_connection()
+        try:
+            yield from topic_export.export_lines(conn, kind, fmt, category, since)
+        finally:
+            conn.close()
+    
+    extension = 'csv' if fmt == 'csv' else 'ndjson'
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/csv' if fmt == 'csv' else 'application/x-ndjson',
+        headers={'Content-Disposition': f"attachment; filename={kind}.{extension}"}
+    )
+
+@app.route('/api/python/sources', methods=['GET'])
+@response_cache.cached
+def phrase_sources():
+    """Return the crawled posts a topic or extracted phrase came from"""
+    phrase = request.args.get('phrase', '')
+    if not phrase.strip():
+        return jsonify({'error': 'No phrase provided'}), 400
+    
+    store = get_text_store()
+    try:
+        sources = store.sources(
+            phrase,
+            kind=request.args.get('kind'),
+            limit=max(1, min(200, request.args.get('limit', 20, type=int))),
+            max_chars=request.args.get('max_chars', type=int)
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    finally:
+        store.close()
+    
+    return jsonify({
+        'phrase': phrase,
+        'sources': sources
+    })
+
 @app.route('/api/python/analyze/sentiment', methods=['POST'])
+@response_cache.cached
 def analyze_sentiment():
     """Analyze sentiment of text data"""
     if not request.json or 'text' not in request.json:
@@ -47,20 +285,19 @@ def analyze_sentiment():
     
     text = request.json['text']
     
-    # Use TextBlob for sentiment analysis
-    blob = TextBlob(text)
-    sentiment = blob.sentiment
+    # Use TextBlob for sentiment analysis, unless this text was analyzed before
+    sentiment = analysis_cache.map('polarity', text_analysis.polarity, [text])[0]
     
     # Calculate frustration score based on negative sentiment
-    frustration_score = max(0, min(100, (1 - sentiment.polarity) * 100))
+    frustration_score = max(0, min(100, (1 - sentiment['polarity']) * 100))
     
     # Calculate urgency score based on subjectivity
-    urgency_score = max(0, min(100, sentiment.subjectivity * 100))
+    urgency_score = max(0, min(100, sentiment['subjectivity'] * 100))
     
     return jsonify({
         'sentiment': {
-            'polarity': sentiment.polarity,
-            'subjectivity': sentiment.subjectivity
+            'polarity': sentiment['polarity'],
+            'subjectivity': sentiment['subjectivity']
         },
         'scores': {
             'frustration': round(frustration_score, 1),
@@ -69,8 +306,19 @@ def analyze_sentiment():
     })
 
 @app.route('/api/python/analyze/topics', methods=['POST'])
+@response_cache.cached
 def analyze_topics():
     """Extract topics from text data using LDA"""
+    if request.mimetype == stream_analysis.NDJSON_MIMETYPE:
+        # One text per line, fitted chunk by chunk: ?num_topics=&chunk_size=
+        # Each chunk is fitted in the bounded executor, like a JSON request
+        return ndjson_stream_response(stream_analysis.stream_topics(
+            request.stream,
+            lambda chunk, num_topics: heavy_executor.run(text_analysis.extract_lda_topics, chunk, num_topics),
+            num_topics=request.args.get('num_topics', 5, type=int),
+            chunk_size=requested_chunk_size()
+        ))
+    
     if not request.json or 'texts' not in request.json:
         return jsonify({'error': 'No texts provided'}), 400
     
@@ -80,47 +328,52 @@ def analyze_topics():
     if not texts:
         return jsonify({'error': 'Empty text list'}), 400
     
-    # Vectorize the text
-    vectorizer = CountVectorizer(
-        max_df=0.95, 
-        min_df=2, 
-        stop_words='english'
-    )
-    
     try:
-        dtm = vectorizer.fit_transform(texts)
-        
-        # Create and fit the LDA model
-        lda = LatentDirichletAllocation(
-            n_components=num_topics, 
-            random_state=42
-        )
-        lda.fit(dtm)
-        
-        # Get the feature names (words)
-        feature_names = vectorizer.get_feature_names_out()
-        
-        # Extract topics
-        topics = []
-        for topic_idx, topic in enumerate(lda.components_):
-            top_words_idx = topic.argsort()[:-10-1:-1]
-            top_words = [feature_names[i] for i in top_words_idx]
-            topics.append({
-                'id': topic_idx,
-                'words': top_words,
-                'weight': float(topic.sum())
-            })
-        
+        topics = heavy_executor.run(text_analysis.extract_lda_topics, texts, num_topics)
         return jsonify({
             'topics': topics
         })
     
+    except (ExecutorBusy, concurrent.futures.TimeoutError):
+        raise
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/python/analyze/corpus-topics', methods=['GET'])
+@response_cache.cached
+def analyze_corpus_topics():
+    """Cluster already-vectorized crawl history by topic, subreddit or time range"""
+    try:
+        filters = {
+            'topic': request.args.get('topic'),
+            'subreddit': request.args.get('subreddit'),
+            'since': parse_time(request.args.get('since')),
+            'until': parse_time(request.args.get('until')),
+            'limit': request.args.get('limit', 5000, type=int)
+        }
+        num_topics = request.args.get('num_topics', 5, type=int)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    documents, topics = heavy_executor.run(dtm_store.cluster_store, get_dtm_store_path(), num_topics, filters)
+    
+    return jsonify({
+        'documents': documents,
+        'topics': topics
+    })
+
 @app.route('/api/python/analyze/pain-points', methods=['POST'])
+@response_cache.cached
 def extract_pain_points():
     """Extract pain points from text data"""
+    if request.mimetype == stream_analysis.NDJSON_MIMETYPE:
+        # One text per line, scored chunk by chunk with a grouped summary at the end
+        return ndjson_stream_response(stream_analysis.stream_pain_points(
+            request.stream,
+            find_pain_sentences_cached,
+            chunk_size=requested_chunk_size()
+        ))
+    
     if not request.json or 'texts' not in request.json:
         return jsonify({'error': 'No texts provided'}), 400
     
@@ -129,61 +382,17 @@ def extract_pain_points():
     if not texts:
         return jsonify({'error': 'Empty text list'}), 400
     
-    # Keywords that indicate pain points
-    pain_keywords = [
-        'hate', 'annoying', 'struggling', 'difficult', 'frustrated', 
-        'tired of', 'sick of', 'pain point', 'problem', 'issue',
-        'challenge', 'headache', 'nightmare', 'waste', 'inefficient'
-    ]
-    
-    pain_points = []
-    
-    for text in texts:
-        blob = TextBlob(text.lower())
-        
-        # Check if text contains pain keywords
-        if any(keyword in text.lower() for keyword in pain_keywords):
-            # Extract sentences containing pain keywords
-            sentences = blob.sentences
-            for sentence in sentences:
-                if any(keyword in sentence.string.lower() for keyword in pain_keywords):
-                    # Calculate frustration score
-                    frustration = max(0, min(100, (1 - sentence.sentiment.polarity) * 100))
-                    
-                    pain_points.append({
-                        'text': sentence.string,
-                        'frustration_score': round(frustration, 1),
-                        'source_text': text
-                    })
-    
-    # Group similar pain points
-    grouped_pain_points = {}
-    for point in pain_points:
-        text = point['text']
-        key = text[:50]  # Use first 50 chars as key for grouping
-        
-        if key in grouped_pain_points:
-            grouped_pain_points[key]['count'] += 1
-            grouped_pain_points[key]['frustration_score'] = (
-                (grouped_pain_points[key]['frustration_score'] * (grouped_pain_points[key]['count'] - 1)) + 
-                point['frustration_score']
-            ) / grouped_pain_points[key]['count']
-        else:
-            grouped_pain_points[key] = {
-                'text': text,
-                'count': 1,
-                'frustration_score': point['frustration_score']
-            }
-    
-    # Convert to list and sort by count
-    result = list(grouped_pain_points.values())
-    result.sort(key=lambda x: x['count'], reverse=True)
+    # Sentence scoring is CPU-bound, so large requests are spread over worker processes
+    grouper = stream_analysis.PainPointGrouper()
+    for points in find_pain_sentences_cached(texts):
+        grouper.add(points)
     
     return jsonify({
-        'pain_points': result[:20]  # Return top 20 pain points
+        'pain_points': grouper.top(20)  # Return top 20 pain points
     })
 
 @app.route('/api/python/analyze/app-ideas', methods=['POST'])
+@response_cache.cached
 def generate_app_ideas():
     """Generate app ideas based on pain points"""
     if not request.json or 'pain_points' not in request.json:
@@ -229,36 +438,46 @@ def generate_app_ideas():
     })
 
 @app.route('/api/python/stats/opportunity-score', methods=['POST'])
+@response_cache.cached
 def calculate_opportunity_score():
     """Calculate opportunity score for a topic"""
     if not request.json:
         return jsonify({'error': 'No data provided'}), 400
     
-    # Extract data from request
-    pain_points = request.json.get('pain_points', [])
-    growth_rate = request.json.get('growth_rate', 0)
-    mention_count = request.json.get('mention_count', 0)
-    
-    # Calculate scores
-    pain_score = min(100, sum(point.get('count', 1) for point in pain_points))
-    growth_score = min(100, growth_rate * 2)
-    market_score = min(100, mention_count / 10)
-    
-    # Calculate total opportunity score (weighted average)
-    total_score = (
-        pain_score * 0.4 +
-        growth_score * 0.3 +
-        market_score * 0.3
-    )
+    try:
+        scores = scoring.score_topics(
+            [request.json], request.json.get('weights') or scoring_weights
+        )[0]
+    except (TypeError, ValueError, AttributeError) as e:
+        return jsonify({'error': str(e)}), 400
     
     return jsonify({
-        'opportunity_scores': {
-            'total_score': round(total_score, 1),
-            'pain_score': round(pain_score, 1),
-            'growth_score': round(growth_score, 1),
-            'market_score': round(market_score, 1)
-        }
+        'opportunity_scores': scores
+    })
+
+@app.route('/api/python/stats/opportunity-scores', methods=['POST'])
+@response_cache.cached
+def calculate_opportunity_scores():
+    """Calculate opportunity scores for many topics in one vectorized pass"""
+    if not request.json or 'topics' not in request.json:
+        return jsonify({'error': 'No topics provided'}), 400
+    
+    topics = request.json['topics']
+    
+    if not isinstance(topics, list):
+        return jsonify({'error': 'topics must be a list'}), 400
+    
+    try:
+        scores = scoring.score_topics(topics, request.json.get('weights') or scoring_weights)
+    except (TypeError, ValueError, AttributeError) as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify({
+        'opportunity_scores': scores
     })
 
 if __name__ == '__main__':
+    # Long-running servers can load the analysis models before the first request
+    if os.environ.get('ANALYSIS_WARMUP') == '1':
+        print(f"Warmed up analysis backends: {warm_up()}")
     app.run(debug=True, port=5001) 
\ No newline at end of file
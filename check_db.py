@@ -1,17 +1,54 @@
-import sqlite3
+#!/usr/bin/env python
+"""Inspect the SQLite database and report on its health.
+
+Besides the topic table's schema and a sample row, the report covers row
+counts, the size distribution of every text column (the JSON columns grow
+with each crawl), the query plan and latency of each query the API runs,
+page fragmentation, and whether ANALYZE or VACUUM is due.
+
+    python check_db.py [--db data/ideaengine.db] [--json]
+"""
+import argparse
 import json
+import sqlite3
+import time
+from typing import Any, Dict, List
+import topic_export
+import topic_listing
+
+DB_PATH = './data/ideaengine.db'
+
+# VACUUM pays off once this share of pages is free, or of leaf pages out of order
+VACUUM_FREE_RATIO = 0.1
+VACUUM_FRAGMENTED_RATIO = 0.3
+# Small databases fit in the page cache however they are laid out
+VACUUM_MIN_PAGES = 1000
+TEXT_TYPES = ('TEXT', 'CHAR', 'CLOB', 'BLOB')
 
-def check_database():
-    conn = sqlite3.connect('./data/ideaengine.db')
+# The queries behind the dashboard API, issued through the same code as app.py
+API_QUERIES = [
+    ('topics?sort=score', lambda conn: topic_listing.list_topics(conn, sort='score')),
+    ('topics?sort=score&cursor=', lambda conn: topic_listing.list_topics(
+        conn, sort='score', cursor=topic_listing.encode_cursor(0, 0))),
+    ('topics?sort=mentions', lambda conn: topic_listing.list_topics(conn, sort='mentions')),
+    ('topics?sort=growth', lambda conn: topic_listing.list_topics(conn, sort='growth')),
+    ('topics?category=', lambda conn: topic_listing.list_topics(conn, sort='score', category='Productivity')),
+    ('topics/top?by=pain_score', lambda conn: topic_listing.top_topics(conn, by='pain_score')),
+    ('export/topics', lambda conn: next(topic_export.export_lines(conn, 'topics'), None)),
+]
+
+
+def check_database(db_path: str = DB_PATH):
+    conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
-    
+
     # Check table structure
     cursor.execute("PRAGMA table_info(reddit_topics)")
     columns = cursor.fetchall()
     print("\nTable structure:")
     for col in columns:
         print(f"Column: {col[1]}, Type: {col[2]}")
-    
+
     # Check sample data
     cursor.execute("SELECT * FROM reddit_topics LIMIT 1")
     row = cursor.fetchone()
@@ -19,13 +56,236 @@ def check_database():
         print("\nSample row:")
         for col, val in zip([c[1] for c in columns], row):
             print(f"{col}: {val}")
-    
+
     # Count records
     cursor.execute("SELECT COUNT(*) FROM reddit_topics")
     count = cursor.fetchone()[0]
     print(f"\nTotal records: {count}")
-    
+
     conn.close()
 
+
+def percentile(values: List[int], p: float) -> int:
+    """Nearest-rank percentile of sorted values"""
+    if not values:
+        return 0
+    rank = max(1, int(-(-p * len(values) // 100)))
+    return values[min(rank, len(values)) - 1]
+
+
+def tables(conn) -> List[str]:
+    return [row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name")]
+
+
+def row_counts(conn) -> Dict[str, int]:
+    return {table: conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0] for table in tables(conn)}
+
+
+def column_sizes(conn) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """Byte length distribution of every text column, per table"""
+    sizes = {}
+    for table in tables(conn):
+        for _, column, declared, *_ in conn.execute(f'PRAGMA table_info("{table}")'):
+            # Untyped columns may hold text too
+            if declared and not any(kind in declared.upper() for kind in TEXT_TYPES):
+                continue
+            lengths = [row[0] for row in conn.execute(
+                f'SELECT length(CAST("{column}" AS BLOB)) FROM "{table}" WHERE "{column}" IS NOT NULL ORDER BY 1')]
+            if not lengths:
+                continue
+            sizes.setdefault(table, {})[column] = {
+                'rows': len(lengths),
+                'total_bytes': sum(lengths),
+                'avg': round(sum(lengths) / len(lengths), 1),
+                'p50': percentile(lengths, 50),
+                'p95': percentile(lengths, 95),
+                'max': lengths[-1]
+            }
+    return sizes
+
+
+def query_plans(conn) -> List[Dict[str, Any]]:
+    """EXPLAIN QUERY PLAN and latency of every statement the API queries run"""
+    row_factory = conn.row_factory
+    conn.row_factory = sqlite3.Row
+    plans = []
+    try:
+        for label, run in API_QUERIES:
+            statements = []
+            # The trace callback reports each statement with its bound values inlined
+            conn.set_trace_callback(statements.append)
+            start = time.perf_counter()
+            try:
+                run(conn)
+            except sqlite3.OperationalError as e:
+                plans.append({'query': label, 'error': str(e)})
+                continue
+            finally:
+                conn.set_trace_callback(None)
+            ms = (time.perf_counter() - start) * 1000
+            for sql in statements:
+                plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+                plans.append({
+                    'query': label,
+                    'sql': sql,
+                    'ms': round(ms, 2),
+                    'plan': plan,
+                    'full_scan': any(step.startswith('SCAN') and 'USING' not in step for step in plan),
+                    'temp_sort': any('TEMP B-TREE' in step for step in plan)
+                })
+    finally:
+        conn.row_factory = row_factory
+    return plans
+
+
+def fragmentation(conn) -> Dict[str, Any]:
+    """Free pages and, where SQLite has the dbstat table, per-object fill and page order"""
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    pages = conn.execute("PRAGMA page_count").fetchone()[0]
+    free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    result = {
+        'page_size': page_size,
+        'pages': pages,
+        'free_pages': free,
+        'free_ratio': round(free / pages, 4) if pages else 0.0
+    }
+    try:
+        rows = conn.execute("SELECT name, pageno, pagetype, unused FROM dbstat ORDER BY name, path").fetchall()
+    except sqlite3.OperationalError:
+        return result  # SQLite built without SQLITE_ENABLE_DBSTAT_VTAB
+
+    objects = {}
+    for name, pageno, pagetype, unused in rows:
+        entry = objects.setdefault(name, {'pages': 0, 'unused_bytes': 0, 'leaves': 0, 'out_of_order': 0, '_last': None})
+        entry['pages'] += 1
+        entry['unused_bytes'] += unused
+        if pagetype == 'leaf':
+            # Leaves visited in key order should sit on consecutive pages
+            if entry['_last'] is not None and pageno != entry['_last'] + 1:
+                entry['out_of_order'] += 1
+            entry['leaves'] += 1
+            entry['_last'] = pageno
+    for entry in objects.values():
+        del entry['_last']
+        entry['fill'] = round(1 - entry['unused_bytes'] / (entry['pages'] * page_size), 4)
+    gaps = sum(entry['leaves'] - 1 for entry in objects.values() if entry['leaves'] > 1)
+    result['objects'] = objects
+    result['fragmented_ratio'] = round(sum(entry['out_of_order'] for entry in objects.values()) / gaps, 4) if gaps else 0.0
+    return result
+
+
+def statistics_status(conn, counts: Dict[str, int]) -> Dict[str, str]:
+    """'missing', 'stale' or 'ok' planner statistics for every table that has indexes"""
+    indexed = {row[0] for row in conn.execute(
+        "SELECT DISTINCT tbl_name FROM sqlite_master WHERE type = 'index' AND tbl_name NOT LIKE 'sqlite_%'")}
+    stats = {}
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone():
+        for table, stat in conn.execute("SELECT tbl, stat FROM sqlite_stat1"):
+            stats[table] = int(stat.split()[0])
+    status = {}
+    for table in sorted(indexed):
+        if table not in stats:
+            status[table] = 'missing'
+        elif abs(counts.get(table, 0) - stats[table]) > max(100, 0.5 * stats[table]):
+            status[table] = 'stale'
+        else:
+            status[table] = 'ok'
+    return status
+
+
+def recommendations(report: Dict[str, Any]) -> List[str]:
+    advice = []
+    outdated = [table for table, state in report['statistics'].items() if state != 'ok' and report['rows'].get(table)]
+    if outdated:
+        advice.append(f"Run ANALYZE: planner statistics are missing or stale for {', '.join(outdated)}")
+
+    pages = report['fragmentation']
+    if pages['pages'] >= VACUUM_MIN_PAGES and (
+            pages['free_ratio'] > VACUUM_FREE_RATIO
+            or pages.get('fragmented_ratio', 0) > VACUUM_FRAGMENTED_RATIO):
+        advice.append(f"Run VACUUM: {pages['free_ratio']:.0%} of pages are free and "
+                      f"{pages.get('fragmented_ratio', 0):.0%} of leaf pages are out of order")
+
+    existing = set(report['indexes'])
+    missing = [statement.split()[5] for statement in topic_listing.INDEXES if statement.split()[5] not in existing]
+    if missing:
+        advice.append(f"Create the listing indexes ({', '.join(missing)}): the API creates them on "
+                      f"first use, or call topic_listing.ensure_indexes")
+    for plan in report['plans']:
+        if plan.get('temp_sort'):
+            advice.append(f"{plan['query']} sorts its rows in a temporary B-tree: {plan['sql']}")
+    return advice
+
+
+def health_report(conn) -> Dict[str, Any]:
+    counts = row_counts(conn)
+    report = {
+        'rows': counts,
+        'column_sizes': column_sizes(conn),
+        'indexes': [row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND name NOT LIKE 'sqlite_%' ORDER BY name")],
+        'plans': query_plans(conn),
+        'fragmentation': fragmentation(conn),
+        'statistics': statistics_status(conn, counts)
+    }
+    report['recommendations'] = recommendations(report)
+    return report
+
+
+def print_report(report: Dict[str, Any]):
+    print("\nRow counts:")
+    for table, count in report['rows'].items():
+        print(f"  {table}: {count}")
+
+    print("\nText column sizes (bytes):")
+    for table, columns in report['column_sizes'].items():
+        for column, size in sorted(columns.items(), key=lambda item: -item[1]['total_bytes']):
+            print(f"  {table}.{column}: total {size['total_bytes']}, avg {size['avg']}, "
+                  f"p50 {size['p50']}, p95 {size['p95']}, max {size['max']}")
+
+    print("\nAPI query plans:")
+    for plan in report['plans']:
+        if 'error' in plan:
+            print(f"  {plan['query']}: {plan['error']}")
+            continue
+        flags = [flag for flag in ('full_scan', 'temp_sort') if plan[flag]]
+        print(f"  {plan['query']} ({plan['ms']} ms){' [' + ', '.join(flags) + ']' if flags else ''}")
+        for step in plan['plan']:
+            print(f"    {step}")
+
+    pages = report['fragmentation']
+    print(f"\nPages: {pages['pages']} of {pages['page_size']} bytes, {pages['free_pages']} free "
+          f"({pages['free_ratio']:.1%})")
+    if 'objects' in pages:
+        print(f"  Leaf pages out of order: {pages['fragmented_ratio']:.1%}")
+        for name, entry in sorted(pages['objects'].items(), key=lambda item: -item[1]['pages']):
+            print(f"  {name}: {entry['pages']} pages, {entry['fill']:.0%} full, "
+                  f"{entry['out_of_order']} of {entry['leaves']} leaves out of order")
+
+    print("\nStatistics: " + ', '.join(f"{table} {state}" for table, state in report['statistics'].items()))
+    print("\nRecommendations:")
+    for advice in report['recommendations'] or ['None']:
+        print(f"  - {advice}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Report on the health of the SQLite database')
+    parser.add_argument('--db', default=DB_PATH, help=f"Database path (default: {DB_PATH})")
+    parser.add_argument('--json', action='store_true', help='Print the health report as JSON')
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    try:
+        report = health_report(conn)
+    finally:
+        conn.close()
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    check_database(args.db)
+    print_report(report)
+
+
 if __name__ == "__main__":
-    check_database() 
\ No newline at end of file
+    main()
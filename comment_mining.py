@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+"""Bounded selection of comment text for analysis.
+
+The crawler already downloads each submission's comment tree to count
+commenters, and most pain points are written in the replies rather than
+the post. A ``CommentBudget`` caps how much of that tree is analyzed so
+the cost per post stays predictable:
+
+- ``replace_more``: "load more comments" stubs PRAW may expand per post,
+  one request each (0 drops them unfetched, as the async fetcher does),
+- ``max_depth``: deepest reply level analyzed (0 = top-level only),
+- ``max_comments``: comments analyzed per post, highest score first
+  (0 disables comment mining).
+"""
+import configparser
+from typing import Any, Dict, List, NamedTuple
+
+# Bodies of comments that no longer have any text
+EMPTY_BODIES = {'', '[deleted]', '[removed]'}
+
+
+class CommentBudget(NamedTuple):
+    replace_more: int = 0
+    max_depth: int = 2
+    max_comments: int = 20
+
+    @classmethod
+    def from_config(cls, config: configparser.ConfigParser) -> 'CommentBudget':
+        """Read comment_replace_more, comment_max_depth and comment_max_per_post from [CRAWLER]"""
+        section = config['CRAWLER'] if config.has_section('CRAWLER') else {}
+        defaults = cls()
+        return cls(
+            replace_more=int(section.get('comment_replace_more', defaults.replace_more)),
+            max_depth=int(section.get('comment_max_depth', defaults.max_depth)),
+            max_comments=int(section.get('comment_max_per_post', defaults.max_comments))
+        )
+
+
+def praw_comments(submission, budget: CommentBudget) -> List[Dict[str, Any]]:
+    """Comment records of a PRAW submission down to ``budget.max_depth``, best first.
+
+    Must run before anything else reads ``submission.comments`` so that the
+    tree is fetched in "top" order; the records have the fields of
+    reddit_fetch.flatten_comments.
+    """
+    submission.comment_sort = 'top'
+    forest = submission.comments
+    forest.replace_more(limit=budget.replace_more)
+
+    comments = []
+    level = list(forest)
+    for depth in range(budget.max_depth + 1):
+        replies = []
+        for comment in level:
+            # Stubs beyond the replace_more limit are removed, but never trust a partial tree
+            if not hasattr(comment, 'body'):
+                continue
+            comments.append({
+                'id': comment.id,
+                'author': comment.author.name if comment.author else None,
+                'body': comment.body,
+                'score': comment.score,
+                'depth': depth
+            })
+            replies.extend(comment.replies)
+        level = replies
+    return comments
+
+
+def select_comments(comments: List[Dict[str, Any]], budget: CommentBudget) -> List[Dict[str, Any]]:
+    """The highest-scored comments with text, at most ``budget.max_depth`` deep"""
+    candidates = [
+        comment for comment in comments
+        if comment.get('depth', 0) <= budget.max_depth
+        and (comment.get('body') or '').strip() not in EMPTY_BODIES
+    ]
+    candidates.sort(key=lambda comment: -(comment.get('score') or 0))
+    return candidates[:max(0, budget.max_comments)]
@@ -0,0 +1,215 @@
+#!/usr/bin/env python
+"""Lease-based coordination of crawl workers sharing one database.
+
+Every subreddit is a row ("shard") in ``crawl_shards``. A worker claims due
+shards by taking a time-limited lease on them, renews the lease with
+heartbeats while it crawls, and records completion, which schedules the
+next crawl. Leases that are not renewed expire and any other worker can
+take them over. Each claim bumps the shard's ``generation``, a fencing
+token: a worker whose lease was taken over can no longer renew or complete
+it, so its results are discarded instead of being written twice.
+
+Claims run in ``BEGIN IMMEDIATE`` transactions, so SQLite's write lock
+serializes them across processes and hosts without a central scheduler.
+"""
+import configparser
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+SHARDS_TABLE = """
+    CREATE TABLE IF NOT EXISTS crawl_shards (
+        subreddit TEXT PRIMARY KEY,
+        owner TEXT,
+        generation INTEGER NOT NULL DEFAULT 0,
+        lease_expires REAL NOT NULL DEFAULT 0,
+        heartbeat_at REAL,
+        next_due REAL NOT NULL DEFAULT 0,
+        last_completed REAL,
+        attempts INTEGER NOT NULL DEFAULT 0
+    )
+"""
+
+SHARDS_INDEX = "CREATE INDEX IF NOT EXISTS idx_crawl_shards_due ON crawl_shards(next_due)"
+
+
+class Lease(NamedTuple):
+    subreddit: str
+    generation: int
+
+
+def worker_id() -> str:
+    """Identify a worker uniquely across hosts and restarts"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class LeaseCoordinator:
+    """Claim, renew and complete subreddit shards on behalf of one worker"""
+
+    def __init__(self, db, owner: Optional[str] = None, lease_seconds: float = 300,
+                 recrawl_interval: float = 3600, retry_delay: float = 300,
+                 clock: Callable[[], float] = time.time):
+        self.db = db
+        self.owner = owner or worker_id()
+        self.lease_seconds = lease_seconds
+        self.recrawl_interval = recrawl_interval
+        self.retry_delay = retry_delay
+        self.clock = clock
+        self.db.execute(SHARDS_TABLE)
+        self.db.execute(SHARDS_INDEX)
+        self.db.commit()
+
+    @classmethod
+    def from_config(cls, db, path: str = 'config.ini', owner: Optional[str] = None) -> 'LeaseCoordinator':
+        """Build a coordinator from the [SHARDING] section of the config file"""
+        config = configparser.ConfigParser()
+        config.read(path)
+        section = config['SHARDING'] if config.has_section('SHARDING') else {}
+        return cls(
+            db, owner,
+            lease_seconds=float(section.get('lease_seconds', 300)),
+            recrawl_interval=float(section.get('recrawl_interval', 3600)),
+            retry_delay=float(section.get('retry_delay', 300))
+        )
+
+    def register(self, subreddits: List[str]) -> int:
+        """Add shards for subreddits not seen before; returns how many were added"""
+        before = self.db.total_changes
+        self.db.executemany(
+            "INSERT OR IGNORE INTO crawl_shards (subreddit) VALUES (?)",
+            ((name,) for name in subreddits)
+        )
+        self.db.commit()
+        return self.db.total_changes - before
+
+    def claim(self, limit: int = 1) -> List[Lease]:
+        """Lease up to ``limit`` due shards that are free or whose lease expired"""
+        now = self.clock()
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            rows = self.db.execute("""
+                UPDATE crawl_shards
+                SET owner = ?, generation = generation + 1, lease_expires = ?,
+                    heartbeat_at = ?, attempts = attempts + 1
+                WHERE subreddit IN (
+                    SELECT subreddit FROM crawl_shards
+                    WHERE next_due <= ? AND (owner IS NULL OR lease_expires < ?)
+                    ORDER BY next_due
+                    LIMIT ?
+                )
+                RETURNING subreddit, generation, attempts
+            """, (self.owner, now + self.lease_seconds, now, now, now, limit)).fetchall()
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        for subreddit, _, attempts in rows:
+            if attempts > 1:
+                logging.info(f"{self.owner} took over r/{subreddit} (attempt {attempts})")
+        return [Lease(subreddit, generation) for subreddit, generation, _ in rows]
+
+    def renew(self, lease: Lease, db=None) -> bool:
+        """Extend a lease; False once it has been taken over"""
+        db = db or self.db
+        now = self.clock()
+        cursor = db.execute("""
+            UPDATE crawl_shards SET lease_expires = ?, heartbeat_at = ?
+            WHERE subreddit = ? AND owner = ? AND generation = ?
+        """, (now + self.lease_seconds, now, lease.subreddit, self.owner, lease.generation))
+        db.commit()
+        return cursor.rowcount == 1
+
+    def owns(self, lease: Lease) -> bool:
+        """Whether the lease is still held; call inside the transaction that writes results"""
+        row = self.db.execute(
+            "SELECT 1 FROM crawl_shards WHERE subreddit = ? AND owner = ? AND generation = ?",
+            (lease.subreddit, self.owner, lease.generation)
+        ).fetchone()
+        return row is not None
+
+    def complete(self, lease: Lease, next_due: Optional[float] = None, commit: bool = True) -> bool:
+        """Release a finished shard and schedule its next crawl"""
+        now = self.clock()
+        cursor = self.db.execute("""
+            UPDATE crawl_shards
+            SET owner = NULL, lease_expires = 0, heartbeat_at = NULL, attempts = 0,
+                last_completed = ?, next_due = ?
+            WHERE subreddit = ? AND owner = ? AND generation = ?
+        """, (now, next_due if next_due is not None else now + self.recrawl_interval,
+              lease.subreddit, self.owner, lease.generation))
+        if commit:
+            self.db.commit()
+        return cursor.rowcount == 1
+
+    def release(self, lease: Lease) -> bool:
+        """Give a shard back after a failed crawl so it is retried after ``retry_delay``"""
+        cursor = self.db.execute("""
+            UPDATE crawl_shards
+            SET owner = NULL, lease_expires = 0, heartbeat_at = NULL, next_due = ?
+            WHERE subreddit = ? AND owner = ? AND generation = ?
+        """, (self.clock() + self.retry_delay, lease.subreddit, self.owner, lease.generation))
+        self.db.commit()
+        return cursor.rowcount == 1
+
+    def next_due_in(self) -> Optional[float]:
+        """Seconds until the next shard becomes claimable, or None if there are none"""
+        row = self.db.execute(
+            "SELECT MIN(MAX(next_due, CASE WHEN owner IS NULL THEN 0 ELSE lease_expires END)) FROM crawl_shards"
+        ).fetchone()
+        return None if row[0] is None else max(0.0, row[0] - self.clock())
+
+    def status(self) -> Dict[str, int]:
+        now = self.clock()
+        row = self.db.execute("""
+            SELECT COUNT(*),
+                   SUM(owner IS NOT NULL AND lease_expires >= ?),
+                   SUM(owner IS NOT NULL AND lease_expires < ?),
+                   SUM(owner IS NULL AND next_due <= ?)
+            FROM crawl_shards
+        """, (now, now, now)).fetchone()
+        return {'shards': row[0], 'leased': row[1] or 0, 'expired': row[2] or 0, 'due': row[3] or 0}
+
+    def heartbeat(self, lease: Lease, db_path: str) -> 'Heartbeat':
+        return Heartbeat(self, lease, db_path)
+
+
+class Heartbeat:
+    """Background thread renewing a lease every third of its duration.
+
+    It uses its own connection, since SQLite connections are not shared
+    between threads. ``lost`` is set once the lease has been taken over.
+    """
+
+    def __init__(self, coordinator: LeaseCoordinator, lease: Lease, db_path: str):
+        self.coordinator = coordinator
+        self.lease = lease
+        self.db_path = db_path
+        self.lost = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        db = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            while not self._stopped.wait(self.coordinator.lease_seconds / 3):
+                if not self.coordinator.renew(self.lease, db):
+                    logging.warning(f"Lost lease on r/{self.lease.subreddit}")
+                    self.lost.set()
+                    return
+        except sqlite3.Error as e:
+            logging.error(f"Heartbeat for r/{self.lease.subreddit} failed: {e}")
+        finally:
+            db.close()
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stopped.set()
+        self._thread.join()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+"""Adaptive per-subreddit crawl scheduling for the crawler daemon.
+
+Each subreddit is crawled on its own interval. After every crawl the number
+of posts not seen before gives a new-post velocity, smoothed across runs and
+stored in the ``crawl_schedule`` table, and the next interval is chosen so
+that roughly ``target_new_posts`` new posts accumulate between crawls. Busy
+subreddits are polled often, quiet ones rarely.
+"""
+import configparser
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+import schedule
+
+SCHEDULE_TABLE = """
+    CREATE TABLE IF NOT EXISTS crawl_schedule (
+        subreddit TEXT PRIMARY KEY,
+        interval_seconds REAL NOT NULL,
+        posts_per_hour REAL NOT NULL DEFAULT 0,
+        newest_post_utc REAL NOT NULL DEFAULT 0,
+        last_crawl_utc REAL NOT NULL DEFAULT 0
+    )
+"""
+
+
+class CrawlScheduler:
+    """Run ``crawl(subreddit)`` for every subreddit on an adaptive interval.
+
+    ``crawl`` returns the fetched submission records (each with a
+    ``created_utc``); they are only used to measure new-post velocity.
+    """
+
+    def __init__(self, db, crawl: Callable[[str], List[Dict[str, Any]]], subreddits: List[str],
+                 min_interval: float = 300, max_interval: float = 6 * 3600,
+                 initial_interval: float = 1800, target_new_posts: float = 25,
+                 smoothing: float = 0.5, clock: Callable[[], float] = time.time):
+        self.db = db
+        self.crawl = crawl
+        self.subreddits = list(subreddits)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.initial_interval = initial_interval
+        self.target_new_posts = target_new_posts
+        self.smoothing = smoothing
+        self.clock = clock
+        self.scheduler = schedule.Scheduler()
+        self._stopped = threading.Event()
+        self.db.execute(SCHEDULE_TABLE)
+        self.db.commit()
+
+    @classmethod
+    def from_config(cls, db, crawl, subreddits, path: str = 'config.ini') -> 'CrawlScheduler':
+        """Build a scheduler from the [SCHEDULER] section of the config file"""
+        config = configparser.ConfigParser()
+        config.read(path)
+        section = config['SCHEDULER'] if config.has_section('SCHEDULER') else {}
+        return cls(
+            db, crawl, subreddits,
+            min_interval=float(section.get('min_interval', 300)),
+            max_interval=float(section.get('max_interval', 6 * 3600)),
+            initial_interval=float(section.get('initial_interval', 1800)),
+            target_new_posts=float(section.get('target_new_posts', 25))
+        )
+
+    def state(self, subreddit: str) -> Dict[str, float]:
+        row = self.db.execute(
+            "SELECT interval_seconds, posts_per_hour, newest_post_utc, last_crawl_utc "
+            "FROM crawl_schedule WHERE subreddit = ?", (subreddit,)
+        ).fetchone()
+        if row is None:
+            return {'interval_seconds': self.initial_interval, 'posts_per_hour': 0.0,
+                    'newest_post_utc': 0.0, 'last_crawl_utc': 0.0}
+        return dict(zip(['interval_seconds', 'posts_per_hour', 'newest_post_utc', 'last_crawl_utc'], row))
+
+    def observe(self, subreddit: str, records: List[Dict[str, Any]], now: Optional[float] = None) -> float:
+        """Update the subreddit's velocity from a crawl's records and return the next interval"""
+        now = self.clock() if now is None else now
+        state = self.state(subreddit)
+        created = [record['created_utc'] for record in records if record.get('created_utc')]
+        new_posts = [c for c in created if c > state['newest_post_utc']]
+
+        if state['last_crawl_utc']:
+            elapsed = now - state['last_crawl_utc']
+        elif new_posts:
+            # First crawl: the span covered by the listing itself
+            elapsed = now - min(new_posts)
+        else:
+            elapsed = 0
+        if elapsed > 0:
+            velocity = len(new_posts) * 3600 / elapsed
+            if state['last_crawl_utc']:
+                velocity = self.smoothing * velocity + (1 - self.smoothing) * state['posts_per_hour']
+        else:
+            velocity = state['posts_per_hour']
+
+        if velocity > 0:
+            interval = self.target_new_posts * 3600 / velocity
+        else:
+            interval = self.max_interval
+        interval = max(self.min_interval, min(self.max_interval, interval))
+
+        self.db.execute("""
+            INSERT INTO crawl_schedule (subreddit, interval_seconds, posts_per_hour, newest_post_utc, last_crawl_utc)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(subreddit) DO UPDATE SET
+                interval_seconds = excluded.interval_seconds,
+                posts_per_hour = excluded.posts_per_hour,
+                newest_post_utc = excluded.newest_post_utc,
+                last_crawl_utc = excluded.last_crawl_utc
+        """, (subreddit, interval, velocity, max(created + [state['newest_post_utc']]), now))
+        self.db.commit()
+        logging.info(f"r/{subreddit}: {len(new_posts)} new posts, {velocity:.1f}/h, next crawl in {interval:.0f}s")
+        return interval
+
+    def _schedule(self, subreddit: str, delay: float):
+        self.scheduler.every(max(1, int(delay))).seconds.do(self.run_subreddit, subreddit).tag(subreddit)
+
+    def run_subreddit(self, subreddit: str):
+        """Crawl one subreddit and reschedule it on its new interval"""
+        try:
+            records = self.crawl(subreddit)
+            interval = self.observe(subreddit, records)
+        except Exception as e:
+            logging.error(f"Error crawling subreddit {subreddit}: {e}")
+            interval = self.state(subreddit)['interval_seconds']
+        self._schedule(subreddit, interval)
+        return schedule.CancelJob
+
+    def start(self):
+        """Schedule every subreddit, resuming the intervals saved by previous runs"""
+        now = self.clock()
+        for subreddit in self.subreddits:
+            state = self.state(subreddit)
+            due = state['last_crawl_utc'] + state['interval_seconds']
+            self._schedule(subreddit, due - now if state['last_crawl_utc'] else 0)
+
+    def run_forever(self, poll_seconds: float = 1.0):
+        """Run due crawls until stop() is called"""
+        self.start()
+        logging.info(f"Crawl daemon scheduling {len(self.subreddits)} subreddits")
+        while not self._stopped.is_set():
+            self.scheduler.run_pending()
+            idle = self.scheduler.idle_seconds
+            self._stopped.wait(poll_seconds if idle is None else max(0, min(poll_seconds, idle)))
+        self.scheduler.clear()
+        logging.info("Crawl daemon stopped")
+
+    def stop(self):
+        self._stopped.set()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+import configparser
+import threading
+from contextlib import nullcontext
+from typing import List, Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from rate_limit import RateLimiter
+
+DEFAULT_PROXY = 'socks5h://localhost:9150'
+DEFAULT_POOL_SIZE = 10
+
+# Only these hosts are sent through the configured proxy
+REDDIT_HOSTS = ['www.reddit.com', 'oauth.reddit.com', 'reddit.com']
+
+
+class CountingAdapter(HTTPAdapter):
+    """HTTPAdapter that remembers every connection pool it creates.
+
+    urllib3 pools count the connections they open and the requests they
+    serve, so keeping a reference to each pool (including pools later
+    evicted from the pool manager) is enough to derive reuse statistics.
+    With a ``limiter``, every request first takes a token from it and every
+    response's rate-limit headers are fed back into it.
+    """
+
+    def __init__(self, *args, limiter: Optional[RateLimiter] = None, **kwargs):
+        self.pools = []
+        self._tracked = set()
+        self.limiter = limiter
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        if self.limiter is None:
+            return super().send(request, **kwargs)
+        self.limiter.acquire()
+        try:
+            response = super().send(request, **kwargs)
+        finally:
+            self.limiter.release()
+        self.limiter.update(response.headers, response.status_code)
+        return response
+
+    def _track(self, manager):
+        if id(manager) in self._tracked:
+            return
+        self._tracked.add(id(manager))
+        new_pool = manager._new_pool
+
+        def _new_pool(scheme, host, port, request_context=None):
+            pool = new_pool(scheme, host, port, request_context)
+            self.pools.append(pool)
+            return pool
+
+        manager._new_pool = _new_pool
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self._track(self.poolmanager)
+
+    def proxy_manager_for(self, proxy, **proxy_kwargs):
+        manager = super().proxy_manager_for(proxy, **proxy_kwargs)
+        self._track(manager)
+        return manager
+
+
+class CrawlerTransport:
+    """Pooled keep-alive HTTP sessions for crawler traffic.
+
+    Each worker thread gets its own ``requests.Session`` (sessions are not
+    thread-safe) with a connection pool of ``pool_size`` connections per
+    host. The proxy, when set, is only applied to Reddit hosts so that the
+    rest of the process keeps using direct connections. A ``limiter``, when
+    given, budgets the requests of all sessions together.
+    """
+
+    def __init__(self, proxy: Optional[str] = DEFAULT_PROXY, pool_size: int = DEFAULT_POOL_SIZE,
+                 user_agent: Optional[str] = None, proxy_hosts: Optional[List[str]] = None,
+                 limiter: Optional[RateLimiter] = None):
+        self.proxy = proxy or None
+        self.limiter = limiter
+        self.pool_size = max(1, int(pool_size))
+        self.user_agent = user_agent
+        self.proxy_hosts = proxy_hosts if proxy_hosts is not None else REDDIT_HOSTS
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._adapters = []
+
+    @classmethod
+    def from_config(cls, path: str = 'config.ini', user_agent: Optional[str] = None) -> 'CrawlerTransport':
+        """Build a transport from the [CRAWLER] section of the config file"""
+        config = configparser.ConfigParser()
+        config.read(path)
+        crawler_config = config['CRAWLER'] if config.has_section('CRAWLER') else {}
+        if user_agent is None and config.has_section('REDDIT'):
+            user_agent = config['REDDIT'].get('user_agent')
+
+        return cls(
+            proxy=crawler_config.get('proxy', DEFAULT_PROXY),
+            pool_size=int(crawler_config.get('pool_size', DEFAULT_POOL_SIZE)),
+            user_agent=user_agent,
+            limiter=RateLimiter.from_config(path)
+        )
+
+    def proxies(self) -> Dict[str, str]:
+        """Per-host proxy mapping scoped to Reddit"""
+        if not self.proxy:
+            return {}
+        return {
+            f"{scheme}://{host}": self.proxy
+            for host in self.proxy_hosts for scheme in ('http', 'https')
+        }
+
+    def new_session(self) -> requests.Session:
+        """Create a pooled keep-alive session"""
+        session = requests.Session()
+        adapter = CountingAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size,
+                                  limiter=self.limiter)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        session.proxies.update(self.proxies())
+        session.headers['Connection'] = 'keep-alive'
+        if self.user_agent:
+            session.headers['User-Agent'] = self.user_agent
+        with self._lock:
+            self._adapters.append(adapter)
+        return session
+
+    def session(self) -> requests.Session:
+        """Return the session owned by the calling worker thread"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self.new_session()
+            self._local.session = session
+        return session
+
+    def priority(self, level: int):
+        """Context manager tagging this thread's requests with a rate-limit priority"""
+        return self.limiter.priority(level) if self.limiter else nullcontext()
+
+    def is_proxied(self, url: str) -> bool:
+        """Whether requests to ``url`` go through the proxy"""
+        return bool(self.proxy) and urlparse(url).hostname in self.proxy_hosts
+
+    def stats(self) -> Dict[str, int]:
+        """Connection reuse and TLS handshake counters across all sessions"""
+        with self._lock:
+            pools = [pool for adapter in self._adapters for pool in adapter.pools]
+        requests_made = sum(pool.num_requests for pool in pools)
+        connections = sum(pool.num_connections for pool in pools)
+        return {
+            'sessions': len(self._adapters),
+            'requests': requests_made,
+            'connections': connections,
+            'reused_connections': max(0, requests_made - connections),
+            'tls_handshakes': sum(
+                pool.num_connections for pool in pools if pool.scheme == 'https'
+            )
+        }
@@ -0,0 +1,311 @@
+#!/usr/bin/env python
+"""Persistent sparse document-term matrix of the crawled corpus.
+
+Submissions are tokenized once, when they are crawled, and appended as a
+CSR segment of ``.npy`` arrays that later jobs memory-map instead of
+re-vectorizing text. The vocabulary is an append-only file whose line
+numbers are the column ids, so a column never changes meaning and old
+segments stay valid as it grows. A small SQLite index maps submissions,
+topics and creation times to (segment, row) for selecting history.
+
+Layout under the store directory::
+
+    vocabulary.txt            one term per line
+    index.db                  segments, docs and doc_topics tables
+    segments/000001.indptr.npy, .indices.npy, .data.npy
+"""
+import logging
+import os
+import pathlib
+import sqlite3
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import analysis_backends
+
+INDEX_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS segments (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        rows INTEGER NOT NULL,
+        vocab_size INTEGER NOT NULL,
+        created_min REAL,
+        created_max REAL,
+        written_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE IF NOT EXISTS docs (
+        doc_id TEXT PRIMARY KEY,
+        segment INTEGER NOT NULL,
+        row INTEGER NOT NULL,
+        subreddit TEXT,
+        created_utc REAL
+    );
+    CREATE INDEX IF NOT EXISTS idx_docs_created ON docs(created_utc);
+    CREATE TABLE IF NOT EXISTS doc_topics (
+        topic TEXT NOT NULL,
+        segment INTEGER NOT NULL,
+        row INTEGER NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_doc_topics_topic ON doc_topics(topic);
+"""
+
+ARRAYS = ['indptr', 'indices', 'data']
+
+
+def parse_time(value: Any) -> Optional[float]:
+    """Accept epoch seconds or an ISO date/time (UTC) and return epoch seconds"""
+    if value is None or value == '':
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        parsed = datetime.fromisoformat(str(value))
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed.timestamp()
+
+
+class DTMStore:
+    """Append-only corpus matrix with a stable vocabulary.
+
+    ``read_only`` opens an existing store for load/cluster without creating
+    directories or the index (sqlite3.OperationalError if there is none).
+    """
+
+    def __init__(self, path: str, read_only: bool = False):
+        self.path = path
+        self.read_only = read_only
+        index_path = os.path.join(path, 'index.db')
+        if read_only:
+            self.index = sqlite3.connect(f"{pathlib.Path(index_path).absolute().as_uri()}?mode=ro",
+                                         uri=True, timeout=30)
+        else:
+            os.makedirs(os.path.join(path, 'segments'), exist_ok=True)
+            self.index = sqlite3.connect(index_path, timeout=30)
+            self.index.executescript(INDEX_SCHEMA)
+            self.index.commit()
+        self.vocabulary_path = os.path.join(path, 'vocabulary.txt')
+        self.terms = []
+        self._term_ids = {}
+        self._vocabulary_offset = 0
+        self._segments = {}
+        self._analyzer = None
+
+    def _refresh_vocabulary(self):
+        """Read terms appended to the vocabulary file since the last refresh"""
+        if not os.path.exists(self.vocabulary_path):
+            return
+        with open(self.vocabulary_path, 'r', encoding='utf-8') as f:
+            f.seek(self._vocabulary_offset)
+            while True:
+                line = f.readline()
+                # A line without its newline is still being written by another process
+                if not line.endswith('\n'):
+                    break
+                term = line[:-1]
+                self._term_ids[term] = len(self.terms)
+                self.terms.append(term)
+                self._vocabulary_offset = f.tell()
+
+    def analyzer(self):
+        """The tokenizer used for every segment (same rules as the LDA clustering)"""
+        if self._analyzer is None:
+            CountVectorizer, _ = analysis_backends.get('topic_model')
+            self._analyzer = CountVectorizer(stop_words='english').build_analyzer()
+        return self._analyzer
+
+    def append(self, docs: Iterable[Dict[str, Any]]) -> int:
+        """Vectorize and append documents not stored yet; returns the rows written.
+
+        Each doc has ``id``, ``text`` and optionally ``subreddit``,
+        ``created_utc`` and ``topics``. The index write lock is held
+        throughout, so concurrent crawlers extend the vocabulary one at a time.
+        """
+        np = analysis_backends.get('numpy')
+        docs = list(docs)
+        if not docs:
+            return 0
+        analyzer = self.analyzer()
+
+        self.index.execute("BEGIN IMMEDIATE")
+        try:
+            known = set()
+            ids = [doc['id'] for doc in docs]
+            for i in range(0, len(ids), 500):
+                chunk = ids[i:i + 500]
+                known.update(row[0] for row in self.index.execute(
+                    f"SELECT doc_id FROM docs WHERE doc_id IN ({','.join('?' * len(chunk))})", chunk))
+            fresh, seen = [], set(known)
+            for doc in docs:
+                if doc['id'] not in seen:
+                    seen.add(doc['id'])
+                    fresh.append(doc)
+            if not fresh:
+                self.index.rollback()
+                return 0
+
+            self._refresh_vocabulary()
+            first_new_term = len(self.terms)
+            indptr, indices, data = [0], [], []
+            for doc in fresh:
+                for term, count in Counter(analyzer(doc['text'])).items():
+                    term_id = self._term_ids.get(term)
+                    if term_id is None:
+                        term_id = self._term_ids[term] = len(self.terms)
+                        self.terms.append(term)
+                    indices.append(term_id)
+                    data.append(count)
+                indptr.append(len(indices))
+
+            if len(self.terms) > first_new_term:
+                with open(self.vocabulary_path, 'a', encoding='utf-8') as f:
+                    f.writelines(term + '\n' for term in self.terms[first_new_term:])
+                    f.flush()
+                    os.fsync(f.fileno())
+                    self._vocabulary_offset = f.tell()
+
+            created = [doc.get('created_utc') for doc in fresh if doc.get('created_utc')]
+            segment = self.index.execute(
+                "INSERT INTO segments (rows, vocab_size, created_min, created_max) VALUES (?, ?, ?, ?)",
+                (len(fresh), len(self.terms), min(created, default=None), max(created, default=None))
+            ).lastrowid
+            arrays = {
+                'indptr': np.asarray(indptr, dtype=np.int64),
+                'indices': np.asarray(indices, dtype=np.int32),
+                'data': np.asarray(data, dtype=np.int32)
+            }
+            for name, array in arrays.items():
+                final = self._array_path(segment, name)
+                np.save(final + '.tmp.npy', array)
+                os.replace(final + '.tmp.npy', final)
+
+            self.index.executemany(
+                "INSERT INTO docs (doc_id, segment, row, subreddit, created_utc) VALUES (?, ?, ?, ?, ?)",
+                ((doc['id'], segment, row, doc.get('subreddit'), doc.get('created_utc'))
+                 for row, doc in enumerate(fresh))
+            )
+            self.index.executemany(
+                "INSERT INTO doc_topics (topic, segment, row) VALUES (?, ?, ?)",
+                ((topic, segment, row) for row, doc in enumerate(fresh) for topic in set(doc.get('topics') or []))
+            )
+            self.index.commit()
+        except Exception:
+            self.index.rollback()
+            raise
+        logging.info(f"Appended {len(fresh)} documents to the corpus matrix as segment {segment}")
+        return len(fresh)
+
+    def _array_path(self, segment: int, name: str) -> str:
+        return os.path.join(self.path, 'segments', f"{segment:06d}.{name}.npy")
+
+    def _segment(self, segment: int):
+        """Memory-map one segment as a CSR matrix (arrays are paged in on access)"""
+        if segment not in self._segments:
+            np = analysis_backends.get('numpy')
+            self._segments[segment] = [
+                np.load(self._array_path(segment, name), mmap_mode='r') for name in ARRAYS
+            ]
+        indptr, indices, data = self._segments[segment]
+        sparse = analysis_backends.get('sparse')
+        return sparse.csr_matrix((data, indices, indptr), shape=(len(indptr) - 1, len(self.terms)), copy=False)
+
+    def select(self, topic: Optional[str] = None, since: Optional[float] = None,
+               until: Optional[float] = None, subreddit: Optional[str] = None,
+               limit: Optional[int] = None) -> List[Tuple[int, int, str]]:
+        """(segment, row, doc_id) of the stored documents matching every given filter, newest first"""
+        query = "SELECT d.segment, d.row, d.doc_id FROM docs d"
+        where, params = [], []
+        if topic:
+            query += " JOIN doc_topics t ON t.segment = d.segment AND t.row = d.row"
+            where.append("t.topic = ?")
+            params.append(topic)
+        if since is not None:
+            where.append("d.created_utc >= ?")
+            params.append(since)
+        if until is not None:
+            where.append("d.created_utc < ?")
+            params.append(until)
+        if subreddit:
+            where.append("d.subreddit = ?")
+            params.append(subreddit)
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        query += " ORDER BY d.created_utc DESC"
+        if limit:
+            query += " LIMIT ?"
+            params.append(int(limit))
+        return self.index.execute(query, params).fetchall()
+
+    def load(self, **filters) -> Tuple[Any, List[str]]:
+        """Return the stored rows matching ``filters`` (see select) as one CSR matrix and their doc ids"""
+        sparse = analysis_backends.get('sparse')
+        self._refresh_vocabulary()
+        rows = self.select(**filters)
+        by_segment = {}
+        for segment, row, doc_id in rows:
+            by_segment.setdefault(segment, []).append((row, doc_id))
+
+        parts, doc_ids = [], []
+        for segment in sorted(by_segment):
+            selected = by_segment[segment]
+            parts.append(self._segment(segment)[[row for row, _ in selected]])
+            doc_ids.extend(doc_id for _, doc_id in selected)
+        if not parts:
+            return sparse.csr_matrix((0, len(self.terms))), []
+        return sparse.vstack(parts, format='csr'), doc_ids
+
+    def cluster(self, matrix, n_components: int = 5, min_df: int = 2,
+                max_df: float = 0.95) -> List[Dict[str, Any]]:
+        """LDA topic clusters over rows returned by load(), without touching the source text"""
+        np = analysis_backends.get('numpy')
+        if matrix.shape[0] == 0:
+            return []
+
+        # Same document-frequency pruning as the CountVectorizer used elsewhere
+        doc_freq = np.bincount(matrix.indices, minlength=matrix.shape[1])
+        columns = np.flatnonzero((doc_freq >= min_df) & (doc_freq <= max_df * matrix.shape[0]))
+        if len(columns) == 0:
+            return []
+        matrix = matrix[:, columns]
+
+        _, LatentDirichletAllocation = analysis_backends.get('topic_model')
+        lda = LatentDirichletAllocation(n_components=n_components, random_state=42)
+        doc_topics = lda.fit_transform(matrix)
+        return [
+            {
+                "id": topic_idx,
+                "words": [self.terms[columns[i]] for i in topic.argsort()[:-10 - 1:-1]],
+                "weight": float(doc_topics[:, topic_idx].mean())
+            }
+            for topic_idx, topic in enumerate(lda.components_)
+        ]
+
+    def topic_clusters(self, n_components: int = 5, **filters) -> List[Dict[str, Any]]:
+        """Load the rows matching ``filters`` and cluster them"""
+        matrix, _ = self.load(**filters)
+        return self.cluster(matrix, n_components)
+
+    def stats(self) -> Dict[str, int]:
+        self._refresh_vocabulary()
+        segments, rows = self.index.execute("SELECT COUNT(*), COALESCE(SUM(rows), 0) FROM segments").fetchone()
+        return {'segments': segments, 'documents': rows, 'terms': len(self.terms)}
+
+    def close(self):
+        self._segments.clear()
+        self.index.close()
+
+
+def cluster_store(path: str, n_components: int = 5,
+                  filters: Optional[Dict[str, Any]] = None) -> Tuple[int, List[Dict[str, Any]]]:
+    """Open a store read-only, cluster the rows matching ``filters`` and return (documents, clusters).
+
+    A module-level function so the whole job can run in a worker process.
+    A store the crawler has not written yet has no documents.
+    """
+    if not os.path.exists(os.path.join(path, 'index.db')):
+        return 0, []
+    store = DTMStore(path, read_only=True)
+    try:
+        matrix, doc_ids = store.load(**(filters or {}))
+        return len(doc_ids), store.cluster(matrix, n_components)
+    finally:
+        store.close()
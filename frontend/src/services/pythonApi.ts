@@ -1,5 +1,5 @@
 import axios from 'axios';
-import { PainPoint, AppIdea } from '../types';
+import { PainPoint, AppIdea, OpportunityScores } from '../types';
 
 // Create axios instance with base URL and default config
 const pythonApi = axios.create({
@@ -92,12 +92,7 @@ export const calculateOpportunityScore = async (
   growthRate: number,
   mentionCount: number
 ): Promise<{
-  opportunity_scores: {
-    total_score: number;
-    pain_score: number;
-    growth_score: number;
-    market_score: number;
-  };
+  opportunity_scores: OpportunityScores;
 }> => {
   try {
     const response = await pythonApi.post('/stats/opportunity-score', {
@@ -48,13 +48,14 @@ export interface TrendPoint {
   mentions: number;
 }
 
+// Components of the weighted total computed by scoring.py, each 0-100
 export interface OpportunityScores {
   total_score: number;
-  monetization_score: number;
-  urgency_score: number;
+  pain_score: number;
+  growth_score: number;
   market_score: number;
-  competition_score: number;
   engagement_score: number;
+  urgency_score: number;
 }
 
 export interface DashboardStats {
@@ -1,9 +1,28 @@
 #!/usr/bin/env python
+"""Create the database and fill it with sample topics.
+
+By default ten hand-written topics are inserted. ``--topics N`` generates N
+synthetic topics instead so the API and crawler can be exercised against
+production-sized data: mention counts follow a power law (a few huge
+topics, a long tail), phrase lists grow with a topic's popularity and
+trends cover 3 to 24 months ending today. Apart from those dates the data
+depends only on ``--seed``.
+Millions of rows load in one transaction through batched executemany
+calls, with the reddit_topics indexes dropped during the load and rebuilt
+once at the end.
+
+    python init_db.py --topics 1000000
+"""
+import argparse
+import itertools
+import math
 import os
 import json
 import sqlite3
+import time
 from datetime import datetime, timedelta
 import random
+import scoring
 
 # Ensure data directory exists
 data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
@@ -197,37 +216,197 @@ def generate_trend_data(mention_count, growth_percentage):
     
     return trend_data
 
-# Generate opportunity scores
-def generate_opportunity_scores(mention_count, growth_percentage):
-    # Calculate component scores
-    market_score = min(100, mention_count / 25)
-    growth_score = min(100, growth_percentage * 1.2)
-    competition_score = random.uniform(40, 90)
-    monetization_score = random.uniform(50, 95)
-    engagement_score = random.uniform(60, 95)
-    
-    # Calculate total score (weighted average)
-    total_score = (
-        market_score * 0.25 +
-        growth_score * 0.25 +
-        competition_score * 0.2 +
-        monetization_score * 0.15 +
-        engagement_score * 0.15
-    )
-    
-    return {
-        'total_score': round(total_score, 1),
-        'market_score': round(market_score, 1),
-        'growth_score': round(growth_score, 1),
-        'competition_score': round(competition_score, 1),
-        'monetization_score': round(monetization_score, 1),
-        'engagement_score': round(engagement_score, 1)
+# Synthetic topics for --topics N
+SUBJECTS = [
+    'invoicing', 'crm', 'scheduling', 'backup', 'email marketing', 'time tracking', 'payroll',
+    'project management', 'expense', 'inventory', 'recruiting', 'onboarding', 'customer support',
+    'social media', 'seo', 'bookkeeping', 'contract', 'meal planning', 'habit', 'budget',
+    'note taking', 'password', 'file sharing', 'video editing', 'podcast', 'newsletter',
+    'appointment', 'survey', 'feedback', 'analytics', 'bug tracking', 'code review',
+    'documentation', 'knowledge base', 'translation', 'transcription', 'workout', 'sleep',
+    'language learning', 'tutoring', 'event', 'ticketing', 'fundraising', 'donation',
+    'property management', 'fleet', 'shipping', 'dropshipping', 'subscription', 'billing',
+    'tax', 'compliance', 'security', 'monitoring', 'deployment', 'form builder', 'landing page',
+    'chatbot', 'crm integration', 'lead generation'
+]
+MODIFIERS = [
+    'simple', 'ai', 'open source', 'mobile', 'team', 'freelancer', 'small business', 'enterprise',
+    'self hosted', 'offline', 'automated', 'collaborative', 'privacy focused', 'local', 'remote',
+    'student', 'nonprofit', 'agency', 'cloud', 'minimalist', 'family', 'developer', 'creator',
+    'healthcare', 'restaurant'
+]
+HEADS = ['app', 'tool', 'platform', 'software', 'tracker', 'assistant', 'dashboard', 'service']
+
+PAIN_TEMPLATES = [
+    "I'm frustrated with how expensive {topic} options are.",
+    "Every {topic} I try is missing basic features.",
+    "I hate how hard it is to export data out of my {topic}.",
+    "Our {topic} keeps crashing during the busiest hours.",
+    "The learning curve for any {topic} is way too steep.",
+    "I'm tired of juggling three tools because no {topic} does it all.",
+    "Support for our {topic} takes days to answer anything.",
+    "The {topic} we use has no decent mobile version."
+]
+SOLUTION_TEMPLATES = [
+    "Is there a {topic} that integrates with Slack?",
+    "Looking for a cheap {topic} for a team of five.",
+    "What {topic} do you recommend for a small agency?",
+    "Need a {topic} that works offline.",
+    "Any {topic} with a proper API?"
+]
+IDEA_TEMPLATES = [
+    "A {topic} that sets itself up from your existing spreadsheets.",
+    "An AI-first {topic} that handles the busywork automatically.",
+    "A pay-as-you-go {topic} for freelancers.",
+    "A {topic} built for teams that never meet in person."
+]
+
+# Power-law exponent of mention counts: ~1 gives Zipf's rank-frequency law
+MENTION_ALPHA = 1.1
+MAX_MENTIONS = 250000
+MAX_PHRASES = 40
+BATCH_SIZE = 10000
+
+INSERT_TOPIC = '''
+    INSERT INTO reddit_topics (
+        name, category, mention_count, growth_percentage, pain_points, solution_requests,
+        app_ideas, trend_data, sentiment_scores, engagement_metrics, opportunity_scores,
+        average_budget, created_at, updated_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+
+def synthetic_name(i):
+    """A distinct topic name for every index"""
+    subject = SUBJECTS[i % len(SUBJECTS)]
+    i //= len(SUBJECTS)
+    head = HEADS[i % len(HEADS)]
+    i //= len(HEADS)
+    modifier = MODIFIERS[i % len(MODIFIERS)]
+    variant = i // len(MODIFIERS)
+    name = f"{modifier} {subject} {head}"
+    return f"{name} {variant + 1}" if variant else name
+
+
+def synthetic_phrases(rng, templates, topic, count, frustration=False):
+    texts = [template.format(topic=topic) for template in templates] if count else []
+    phrases = []
+    for _ in range(count):
+        phrase = {'text': rng.choice(texts), 'count': min(500, int(rng.paretovariate(1.5)))}
+        if frustration:
+            phrase['frustration_score'] = round(rng.uniform(40, 98), 1)
+        phrases.append(phrase)
+    return phrases
+
+
+def synthetic_topics(count, seed=42):
+    """Yield ``count`` deterministic, realistically distributed topic payloads"""
+    rng = random.Random(seed)
+    now = datetime.now().replace(microsecond=0)
+    month_labels = {
+        months: [(now - timedelta(days=30 * (months - 1 - i))).strftime('%Y-%m-%d') for i in range(months)]
+        for months in range(3, 25)
     }
+    # A few categories hold most topics, as on Reddit
+    category_weights = [1 / (rank + 1) for rank in range(len(categories))]
+
+    for i in range(count):
+        name = synthetic_name(i)
+        mentions = min(MAX_MENTIONS, int(rng.paretovariate(MENTION_ALPHA) * 5))
+        growth = round(max(-90.0, min(400.0, rng.gauss(20, 40))), 1)
+
+        # Monthly mentions rising (or falling) to the current count
+        months = rng.randint(3, 24)
+        base = mentions / (1 + growth / 100)
+        trend = [
+            {'month': month, 'mentions': max(0, int(base * (1 + (j / (months - 1)) * growth / 100) * rng.uniform(0.85, 1.15)))}
+            for j, month in enumerate(month_labels[months][:-1])
+        ] + [{'month': month_labels[months][-1], 'mentions': mentions}]
+
+        # Popular topics collect more phrases
+        phrases = min(MAX_PHRASES, int(rng.expovariate(1.0) * 2 * (1 + math.log10(mentions))))
+        topic = name.lower()
+        comments = int(mentions * rng.uniform(0.5, 4))
+        created = now - timedelta(days=30 * months * rng.random())
+        yield {
+            'name': name,
+            'category': rng.choices(categories, category_weights)[0],
+            'mention_count': mentions,
+            'growth_percentage': growth,
+            'pain_points': synthetic_phrases(rng, PAIN_TEMPLATES, topic, phrases, frustration=True),
+            'solution_requests': synthetic_phrases(rng, SOLUTION_TEMPLATES, topic, phrases // 2),
+            'app_ideas': synthetic_phrases(rng, IDEA_TEMPLATES, topic, phrases // 3),
+            'trend_data': trend,
+            'sentiment_scores': {
+                'frustration': round(rng.random(), 3),
+                'urgency': round(rng.random() * 0.8, 3),
+                'impact': round(rng.random(), 3)
+            },
+            'engagement_metrics': {
+                'upvotes': int(mentions * rng.uniform(1, 15)),
+                'comments': comments,
+                'unique_users': int(comments * rng.uniform(0.3, 0.9))
+            },
+            'average_budget': round(rng.lognormvariate(5, 1), 2),
+            'created_at': created.strftime('%Y-%m-%d %H:%M:%S'),
+            'updated_at': (created + (now - created) * rng.random()).isoformat()
+        }
+
+
+def topic_rows(topics, weights=None):
+    """INSERT_TOPIC parameters for a batch of topics, scored in one vectorized pass"""
+    dumps = json.JSONEncoder(separators=(',', ':')).encode
+    for topic, scores in zip(topics, scoring.score_topics(topics, weights)):
+        yield (
+            topic['name'], topic['category'], topic['mention_count'], topic['growth_percentage'],
+            dumps(topic['pain_points']), dumps(topic['solution_requests']), dumps(topic['app_ideas']),
+            dumps(topic['trend_data']), dumps(topic['sentiment_scores']), dumps(topic['engagement_metrics']),
+            # Key order of rescore_database's json_object, so a later rescore leaves these rows alone
+            dumps({key: scores[key] for key in
+                   ['total_score', 'pain_score', 'growth_score', 'market_score', 'engagement_score', 'urgency_score']}),
+            topic['average_budget'], topic['created_at'], topic['updated_at']
+        )
+
+
+def seed_topics(conn, count, seed=42, batch_size=BATCH_SIZE, weights=None):
+    """Bulk-insert ``count`` synthetic topics in one transaction.
+
+    The reddit_topics indexes are dropped first and rebuilt from their own
+    definitions after the load: one sort per index instead of millions of
+    random B-tree inserts.
+    """
+    indexes = conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = 'reddit_topics' AND sql IS NOT NULL"
+    ).fetchall()
+    conn.execute("BEGIN")
+    try:
+        for name, _ in indexes:
+            conn.execute(f'DROP INDEX "{name}"')
+        topics = synthetic_topics(count, seed)
+        loaded = 0
+        while loaded < count:
+            batch = list(itertools.islice(topics, batch_size))
+            if not batch:
+                break
+            conn.executemany(INSERT_TOPIC, topic_rows(batch, weights))
+            loaded += len(batch)
+        for _, sql in indexes:
+            conn.execute(sql)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    # Planner statistics for the new data, sampling a bounded number of rows per index
+    conn.execute("PRAGMA analysis_limit = 1000")
+    conn.execute("ANALYZE")
+    conn.commit()
+    return loaded
+
 
 # Initialize database
-def init_db():
+def init_db(topic_count=None, seed=42, path=db_path):
     # Connect to database
-    conn = sqlite3.connect(db_path)
+    conn = sqlite3.connect(path)
     cursor = conn.cursor()
     
     # Read schema file
@@ -237,6 +416,18 @@ def init_db():
     # Execute schema
     cursor.executescript(schema)
     
+    if topic_count is not None:
+        # Index builds sort in memory rather than through temp files
+        conn.execute("PRAGMA cache_size = -262144")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        start = time.perf_counter()
+        loaded = seed_topics(conn, topic_count, seed, weights=scoring.load_weights())
+        elapsed = time.perf_counter() - start
+        conn.close()
+        print(f"Database seeded with {loaded} synthetic topics at {path} "
+              f"in {elapsed:.1f}s ({loaded / max(elapsed, 1e-9):.0f} topics/s)")
+        return
+    
     # Insert sample data
     for topic in topics:
         # Generate additional data
@@ -244,7 +435,6 @@ def init_db():
         solution_requests = generate_solution_requests(topic['name'], topic['category'])
         app_ideas = generate_app_ideas(topic['name'], topic['category'])
         trend_data = generate_trend_data(topic['mention_count'], topic['growth_percentage'])
-        opportunity_scores = generate_opportunity_scores(topic['mention_count'], topic['growth_percentage'])
         
         # Insert into database
         cursor.execute('''
@@ -257,9 +447,8 @@ def init_db():
                 solution_requests,
                 app_ideas,
                 trend_data,
-                opportunity_scores,
                 updated_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
         ''', (
             topic['name'],
             topic['category'],
@@ -269,15 +458,26 @@ def init_db():
             json.dumps(solution_requests),
             json.dumps(app_ideas),
             json.dumps(trend_data),
-            json.dumps(opportunity_scores),
             datetime.now().isoformat()
         ))
     
+    # Score every topic with the same engine the crawler and API use
+    scoring.rescore_database(conn, scoring.load_weights())
+    
     # Commit changes
     conn.commit()
     conn.close()
     
-    print(f"Database initialized with {len(topics)} sample topics at {db_path}")
+    print(f"Database initialized with {len(topics)} sample topics at {path}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Create the database and insert sample topics')
+    parser.add_argument('--topics', type=int, default=None,
+                        help='Generate this many synthetic topics instead of the ten samples')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for --topics (default: 42)')
+    parser.add_argument('--db', default=db_path, help=f"Database path (default: {db_path})")
+    args = parser.parse_args()
+    init_db(args.topics, args.seed, args.db)
 
 if __name__ == "__main__":
-    init_db() 
\ No newline at end of file
+    main()
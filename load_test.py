@@ -0,0 +1,299 @@
+#!/usr/bin/env python
+"""Load-test harness for the Python analysis API.
+
+Starts app.py locally (or targets ``--url``), drives a weighted mix of
+``/api/python/*`` endpoints with synthetic payloads at each concurrency
+level and reports throughput and p50/p95/p99 latency, overall and per
+endpoint. Results are saved as JSON so runs can be compared across
+releases with ``--compare``::
+
+    python load_test.py --concurrency 1,4,16 --duration 20
+    python load_test.py --mix sentiment=1,topics=1 --compare data/loadtest/previous.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import requests
+from noun_chunk_topics import synthetic_texts
+
+DEFAULT_MIX = 'sentiment=4,score=4,scores=1,pain-points=1,topics=1,app-ideas=1,list=2'
+DEFAULT_PORT = 5051
+RESULTS_DIR = 'data/loadtest'
+
+CATEGORIES = ['Productivity', 'Finance', 'Marketing', 'Developer Tools', 'Health']
+PAIN_TEXTS = ['keeping invoices in sync', 'tracking time across clients', 'onboarding new hires',
+              'scheduling posts for several accounts', 'reconciling bank feeds']
+
+# Command that serves app.py on the port given as its last argument
+SERVER_COMMAND = [sys.executable, '-c',
+                  "import sys; from app import app; app.run(host='127.0.0.1', port=int(sys.argv[1]), threaded=True)"]
+
+
+def topic_payload(rng: random.Random) -> Dict[str, Any]:
+    return {
+        'mention_count': rng.randint(1, 500),
+        'growth_percentage': rng.uniform(-20, 120),
+        'pain_points': [{'text': rng.choice(PAIN_TEXTS), 'count': rng.randint(1, 20)}
+                        for _ in range(rng.randint(0, 5))],
+        'engagement_metrics': {'upvotes': rng.randint(0, 2000), 'comments': rng.randint(0, 300),
+                               'unique_users': rng.randint(1, 200)},
+        'sentiment_scores': {'frustration': rng.random(), 'urgency': rng.random(), 'impact': rng.random()}
+    }
+
+
+def texts(rng: random.Random, count: int) -> List[str]:
+    return synthetic_texts(count, seed=rng.randrange(1 << 30))
+
+
+# name -> (method, path, payload factory); payloads vary per request so the response cache rarely hits
+ENDPOINTS: Dict[str, Tuple[str, str, Callable[[random.Random], Any]]] = {
+    'test': ('GET', '/api/python/test', lambda rng: None),
+    'sentiment': ('POST', '/api/python/analyze/sentiment', lambda rng: {'text': texts(rng, 1)[0]}),
+    'topics': ('POST', '/api/python/analyze/topics', lambda rng: {'texts': texts(rng, 40), 'num_topics': 5}),
+    'pain-points': ('POST', '/api/python/analyze/pain-points', lambda rng: {'texts': texts(rng, 20)}),
+    'app-ideas': ('POST', '/api/python/analyze/app-ideas', lambda rng: {
+        'pain_points': [{'text': rng.choice(PAIN_TEXTS), 'count': rng.randint(1, 9)} for _ in range(5)],
+        'category': rng.choice(CATEGORIES)
+    }),
+    'score': ('POST', '/api/python/stats/opportunity-score', topic_payload),
+    'scores': ('POST', '/api/python/stats/opportunity-scores',
+               lambda rng: {'topics': [topic_payload(rng) for _ in range(200)]}),
+    'list': ('GET', '/api/python/topics', lambda rng: {'sort': rng.choice(['score', 'mentions', 'growth']),
+                                                       'limit': 50}),
+}
+
+
+def parse_mix(spec: str) -> List[Tuple[str, float]]:
+    """Parse ``name=weight,...`` into endpoint weights"""
+    mix = []
+    for part in spec.split(','):
+        name, _, weight = part.strip().partition('=')
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint '{name}' (choose from {', '.join(ENDPOINTS)})")
+        mix.append((name, float(weight or 1)))
+    return mix
+
+
+def percentile(values: List[float], p: float) -> float:
+    """Nearest-rank percentile of sorted values"""
+    if not values:
+        return 0.0
+    rank = max(1, int(-(-p * len(values) // 100)))
+    return values[min(rank, len(values)) - 1]
+
+
+def summarize(samples: List[Tuple[str, float, bool]], elapsed: float) -> Dict[str, Any]:
+    """Throughput, error count and latency percentiles (ms) of (endpoint, seconds, ok) samples"""
+    def stats(latencies: List[float], errors: int) -> Dict[str, Any]:
+        latencies = sorted(latencies)
+        return {
+            'requests': len(latencies),
+            'errors': errors,
+            'throughput': round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+            'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+            'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+            'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+            'max_ms': round(latencies[-1] * 1000, 2) if latencies else 0.0
+        }
+
+    by_endpoint = {}
+    for name, latency, ok in samples:
+        by_endpoint.setdefault(name, ([], [0]))
+        by_endpoint[name][0].append(latency)
+        by_endpoint[name][1][0] += not ok
+    summary = stats([latency for _, latency, _ in samples], sum(not ok for _, _, ok in samples))
+    summary['endpoints'] = {name: stats(latencies, errors[0])
+                            for name, (latencies, errors) in sorted(by_endpoint.items())}
+    return summary
+
+
+def send(session, base_url: str, name: str, payload: Any, timeout: float) -> bool:
+    method, path, _ = ENDPOINTS[name]
+    if method == 'GET':
+        response = session.get(base_url + path, params=payload, timeout=timeout)
+    else:
+        response = session.post(base_url + path, json=payload, timeout=timeout)
+    return response.status_code < 400
+
+
+def run_level(base_url: str, mix: List[Tuple[str, float]], concurrency: int, duration: float,
+              max_requests: Optional[int] = None, timeout: float = 60, seed: int = 42) -> Dict[str, Any]:
+    """Drive the mix from ``concurrency`` client threads for ``duration`` seconds (or ``max_requests``)"""
+    names = [name for name, _ in mix]
+    weights = [weight for _, weight in mix]
+    samples, lock = [], threading.Lock()
+    issued = [0]
+    deadline = time.perf_counter() + duration
+
+    def client(index: int):
+        rng = random.Random(seed * 1000 + index)
+        session = requests.Session()
+        while time.perf_counter() < deadline:
+            with lock:
+                if max_requests is not None and issued[0] >= max_requests:
+                    break
+                issued[0] += 1
+            name = rng.choices(names, weights)[0]
+            payload = ENDPOINTS[name][2](rng)
+            start = time.perf_counter()
+            try:
+                ok = send(session, base_url, name, payload, timeout)
+            except requests.RequestException:
+                ok = False
+            latency = time.perf_counter() - start
+            with lock:
+                samples.append((name, latency, ok))
+        session.close()
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(i,), daemon=True) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    summary = summarize(samples, time.perf_counter() - start)
+    summary['concurrency'] = concurrency
+    return summary
+
+
+def warm_up(base_url: str, mix: List[Tuple[str, float]], timeout: float = 120):
+    """One request per endpoint, so model loading does not land in the measured tail"""
+    rng = random.Random(0)
+    with requests.Session() as session:
+        for name, _ in mix:
+            try:
+                send(session, base_url, name, ENDPOINTS[name][2](rng), timeout)
+            except requests.RequestException:
+                pass
+
+
+def wait_until_ready(base_url: str, process: Optional[subprocess.Popen] = None, timeout: float = 60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}")
+        try:
+            if requests.get(base_url + '/api/python/test', timeout=2).ok:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server at {base_url} did not become ready within {timeout}s")
+
+
+def start_server(port: int, command: Optional[List[str]] = None) -> subprocess.Popen:
+    """Serve the API from a child process and wait until it answers"""
+    command = (command or SERVER_COMMAND) + [str(port)]
+    process = subprocess.Popen(command, cwd=os.path.dirname(os.path.abspath(__file__)),
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_until_ready(f"http://127.0.0.1:{port}", process)
+    except Exception:
+        process.kill()
+        raise
+    return process
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """Per-level throughput and p95 changes against a saved run"""
+    previous = {level['concurrency']: level for level in baseline.get('levels', [])}
+    lines = [f"Compared with {baseline.get('revision') or 'baseline'} ({baseline.get('started_at')})"]
+    for level in current['levels']:
+        old = previous.get(level['concurrency'])
+        if old is None:
+            continue
+
+        def change(key):
+            return (level[key] - old[key]) / old[key] * 100 if old[key] else 0.0
+        lines.append(f"  c={level['concurrency']:<4} throughput {change('throughput'):+6.1f}%  "
+                     f"p95 {change('p95_ms'):+6.1f}%  p99 {change('p99_ms'):+6.1f}%")
+    return lines
+
+
+def format_level(level: Dict[str, Any]) -> List[str]:
+    lines = [f"c={level['concurrency']:<4} {level['requests']:6d} req  {level['errors']:4d} err  "
+             f"{level['throughput']:8.2f} req/s  p50 {level['p50_ms']:8.1f}  p95 {level['p95_ms']:8.1f}  "
+             f"p99 {level['p99_ms']:8.1f} ms"]
+    for name, stats in level['endpoints'].items():
+        lines.append(f"       {name:<12} {stats['requests']:6d} req  {stats['errors']:4d} err  "
+                     f"p50 {stats['p50_ms']:8.1f}  p95 {stats['p95_ms']:8.1f}  p99 {stats['p99_ms']:8.1f} ms")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load-test the Python analysis API')
+    parser.add_argument('--url', default=None, help='Test a running server instead of starting app.py')
+    parser.add_argument('--server-command', default=None,
+                        help='Command that serves the API on the port appended to it (default: app.py threaded)')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f"Port for the started server (default: {DEFAULT_PORT})")
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f"Weighted endpoint mix (default: {DEFAULT_MIX})")
+    parser.add_argument('--concurrency', default='1,4,16', help='Comma-separated concurrency levels (default: 1,4,16)')
+    parser.add_argument('--duration', type=float, default=15, help='Seconds per level (default: 15)')
+    parser.add_argument('--requests', type=int, default=None, help='Stop a level after this many requests')
+    parser.add_argument('--timeout', type=float, default=60, help='Per-request timeout in seconds')
+    parser.add_argument('--output', default=None, help=f"Results file (default: {RESULTS_DIR}/<timestamp>.json)")
+    parser.add_argument('--compare', default=None, help='Saved results to compare against')
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    levels = [int(level) for level in args.concurrency.split(',') if level.strip()]
+    process = None
+    if args.url:
+        base_url = args.url.rstrip('/')
+    else:
+        command = args.server_command.split() if args.server_command else None
+        process = start_server(args.port, command)
+        base_url = f"http://127.0.0.1:{args.port}"
+
+    started_at = datetime.now(timezone.utc)
+    try:
+        warm_up(base_url, mix, args.timeout)
+        results = {
+            'started_at': started_at.isoformat(),
+            'revision': git_revision(),
+            'url': base_url,
+            'server_command': args.server_command,
+            'mix': dict(mix),
+            'duration': args.duration,
+            'cpu_count': os.cpu_count(),
+            'python': platform.python_version(),
+            'levels': []
+        }
+        for concurrency in levels:
+            level = run_level(base_url, mix, concurrency, args.duration, args.requests, args.timeout)
+            results['levels'].append(level)
+            print('\n'.join(format_level(level)))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(10)
+
+    output = args.output or os.path.join(RESULTS_DIR, started_at.strftime('%Y%m%dT%H%M%SZ') + '.json')
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Saved results to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            print('\n'.join(compare(results, json.load(f))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+"""Topic extraction from spaCy noun chunks.
+
+The regex in ``text_analysis.extract_potential_topics`` takes every word
+run before a SaaS keyword, so "i have been looking for a good invoicing
+app" becomes a topic. Here a topic is a noun chunk whose head noun is a
+SaaS keyword ("app", "tools", "platform", ...), stripped of determiners,
+pronouns, numbers and generic adjectives and cut to its last few
+modifiers: "invoicing app".
+
+Texts are parsed in batches with ``nlp.pipe``; the NER component is not
+loaded and ``n_process`` spreads batches over worker processes. Run this
+module to compare its throughput with the regex extractor.
+"""
+import argparse
+import itertools
+import os
+import random
+import time
+from typing import Any, Dict, Iterable, List, Optional
+import analysis_backends
+import text_analysis
+from text_store import TextStore
+from topic_keys import GENERIC_MODIFIERS
+
+# Lemmas of the head nouns that make a noun chunk a SaaS topic (as in text_analysis.SAAS_KEYWORDS)
+SAAS_HEAD_NOUNS = {
+    'app', 'platform', 'software', 'tool', 'solution', 'system',
+    'service', 'automation', 'management', 'analytics'
+}
+
+MODIFIER_POS = {'NOUN', 'PROPN', 'ADJ'}
+
+MAX_MODIFIERS = 3
+DEFAULT_BATCH_SIZE = 64
+
+
+def chunk_topic(chunk) -> Optional[str]:
+    """The cleaned topic of a noun chunk, or None if it is not about a SaaS product"""
+    head = chunk.root
+    head_lemma = (head.lemma_ or head.text).lower()
+    if head_lemma not in SAAS_HEAD_NOUNS:
+        return None
+
+    modifiers = []
+    for token in chunk:
+        if token.i >= head.i:
+            break
+        text = token.text.lower()
+        if (token.pos_ not in MODIFIER_POS or token.is_stop or not token.is_alpha
+                or len(text) < 2 or text in GENERIC_MODIFIERS):
+            # Keep only the contiguous run of content words right before the head
+            modifiers = []
+            continue
+        modifiers.append(text)
+    if not modifiers:
+        return None
+    return ' '.join(modifiers[-MAX_MODIFIERS:] + [head_lemma])
+
+
+def doc_topics(doc) -> List[str]:
+    """Distinct noun-chunk topics of a parsed document, in order of appearance"""
+    topics = []
+    for chunk in doc.noun_chunks:
+        topic = chunk_topic(chunk)
+        if topic and topic not in topics:
+            topics.append(topic)
+    return topics
+
+
+def extract_topics(texts: Iterable[str], n_process: int = 1,
+                   batch_size: int = DEFAULT_BATCH_SIZE) -> List[List[str]]:
+    """Noun-chunk topics of every text, parsing them in batches (``n_process=-1``: one per core)"""
+    nlp = analysis_backends.get('spacy')
+    return [
+        doc_topics(doc)
+        for doc in nlp.pipe(texts, n_process=n_process, batch_size=batch_size)
+    ]
+
+
+SUBJECTS = ['invoicing', 'crm', 'scheduling', 'backup', 'email marketing', 'time tracking', 'payroll']
+HEADS = ['app', 'tool', 'platform', 'software', 'service']
+TEMPLATES = [
+    "I have been struggling with our {subject} {head} for months and it keeps crashing.",
+    "Does anyone know a good {subject} {head}? We need something that syncs with Slack.",
+    "We switched to a new {subject} {head} last year. The problem is the pricing.",
+    "What's the best way to automate {subject}? Our current {head} is a nightmare."
+]
+
+
+def synthetic_texts(count: int, seed: int = 42) -> List[str]:
+    """Submission-like texts that mention SaaS products"""
+    rng = random.Random(seed)
+    return [
+        ' '.join(
+            rng.choice(TEMPLATES).format(subject=rng.choice(SUBJECTS), head=rng.choice(HEADS))
+            for _ in range(rng.randint(2, 6))
+        )
+        for _ in range(count)
+    ]
+
+
+def benchmark(texts: List[str], n_process: int = 1, batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[str, Any]:
+    """Docs/sec per core and distinct topics of the regex and spaCy extractors"""
+    start = time.perf_counter()
+    regex_topics = [text_analysis.extract_potential_topics(text) for text in texts]
+    regex_seconds = time.perf_counter() - start
+
+    analysis_backends.get('spacy')  # model load time is not throughput
+    start = time.perf_counter()
+    spacy_topics = extract_topics(texts, n_process, batch_size)
+    spacy_seconds = time.perf_counter() - start
+
+    cores = (os.cpu_count() or 1) if n_process < 0 else max(1, n_process)
+    return {
+        'docs': len(texts),
+        'regex_docs_per_sec': len(texts) / regex_seconds,
+        'regex_topics': len({topic for topics in regex_topics for topic in topics}),
+        'spacy_docs_per_sec': len(texts) / spacy_seconds,
+        'spacy_docs_per_sec_per_core': len(texts) / spacy_seconds / cores,
+        'spacy_topics': len({topic for topics in spacy_topics for topic in topics})
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare regex and spaCy noun-chunk topic extraction throughput')
+    parser.add_argument('--posts', type=int, default=2000, help='Synthetic posts to process (default: 2000)')
+    parser.add_argument('--text-store', default=None, help='Use the crawled texts of this text store instead')
+    parser.add_argument('--processes', type=int, default=1, help='Processes for nlp.pipe (default: 1)')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Texts per nlp.pipe batch')
+    args = parser.parse_args()
+
+    if args.text_store:
+        store = TextStore(args.text_store)
+        texts = [text for _, text in itertools.islice(store.scan(), args.posts)]
+        store.close()
+    else:
+        texts = synthetic_texts(args.posts)
+
+    results = benchmark(texts, args.processes, args.batch_size)
+    print(f"{results['docs']} posts")
+    print(f"  regex:       {results['regex_docs_per_sec']:10.0f} docs/s on 1 core, "
+          f"{results['regex_topics']} distinct topics")
+    print(f"  noun chunks: {results['spacy_docs_per_sec_per_core']:10.0f} docs/s per core "
+          f"({args.processes} processes), {results['spacy_topics']} distinct topics")
+
+
+if __name__ == "__main__":
+    main()
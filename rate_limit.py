@@ -0,0 +1,240 @@
+#!/usr/bin/env python
+"""Request budgeting for crawler traffic.
+
+``RateLimiter`` is a token bucket shared by every worker thread of a
+crawl. Its refill rate starts at the configured requests per minute and is
+then driven by Reddit's ``X-Ratelimit-Remaining``/``X-Ratelimit-Reset``
+headers, spreading whatever budget is left evenly over the rest of the
+window. Listing fetches take precedence over comment expansion, and once
+the window budget runs low comments stop drawing from it altogether.
+"""
+import configparser
+import email.utils
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional
+
+import requests
+
+LISTING = 0
+COMMENTS = 1
+
+# Failures of the connection itself; InvalidURL, MissingSchema, InvalidHeader and
+# the like are requests errors too but fail the same way every time
+TRANSIENT_ERRORS = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)
+
+
+def parse_retry_after(value, default: Optional[float] = None) -> Optional[float]:
+    """Seconds to wait from a Retry-After header, in either delay-seconds or HTTP-date form"""
+    if value is None:
+        return default
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def retry_after(exc: Exception) -> Optional[float]:
+    """The Retry-After delay carried by an HTTP error, if any"""
+    response = getattr(exc, 'response', None)
+    headers = getattr(response, 'headers', None) if response is not None else None
+    return parse_retry_after(headers.get('Retry-After')) if headers is not None else None
+
+
+def is_retryable(exc: Exception) -> bool:
+    """Throttling, server errors and connection failures are worth retrying"""
+    response = getattr(exc, 'response', None)
+    status = getattr(response, 'status_code', None)
+    if status is not None:
+        return status == 429 or status >= 500
+    # prawcore.RequestException wraps the requests error that caused it
+    original = getattr(exc, 'original_exception', None)
+    if isinstance(original, Exception):
+        return is_retryable(original)
+    return isinstance(exc, TRANSIENT_ERRORS)
+
+
+def backoff_delay(attempt: int, base_delay: float = 1.0, max_delay: float = 60.0,
+                  retry_after: Optional[float] = None) -> float:
+    """Exponential backoff with full jitter, or Retry-After plus a little jitter"""
+    if retry_after is not None:
+        return retry_after + random.uniform(0, base_delay)
+    return random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+
+
+def call_with_retries(func: Callable[..., Any], *args, max_retries: int = 4, base_delay: float = 1.0,
+                      max_delay: float = 60.0, sleep: Callable[[float], None] = time.sleep, **kwargs) -> Any:
+    """Call ``func``, retrying retryable failures with jittered backoff"""
+    attempt = 0
+    while True:
+        try:
+            return func(*args, **kwargs)
+        except Exception as e:
+            if attempt >= max_retries or not is_retryable(e):
+                raise
+            delay = backoff_delay(attempt, base_delay, max_delay, retry_after(e))
+            logging.warning(f"Retrying after {type(e).__name__} in {delay:.1f}s (attempt {attempt + 1}/{max_retries})")
+            sleep(delay)
+            attempt += 1
+
+
+class RateLimiter:
+    """Token bucket shared by all crawl workers, fed by rate-limit response headers"""
+
+    def __init__(self, requests_per_minute: float = 100, burst: int = 10, reserve: float = 0.1,
+                 clock: Callable[[], float] = time.monotonic):
+        self.default_rate = requests_per_minute / 60
+        self.rate = self.default_rate
+        self.capacity = max(1, int(burst))
+        self.reserve = reserve
+        self.clock = clock
+        self.tokens = float(self.capacity)
+        self.remaining = None
+        self.window_size = None
+        self.reset_at = None
+        self._last = clock()
+        self._cond = threading.Condition()
+        self._local = threading.local()
+        self._waiting = [0, 0]
+        self.in_flight = 0
+        self.acquired = [0, 0]
+        self.throttled = 0
+        self.waited = 0.0
+
+    @classmethod
+    def from_config(cls, path: str = 'config.ini') -> Optional['RateLimiter']:
+        """Build a limiter from [CRAWLER]; requests_per_minute = 0 disables it"""
+        config = configparser.ConfigParser()
+        config.read(path)
+        section = config['CRAWLER'] if config.has_section('CRAWLER') else {}
+        requests_per_minute = float(section.get('requests_per_minute', 100))
+        if requests_per_minute <= 0:
+            return None
+        return cls(
+            requests_per_minute=requests_per_minute,
+            burst=int(section.get('burst', 10)),
+            reserve=float(section.get('listing_reserve', 0.1))
+        )
+
+    @contextmanager
+    def priority(self, level: int):
+        """Tag the requests made by this thread inside the block with a priority"""
+        previous = getattr(self._local, 'priority', LISTING)
+        self._local.priority = level
+        try:
+            yield
+        finally:
+            self._local.priority = previous
+
+    def _refill(self, now: float):
+        if self.reset_at is not None and now >= self.reset_at:
+            # New window: back to the configured rate with a full bucket
+            self.rate = self.default_rate
+            self.remaining = self.window_size = self.reset_at = None
+            self.tokens = float(self.capacity)
+        else:
+            self.tokens = min(self.capacity, self.tokens + (now - self._last) * self.rate)
+            if self.remaining is not None:
+                self.tokens = min(self.tokens, self.remaining)
+        self._last = now
+
+    def _low_budget(self) -> bool:
+        return (self.remaining is not None and self.window_size is not None
+                and self.remaining <= self.reserve * self.window_size)
+
+    def _wait_time(self, now: float, priority: int) -> float:
+        waits = []
+        if self.reset_at is not None:
+            waits.append(self.reset_at - now)
+        if priority == LISTING or not self._low_budget():
+            if self.rate > 0:
+                waits.append((1 - self.tokens) / self.rate)
+        return max(0.01, min(waits + [1.0]))
+
+    def acquire(self, priority: Optional[int] = None, timeout: Optional[float] = None) -> bool:
+        """Block until the request may be sent; False if ``timeout`` expires first"""
+        if priority is None:
+            priority = getattr(self._local, 'priority', LISTING)
+        start = self.clock()
+        with self._cond:
+            self._waiting[priority] += 1
+            try:
+                while True:
+                    now = self.clock()
+                    self._refill(now)
+                    if self.tokens >= 1 and (priority == LISTING or (
+                            not self._waiting[LISTING] and not self._low_budget())):
+                        self.tokens -= 1
+                        self.in_flight += 1
+                        if self.remaining is not None:
+                            self.remaining -= 1
+                        self.acquired[priority] += 1
+                        self.waited += now - start
+                        return True
+                    wait = self._wait_time(now, priority)
+                    if timeout is not None:
+                        if now - start >= timeout:
+                            return False
+                        wait = min(wait, timeout - (now - start))
+                    self._cond.wait(wait)
+            finally:
+                self._waiting[priority] -= 1
+                self._cond.notify_all()
+
+    def release(self):
+        """Mark a request taken with acquire() as completed"""
+        with self._cond:
+            self.in_flight = max(0, self.in_flight - 1)
+
+    def update(self, headers, status: Optional[int] = None):
+        """Resynchronize the bucket with the server's view of the budget.
+
+        Requests still in flight were not yet counted by the server, so they
+        are subtracted from the remaining budget it reports.
+        """
+        now = self.clock()
+        with self._cond:
+            if status == 429:
+                self.throttled += 1
+            try:
+                remaining = float(headers['X-Ratelimit-Remaining'])
+                reset = float(headers['X-Ratelimit-Reset'])
+                used = float(headers.get('X-Ratelimit-Used', 0))
+            except (KeyError, TypeError, ValueError):
+                if status == 429:
+                    # Throttled without headers: stop until Retry-After or a second passes
+                    pause = parse_retry_after(headers.get('Retry-After')) or 1.0
+                    self.remaining, self.reset_at, self.rate, self.tokens = 0, now + pause, 0.0, 0.0
+                return
+            self._refill(now)
+            reset = max(reset, 1.0)
+            self.window_size = remaining + used
+            remaining -= self.in_flight
+            self.remaining = remaining
+            self.reset_at = now + reset
+            # Spread what is left of the window evenly over the time until it resets
+            self.rate = max(remaining, 0) / reset
+            self.tokens = min(self.tokens, max(remaining, 0))
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                'listing_requests': self.acquired[LISTING],
+                'comment_requests': self.acquired[COMMENTS],
+                'throttled': self.throttled,
+                'waited_seconds': round(self.waited, 3),
+                'requests_per_minute': round(self.rate * 60, 2),
+                'remaining': self.remaining
+            }
@@ -0,0 +1,220 @@
+#!/usr/bin/env python
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
+from rate_limit import LISTING, COMMENTS, call_with_retries, is_retryable
+
+REDDIT_OAUTH_URL = 'https://oauth.reddit.com'
+REDDIT_TOKEN_URL = 'https://www.reddit.com/api/v1/access_token'
+
+
+def submission_record(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a raw Reddit t3 payload into a plain submission record"""
+    return {
+        'id': data.get('id'),
+        'subreddit': data.get('subreddit'),
+        'author': data.get('author'),
+        'title': data.get('title', ''),
+        'selftext': data.get('selftext', ''),
+        'score': data.get('score', 0),
+        'num_comments': data.get('num_comments', 0),
+        'created_utc': data.get('created_utc', 0),
+        'comments': []
+    }
+
+
+def flatten_comments(children: List[Dict[str, Any]], depth: int = 0) -> List[Dict[str, Any]]:
+    """Flatten a Reddit comment listing into plain comment records"""
+    comments = []
+    for child in children:
+        # 'more' stubs need an extra round trip each, so they are not expanded here
+        if child.get('kind') != 't1':
+            continue
+        data = child.get('data', {})
+        comments.append({
+            'id': data.get('id'),
+            'author': data.get('author'),
+            'body': data.get('body', ''),
+            'score': data.get('score', 0),
+            'depth': depth
+        })
+        replies = data.get('replies')
+        if isinstance(replies, dict):
+            comments.extend(flatten_comments(replies['data']['children'], depth + 1))
+    return comments
+
+
+def engagement_from_record(record: Dict[str, Any]) -> Dict[str, int]:
+    """Compute engagement metrics from a submission record and its comments"""
+    unique_users = {
+        comment['author'] for comment in record['comments']
+        if comment.get('author') and comment['author'] != '[deleted]'
+    }
+    return {
+        "upvotes": record['score'],
+        "comments": record['num_comments'],
+        "unique_users": len(unique_users)
+    }
+
+
+class AsyncRedditFetcher:
+    """Fetch subreddit listings and comment trees concurrently.
+
+    Requests are issued from a thread pool driven by an asyncio event loop, so
+    the number of round trips in flight is bounded by ``concurrency`` rather
+    than serialized one after another. Each worker thread reuses its own
+    pooled session from ``transport``. Throttled and failed requests are
+    retried with jittered backoff; comment trees are requested at a lower
+    rate-limit priority than listings.
+    """
+
+    def __init__(self, user_agent: str, client_id: Optional[str] = None,
+                 client_secret: Optional[str] = None, base_url: str = REDDIT_OAUTH_URL,
+                 token_url: str = REDDIT_TOKEN_URL, concurrency: int = 8,
+                 timeout: float = 30.0, transport=None, max_retries: int = 4,
+                 retry_base_delay: float = 1.0):
+        self.user_agent = user_agent
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.base_url = base_url.rstrip('/')
+        self.token_url = token_url
+        self.concurrency = max(1, int(concurrency))
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.token = None
+        self.token_expires_at = 0.0
+        self._token_lock = threading.Lock()
+        if transport is None:
+            # Imported here to keep requests out of DataCrawler's import path
+            from crawler_transport import CrawlerTransport
+            transport = CrawlerTransport(proxy=None, user_agent=user_agent)
+        self.transport = transport
+
+    def authenticate(self, rejected: Optional[str] = None) -> Optional[str]:
+        """Return an application-only OAuth token when credentials are configured.
+
+        A new token is requested once the current one has expired, or when
+        ``rejected`` is the current token because the API answered 401 to it.
+        """
+        if not self.client_id:
+            return None
+        with self._token_lock:
+            # A token that differs from the rejected one was refreshed by another thread
+            if self.token and self.token != rejected and time.monotonic() < self.token_expires_at:
+                return self.token
+            response = self.transport.session().post(
+                self.token_url,
+                auth=(self.client_id, self.client_secret),
+                data={'grant_type': 'client_credentials'},
+                headers={'User-Agent': self.user_agent},
+                timeout=self.timeout
+            )
+            response.raise_for_status()
+            payload = response.json()
+            self.token = payload['access_token']
+            self.token_expires_at = time.monotonic() + float(payload.get('expires_in') or 3600)
+            return self.token
+
+    def _get(self, path: str, params: Dict[str, Any], priority: int = LISTING) -> Any:
+        """Perform a blocking GET against the Reddit API, retrying throttled requests"""
+        def send():
+            token = self.authenticate()
+            headers = {'User-Agent': self.user_agent}
+            if token:
+                headers['Authorization'] = f"bearer {token}"
+            with self.transport.priority(priority):
+                response = self.transport.session().get(
+                    f"{self.base_url}{path}",
+                    params=dict(params, raw_json=1),
+                    headers=headers,
+                    timeout=self.timeout
+                )
+            return token, response
+
+        def get():
+            token, response = send()
+            if response.status_code == 401 and token:
+                # Revoked or expired early: request a new token and try once more
+                self.authenticate(rejected=token)
+                _, response = send()
+            response.raise_for_status()
+            return response.json()
+
+        return call_with_retries(get, max_retries=self.max_retries, base_delay=self.retry_base_delay)
+
+    async def _request(self, path: str, params: Dict[str, Any], priority: int = LISTING) -> Any:
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self._get, path, params, priority)
+
+    async def fetch_listing(self, subreddit: str, sort: str = 'hot',
+                            limit: int = 100) -> List[Dict[str, Any]]:
+        """Fetch up to ``limit`` submissions from a subreddit listing"""
+        records = []
+        after = None
+        while len(records) < limit:
+            params = {'limit': min(100, limit - len(records))}
+            if after:
+                params['after'] = after
+            listing = await self._request(f"/r/{subreddit}/{sort}", params)
+            children = listing['data']['children']
+            records.extend(
+                submission_record(child['data']) for child in children
+                if child.get('kind') == 't3'
+            )
+            after = listing['data'].get('after')
+            if not after or not children:
+                break
+        return records[:limit]
+
+    async def fetch_comments(self, submission_id: str) -> List[Dict[str, Any]]:
+        """Fetch and flatten the comment tree of a submission"""
+        _, comments = await self._request(f"/comments/{submission_id}", {}, COMMENTS)
+        return flatten_comments(comments['data']['children'])
+
+    async def _attach_comments(self, record: Dict[str, Any]):
+        try:
+            record['comments'] = await self.fetch_comments(record['id'])
+        except Exception as e:
+            logging.warning(f"Error fetching comments for {record['id']}: {e}")
+        record['engagement'] = engagement_from_record(record)
+
+    async def fetch_subreddit(self, subreddit: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """Fetch a listing and then all of its comment trees concurrently"""
+        records = await self.fetch_listing(subreddit, limit=limit)
+        await asyncio.gather(*(self._attach_comments(record) for record in records))
+        return records
+
+    async def fetch_subreddits(self, subreddits: List[str],
+                               limit: int = 100) -> Dict[str, List[Dict[str, Any]]]:
+        """Fetch several subreddits at once, skipping the ones that fail"""
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        results = await asyncio.gather(
+            *(self.fetch_subreddit(name, limit) for name in subreddits),
+            return_exceptions=True
+        )
+        fetched = {}
+        for name, result in zip(subreddits, results):
+            if isinstance(result, Exception):
+                if is_retryable(result):
+                    # Give throttled subreddits one more pass once the rest are done
+                    try:
+                        fetched[name] = await self.fetch_subreddit(name, limit)
+                        continue
+                    except Exception as e:
+                        result = e
+                logging.error(f"Error fetching subreddit {name}: {result}")
+                continue
+            fetched[name] = result
+        return fetched
+
+    def fetch_all(self, subreddits: List[str], limit: int = 100) -> Dict[str, List[Dict[str, Any]]]:
+        """Synchronous entry point used by the crawler"""
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            self._executor = executor
+            self.authenticate()
+            return asyncio.run(self.fetch_subreddits(subreddits, limit))
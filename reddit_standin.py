@@ -0,0 +1,212 @@
+#!/usr/bin/env python
+import json
+import math
+import re
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import List, Dict, Any, Optional
+from urllib.parse import urlparse, parse_qs
+
+
+def generate_posts(subreddit: str, count: int, comments_per_post: int = 3) -> List[Dict[str, Any]]:
+    """Generate deterministic synthetic submissions for a subreddit"""
+    now = time.time()
+    posts = []
+    for i in range(count):
+        posts.append({
+            'id': f"{subreddit.lower()}{i}",
+            'subreddit': subreddit,
+            'author': f"author{i}",
+            'title': f"Looking for a project management tool #{i}",
+            'selftext': "I'm struggling with tracking tasks across teams.",
+            'score': 10 + i,
+            'num_comments': comments_per_post,
+            'created_utc': now - i * 3600,
+            'comments': [
+                {
+                    'id': f"{subreddit.lower()}{i}c{j}",
+                    'author': f"user{j}",
+                    'body': f"I hate how difficult the current tools are ({j}).",
+                    'score': comments_per_post - j,
+                    'replies': []
+                }
+                for j in range(comments_per_post)
+            ]
+        })
+    return posts
+
+
+def _comment_listing(comments: List[Dict[str, Any]]) -> Dict[str, Any]:
+    children = []
+    for comment in comments:
+        data = {k: v for k, v in comment.items() if k != 'replies'}
+        data['replies'] = _comment_listing(comment['replies']) if comment.get('replies') else ''
+        children.append({'kind': 't1', 'data': data})
+    return {'kind': 'Listing', 'data': {'children': children, 'after': None}}
+
+
+class StandinRedditServer:
+    """Local HTTP server imitating the Reddit listing and comment endpoints.
+
+    Every response is delayed by ``latency`` seconds to model a slow link
+    such as Tor. With ``rate_limit=(requests, seconds)`` the server enforces
+    a budget per window like Reddit does, sending X-Ratelimit-* headers and
+    answering 429 once the budget is spent. With ``token_ttl`` set, requests
+    need a bearer token from POST /api/v1/access_token that expires after
+    that many seconds, and are answered 401 otherwise. Use as a context
+    manager; ``base_url`` points at the server.
+    """
+
+    def __init__(self, subreddits: Dict[str, List[Dict[str, Any]]], latency: float = 0.0,
+                 headers: Optional[Dict[str, str]] = None, rate_limit: Optional[tuple] = None,
+                 token_ttl: Optional[float] = None):
+        self.subreddits = subreddits
+        self.latency = latency
+        self.headers = headers or {}
+        self.posts = {
+            post['id']: post for posts in subreddits.values() for post in posts
+        }
+        self.request_count = 0
+        self.rate_limit = rate_limit
+        self.throttled_count = 0
+        self._window_start = time.monotonic()
+        self._window_used = 0
+        self.token_ttl = token_ttl
+        self.tokens = {}
+        self.tokens_issued = 0
+        self.unauthorized_count = 0
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                with standin._lock:
+                    standin.request_count += 1
+                    throttled, limit_headers = standin._spend_budget()
+                    authorized = standin._authorized(self.headers.get('Authorization'))
+                if standin.latency:
+                    time.sleep(standin.latency)
+                if not authorized:
+                    status, payload = 401, {'message': 'Unauthorized', 'error': 401}
+                elif throttled:
+                    status, payload = 429, {'message': 'Too Many Requests', 'error': 429}
+                else:
+                    status, payload = standin.route(self.path)
+                self._reply(status, payload, limit_headers)
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                if urlparse(self.path).path != '/api/v1/access_token':
+                    self._reply(404, {'error': 404})
+                    return
+                self._reply(200, standin.issue_token())
+
+            def _reply(self, status, payload, extra_headers=None):
+                body = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in dict(standin.headers, **(extra_headers or {})).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+    def issue_token(self) -> Dict[str, Any]:
+        """A new access token response, valid for ``token_ttl`` seconds"""
+        with self._lock:
+            self.tokens_issued += 1
+            token = f"token-{self.tokens_issued}"
+            self.tokens[token] = time.monotonic() + (self.token_ttl or 0)
+        return {'access_token': token, 'token_type': 'bearer', 'expires_in': self.token_ttl, 'scope': 'read'}
+
+    def revoke_tokens(self):
+        with self._lock:
+            self.tokens.clear()
+
+    def _authorized(self, header: Optional[str]) -> bool:
+        if self.token_ttl is None:
+            return True
+        token = (header or '').partition(' ')[2]
+        if self.tokens.get(token, 0) > time.monotonic():
+            return True
+        self.unauthorized_count += 1
+        return False
+
+    def _spend_budget(self):
+        """Count a request against the current window, returning (throttled, headers)"""
+        if not self.rate_limit:
+            return False, {}
+        budget, window = self.rate_limit
+        now = time.monotonic()
+        if now >= self._window_start + window:
+            self._window_start, self._window_used = now, 0
+        self._window_used += 1
+        throttled = self._window_used > budget
+        if throttled:
+            self.throttled_count += 1
+        return throttled, {
+            'X-Ratelimit-Used': str(min(self._window_used, budget)),
+            'X-Ratelimit-Remaining': str(max(0, budget - self._window_used)),
+            'X-Ratelimit-Reset': str(max(1, math.ceil(self._window_start + window - now)))
+        }
+
+    def route(self, path: str):
+        """Resolve a request path to a status code and JSON payload"""
+        url = urlparse(path)
+        query = parse_qs(url.query)
+
+        match = re.fullmatch(r'/r/([^/]+)/(hot|new|top)', url.path)
+        if match:
+            posts = self.subreddits.get(match.group(1))
+            if posts is None:
+                return 404, {'error': 404}
+            start = 0
+            if 'after' in query:
+                after_id = query['after'][0].split('_', 1)[-1]
+                start = next(i for i, p in enumerate(posts) if p['id'] == after_id) + 1
+            limit = int(query.get('limit', ['25'])[0])
+            page = posts[start:start + limit]
+            after = f"t3_{page[-1]['id']}" if page and start + limit < len(posts) else None
+            children = [
+                {'kind': 't3', 'data': {k: v for k, v in post.items() if k != 'comments'}}
+                for post in page
+            ]
+            return 200, {'kind': 'Listing', 'data': {'children': children, 'after': after}}
+
+        match = re.fullmatch(r'/comments/([^/]+)', url.path)
+        if match and match.group(1) in self.posts:
+            post = self.posts[match.group(1)]
+            submission = {'kind': 'Listing', 'data': {'children': [
+                {'kind': 't3', 'data': {k: v for k, v in post.items() if k != 'comments'}}
+            ]}}
+            return 200, [submission, _comment_listing(post['comments'])]
+
+        return 404, {'error': 404}
+
+    def __enter__(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Dict, Optional, Tuple
+from flask import request, make_response
+
+
+def canonical_key(route: str, body: Any) -> str:
+    """Hash a route and request body so that equivalent JSON maps to the same key"""
+    if isinstance(body, (bytes, bytearray)):
+        payload = bytes(body)
+    else:
+        payload = json.dumps(body, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    return hashlib.sha256(route.encode('utf-8') + b'\0' + payload).hexdigest()
+
+
+class ResponseCache:
+    """Bounded LRU cache of serialized responses with a time-to-live.
+
+    Memory is capped both by entry count and by the total size of the
+    cached bodies; the least recently used entries are evicted first.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 16 * 1024 * 1024, ttl: float = 60.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def get(self, key: str) -> Optional[Tuple[bytes, str, str]]:
+        """Return (body, etag, mimetype) for a fresh entry, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1:]
+
+    def put(self, key: str, body: bytes, etag: str, mimetype: str):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, body, etag, mimetype)
+            self._size += len(body)
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key)
+        self._size -= len(entry[1])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'not_modified': self.not_modified,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+    def cached(self, view):
+        """Decorator caching successful responses of a Flask view.
+
+        The key is the request path and query string plus a canonical hash of
+        the JSON body. Responses carry an ETag; a matching If-None-Match gets
+        a 304 with no body. NDJSON request bodies bypass the cache.
+        """
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.mimetype == 'application/x-ndjson':
+                # Streamed bodies are never buffered just to compute a cache key
+                return view(*args, **kwargs)
+            body = request.get_json(silent=True)
+            if body is None:
+                body = request.get_data()
+            key = canonical_key(request.full_path, body)
+
+            entry = self.get(key)
+            if entry is None:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200 or response.is_streamed:
+                    return response
+                data = response.get_data()
+                etag = hashlib.sha256(data).hexdigest()[:32]
+                self.put(key, data, etag, response.mimetype)
+            else:
+                data, etag, mimetype = entry
+                response = make_response(data)
+                response.mimetype = mimetype
+
+            if etag in request.if_none_match:
+                with self._lock:
+                    self.not_modified += 1
+                response = make_response('', 304)
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = f"private, max-age={int(self.ttl)}"
+            return response
+
+        return wrapper
@@ -18,6 +18,20 @@ CREATE TABLE IF NOT EXISTS reddit_topics (
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 ); 
 
+-- Sort keys for keyset pagination of the topic listing
+CREATE INDEX IF NOT EXISTS idx_topics_mentions ON reddit_topics(COALESCE(mention_count, -1e300), id);
+CREATE INDEX IF NOT EXISTS idx_topics_growth ON reddit_topics(COALESCE(growth_percentage, -1e300), id);
+CREATE INDEX IF NOT EXISTS idx_topics_score ON reddit_topics(COALESCE(json_extract(opportunity_scores, '$.total_score'), -1e300), id);
+
+-- Topic name variants mapped to the row of their canonical key
+CREATE TABLE IF NOT EXISTS topic_aliases (
+    alias TEXT PRIMARY KEY,
+    key TEXT NOT NULL,
+    topic_id INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_topic_aliases_key ON topic_aliases(key);
+CREATE INDEX IF NOT EXISTS idx_topic_aliases_topic ON topic_aliases(topic_id);
+
 -- User submitted ideas table
 CREATE TABLE IF NOT EXISTS user_submitted_ideas (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+"""Opportunity scoring shared by the crawler, init_db.py and the Flask API.
+
+Scores are computed over whole columns at once with numpy, so re-ranking
+every topic in the database is a single SELECT, one vectorized pass and
+one executemany UPDATE.
+"""
+import configparser
+import logging
+import time
+from typing import Any, Dict, List, Optional
+import analysis_backends
+
+COMPONENTS = ['pain', 'growth', 'market', 'engagement', 'urgency']
+
+DEFAULT_WEIGHTS = {
+    'pain': 0.35,
+    'growth': 0.25,
+    'market': 0.2,
+    'engagement': 0.1,
+    'urgency': 0.1
+}
+
+# Columns needed for scoring, with JSON fields unpacked by SQLite itself
+SCORE_COLUMNS_QUERY = """
+    SELECT
+        id,
+        mention_count,
+        growth_percentage,
+        (SELECT COALESCE(SUM(COALESCE(json_extract(value, '$.count'), 1)), 0)
+         FROM json_each(pain_points)) AS pain_count,
+        COALESCE(json_extract(engagement_metrics, '$.upvotes'), 0) AS upvotes,
+        COALESCE(json_extract(engagement_metrics, '$.comments'), 0) AS comments,
+        COALESCE(json_extract(engagement_metrics, '$.unique_users'), 0) AS unique_users,
+        COALESCE(json_extract(sentiment_scores, '$.urgency'), 0) AS urgency
+    FROM reddit_topics
+"""
+
+
+def load_weights(path: str = 'config.ini') -> Dict[str, float]:
+    """Read component weights from the [SCORING] section, falling back to defaults"""
+    config = configparser.ConfigParser()
+    config.read(path)
+    weights = dict(DEFAULT_WEIGHTS)
+    if config.has_section('SCORING'):
+        for component in COMPONENTS:
+            if component in config['SCORING']:
+                weights[component] = config['SCORING'].getfloat(component)
+    return weights
+
+
+def normalize_weights(weights: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+    """Fill in missing components and scale the weights to sum to 1"""
+    merged = dict(DEFAULT_WEIGHTS)
+    merged.update({k: float(v) for k, v in (weights or {}).items() if k in COMPONENTS})
+    total = sum(merged.values())
+    if total <= 0:
+        raise ValueError("Scoring weights must sum to a positive number")
+    return {k: v / total for k, v in merged.items()}
+
+
+def score_arrays(pain_count, growth, mentions, upvotes, comments, unique_users, urgency,
+                 weights: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """Compute component and total scores (0-100) for columns of topic data"""
+    np = analysis_backends.get('numpy')
+    weights = normalize_weights(weights)
+
+    interactions = (
+        np.asarray(upvotes, dtype=float) +
+        np.asarray(comments, dtype=float) +
+        np.asarray(unique_users, dtype=float)
+    )
+    scores = {
+        'pain': np.minimum(100, np.asarray(pain_count, dtype=float)),
+        'growth': np.clip(np.asarray(growth, dtype=float) * 2, 0, 100),
+        'market': np.minimum(100, np.asarray(mentions, dtype=float) / 10),
+        # Log scale so a single viral thread does not dominate
+        'engagement': np.minimum(100, 25 * np.log10(1 + np.maximum(interactions, 0))),
+        'urgency': np.clip(np.asarray(urgency, dtype=float) * 100, 0, 100)
+    }
+    scores['total'] = sum(scores[c] * weights[c] for c in COMPONENTS)
+    return {name: np.round(values, 1) for name, values in scores.items()}
+
+
+def _topic_columns(topics: List[Dict[str, Any]]) -> Dict[str, List[float]]:
+    columns = {name: [] for name in
+               ['pain_count', 'growth', 'mentions', 'upvotes', 'comments', 'unique_users', 'urgency']}
+    for topic in topics:
+        engagement = topic.get('engagement_metrics') or {}
+        sentiment = topic.get('sentiment_scores') or {}
+        columns['pain_count'].append(sum(p.get('count', 1) for p in topic.get('pain_points', [])))
+        columns['growth'].append(topic.get('growth_rate', topic.get('growth_percentage', 0)) or 0)
+        columns['mentions'].append(topic.get('mention_count', 0) or 0)
+        columns['upvotes'].append(engagement.get('upvotes', 0))
+        columns['comments'].append(engagement.get('comments', 0))
+        columns['unique_users'].append(engagement.get('unique_users', 0))
+        columns['urgency'].append(sentiment.get('urgency', 0))
+    return columns
+
+
+def score_topics(topics: List[Dict[str, Any]],
+                 weights: Optional[Dict[str, float]] = None) -> List[Dict[str, float]]:
+    """Score a list of topic payloads in one vectorized pass, preserving order"""
+    if not topics:
+        return []
+    scores = score_arrays(weights=weights, **_topic_columns(topics))
+    return [
+        {f"{name}_score": float(values[i]) for name, values in scores.items()}
+        for i in range(len(topics))
+    ]
+
+
+def rescore_database(conn, weights: Optional[Dict[str, float]] = None) -> int:
+    """Recompute opportunity_scores for every topic and return the number scored"""
+    np = analysis_backends.get('numpy')
+    start = time.perf_counter()
+    rows = conn.execute(SCORE_COLUMNS_QUERY).fetchall()
+    if not rows:
+        return 0
+
+    data = np.array([tuple(row) for row in rows], dtype=float)
+    ids = data[:, 0].astype(np.int64)
+    scores = score_arrays(
+        pain_count=data[:, 3], growth=data[:, 2], mentions=data[:, 1],
+        upvotes=data[:, 4], comments=data[:, 5], unique_users=data[:, 6],
+        urgency=data[:, 7], weights=weights
+    )
+
+    updates = zip(
+        scores['total'].tolist(), scores['pain'].tolist(), scores['growth'].tolist(),
+        scores['market'].tolist(), scores['engagement'].tolist(), scores['urgency'].tolist(),
+        ids.tolist()
+    )
+    # Rows whose scores did not change are left untouched to avoid page writes
+    conn.executemany("""
+        UPDATE reddit_topics
+        SET opportunity_scores = json_object(
+            'total_score', ?1, 'pain_score', ?2, 'growth_score', ?3,
+            'market_score', ?4, 'engagement_score', ?5, 'urgency_score', ?6
+        )
+        WHERE id = ?7 AND opportunity_scores IS NOT json_object(
+            'total_score', ?1, 'pain_score', ?2, 'growth_score', ?3,
+            'market_score', ?4, 'engagement_score', ?5, 'urgency_score', ?6
+        )
+    """, updates)
+    conn.commit()
+    logging.info(f"Rescored {len(ids)} topics in {time.perf_counter() - start:.3f}s")
+    return len(ids)
@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+"""Production entry point for the Python analysis API.
+
+``app.run(debug=True)`` is a single reloader process. This serves the
+same Flask app from several pre-forked worker processes that accept on one
+shared listening socket:
+
+1. the parent imports app.py and loads every analysis backend once,
+2. it binds the socket and forks ``--workers`` children, which share the
+   loaded models copy-on-write instead of each loading their own,
+3. it restarts children that die and, on SIGTERM/SIGINT, asks them to
+   finish their in-flight requests and exit.
+
+Each child serves requests on threads; LDA fits are handed to the app's
+bounded heavy-analysis executor (HEAVY_WORKERS, HEAVY_QUEUE, HEAVY_TIMEOUT).
+
+    python serve.py --workers 4 --port 5001
+"""
+import argparse
+import logging
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from typing import Callable, Optional
+from werkzeug.serving import make_server
+
+
+def bind(host: str, port: int, backlog: int = 128) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(app, sock: socket.socket, host: str, port: int, on_exit: Optional[Callable[[], None]] = None):
+    """Serve requests in a forked child until the parent asks it to stop"""
+    server = make_server(host, port, app, threaded=True, fd=sock.fileno())
+
+    def stop(signum, frame):
+        # shutdown() waits for serve_forever to return, so it cannot run in this frame
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if on_exit is not None:
+            on_exit()
+
+
+class PreforkServer:
+    """Fork and supervise worker processes sharing one listening socket"""
+
+    def __init__(self, app, sock: socket.socket, host: str, port: int, workers: int,
+                 on_exit: Optional[Callable[[], None]] = None):
+        self.app = app
+        self.on_exit = on_exit
+        self.sock = sock
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.children = {}
+        self.stopping = False
+
+    def spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                run_worker(self.app, self.sock, self.host, self.port, self.on_exit)
+            except Exception:
+                logging.exception("Worker crashed")
+                code = 1
+            finally:
+                os._exit(code)
+        self.children[pid] = time.monotonic()
+        logging.info(f"Started worker {pid}")
+
+    def stop(self, signum=None, frame=None):
+        self.stopping = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        for _ in range(self.workers):
+            self.spawn()
+
+        while self.children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            started = self.children.pop(pid, None)
+            if started is None or self.stopping:
+                continue
+            logging.warning(f"Worker {pid} exited with status {status}, restarting")
+            if time.monotonic() - started < 1:
+                time.sleep(1)  # don't spin if workers die on startup
+            self.spawn()
+        self.sock.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the Python analysis API with pre-forked workers')
+    parser.add_argument('--host', default=os.environ.get('HOST', '127.0.0.1'), help='Interface to bind (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=int(os.environ.get('PORT', 5001)), help='Port (default: 5001)')
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('WEB_WORKERS', 0)) or os.cpu_count() or 1,
+                        help='Worker processes (default: WEB_WORKERS or one per CPU core)')
+    parser.add_argument('--no-warmup', action='store_true', help='Load models lazily in each worker instead')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(process)d %(levelname)s %(message)s')
+    import app as app_module
+    if not args.no_warmup:
+        timings = app_module.warm_up()
+        logging.info(f"Warmed up analysis backends: {timings}")
+
+    sock = bind(args.host, args.port)
+    port = sock.getsockname()[1]  # the one picked for --port 0
+    logging.info(f"Serving on http://{args.host}:{port} with {args.workers} workers")
+    PreforkServer(app_module.app, sock, args.host, port, args.workers,
+                  on_exit=app_module.shutdown_executors).run()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
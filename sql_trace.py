@@ -0,0 +1,219 @@
+#!/usr/bin/env python
+"""Statement latency tracing for SQLite connections.
+
+Connections opened with ``connect(path, query_log)`` time every statement
+from execute through its last fetch and add it to the ``QueryLog`` under
+its SQL text. The connection's trace callback captures the statements
+SQLite actually ran with their bound values inlined, so a slow query is
+logged in a form that can be pasted into ``EXPLAIN QUERY PLAN``.
+
+Tracing is off unless SQL_TRACE is set; SQL_SLOW_MS sets the threshold
+above which a statement is logged as slow.
+"""
+import collections
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+SLOW_QUERY_MS = 100.0
+
+
+def normalize_sql(sql: str) -> str:
+    return ' '.join(sql.split())
+
+
+class QueryLog:
+    """Latency totals per statement and the most recent slow statements"""
+
+    def __init__(self, slow_ms: float = SLOW_QUERY_MS, max_slow: int = 50):
+        self.slow_ms = slow_ms
+        self.slow = collections.deque(maxlen=max_slow)
+        self._statements = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> Optional['QueryLog']:
+        """A log configured by SQL_TRACE and SQL_SLOW_MS, or None when tracing is off"""
+        if os.environ.get('SQL_TRACE', '').lower() in ('', '0', 'false', 'no'):
+            return None
+        return cls(slow_ms=float(os.environ.get('SQL_SLOW_MS', SLOW_QUERY_MS)))
+
+    def record(self, sql: str, seconds: float, statement: Optional[str] = None):
+        """Add one execution of ``sql``; ``statement`` is what SQLite last reported running for it"""
+        key = normalize_sql(sql)
+        ms = seconds * 1000
+        with self._lock:
+            entry = self._statements.get(key)
+            if entry is None:
+                entry = self._statements[key] = {'calls': 0, 'total_ms': 0.0, 'max_ms': 0.0}
+            entry['calls'] += 1
+            entry['total_ms'] += ms
+            entry['max_ms'] = max(entry['max_ms'], ms)
+            if ms < self.slow_ms:
+                return
+            statement = normalize_sql(statement) if statement else key
+            self.slow.append({'sql': statement, 'ms': round(ms, 2), 'at': time.time()})
+        logging.warning(f"Slow query ({ms:.1f} ms): {statement}")
+
+    def stats(self, top: int = 20) -> Dict[str, Any]:
+        """The statements with the most total time, and the recent slow ones"""
+        with self._lock:
+            statements = [
+                {
+                    'sql': sql,
+                    'calls': entry['calls'],
+                    'total_ms': round(entry['total_ms'], 2),
+                    'avg_ms': round(entry['total_ms'] / entry['calls'], 3),
+                    'max_ms': round(entry['max_ms'], 2)
+                }
+                for sql, entry in self._statements.items()
+            ]
+            slow = list(self.slow)
+        statements.sort(key=lambda entry: -entry['total_ms'])
+        return {
+            'queries': sum(entry['calls'] for entry in statements),
+            'slow_ms': self.slow_ms,
+            'statements': statements[:top],
+            'slow': slow
+        }
+
+    def reset(self):
+        with self._lock:
+            self._statements.clear()
+            self.slow.clear()
+
+
+class TracedCursor(sqlite3.Cursor):
+    """Cursor timing each statement until its rows are exhausted or it is discarded"""
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self._sql = None
+        self._statement = None
+        self._elapsed = 0.0
+
+    def _start(self, sql: str):
+        self._finish()
+        self._sql = sql
+        self._elapsed = 0.0
+        self._statement = self.connection.last_statement = None
+
+    def _finish(self):
+        if self._sql is not None:
+            sql, self._sql = self._sql, None
+            self.connection.query_log.record(sql, self._elapsed, self._statement)
+
+    def _timed(self, method, *args):
+        start = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            self._elapsed += time.perf_counter() - start
+            if self._statement is None:
+                self._statement = self.connection.last_statement
+
+    def execute(self, sql, parameters=()):
+        self._start(sql)
+        try:
+            self._timed(super().execute, sql, parameters)
+        finally:
+            if self.description is None:
+                self._finish()
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        self._start(sql)
+        try:
+            self._timed(super().executemany, sql, seq_of_parameters)
+        finally:
+            self._finish()
+        return self
+
+    def executescript(self, sql_script):
+        self._start(sql_script)
+        try:
+            self._timed(super().executescript, sql_script)
+        finally:
+            self._finish()
+        return self
+
+    def fetchone(self):
+        row = self._timed(super().fetchone)
+        if row is None:
+            self._finish()
+        return row
+
+    def fetchmany(self, size=None):
+        size = self.arraysize if size is None else size
+        rows = self._timed(super().fetchmany, size)
+        if len(rows) < size:
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        rows = self._timed(super().fetchall)
+        self._finish()
+        return rows
+
+    def __next__(self):
+        try:
+            return self._timed(super().__next__)
+        except StopIteration:
+            self._finish()
+            raise
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        # conn.execute(...).fetchone() never exhausts the cursor
+        try:
+            self._finish()
+        except Exception:
+            pass
+
+
+class TracedConnection(sqlite3.Connection):
+    """Connection whose cursors report statement latency to ``query_log``"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.query_log = QueryLog()
+        self.last_statement = None
+        self.set_trace_callback(self._trace)
+
+    def _trace(self, statement: str):
+        self.last_statement = statement
+
+    def cursor(self, factory=TracedCursor):
+        return super().cursor(factory)
+
+    # The C shortcuts create plain cursors, bypassing cursor()
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
+
+    def commit(self):
+        start = time.perf_counter()
+        try:
+            super().commit()
+        finally:
+            self.query_log.record('COMMIT', time.perf_counter() - start)
+
+
+def connect(path: str, query_log: Optional[QueryLog] = None, **kwargs) -> sqlite3.Connection:
+    """``sqlite3.connect``, traced into ``query_log`` when one is given"""
+    if query_log is None:
+        return sqlite3.connect(path, **kwargs)
+    conn = sqlite3.connect(path, factory=TracedConnection, **kwargs)
+    conn.query_log = query_log
+    return conn
@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+"""Chunked NDJSON analysis for the bulk /analyze endpoints.
+
+Request bodies are read one line at a time and processed in fixed-size
+chunks, so the texts held in memory at any moment are bounded by the chunk
+size rather than the corpus size. Each chunk's results are emitted as soon
+as they are ready, followed by one merged summary line.
+"""
+import json
+from concurrent.futures import TimeoutError
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+import text_analysis
+from analysis_pool import ExecutorBusy
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+DEFAULT_CHUNK_SIZE = 200
+MAX_CHUNK_SIZE = 5000
+
+# Distinct pain point groups a stream keeps before the rarest are pruned
+DEFAULT_MAX_GROUPS = 10000
+
+
+def iter_ndjson_texts(lines: Iterable[Any]) -> Iterator[str]:
+    """Yield texts from NDJSON lines holding either a JSON string or {"text": ...}"""
+    for number, line in enumerate(lines, 1):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            value = json.loads(line)
+        except ValueError:
+            raise ValueError(f"Line {number} is not valid JSON")
+        if isinstance(value, dict):
+            value = value.get('text')
+        if not isinstance(value, str):
+            raise ValueError(f"Line {number} has no text")
+        yield value
+
+
+def chunked(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def ndjson_line(record: Dict[str, Any]) -> str:
+    return json.dumps(record) + '\n'
+
+
+class PainPointGrouper:
+    """Incrementally group pain point sentences by their first 50 characters.
+
+    Groups keep a running mean of the frustration score. With ``max_groups``
+    set, the least frequent half is dropped whenever more groups exist, so
+    the summary tracks the heavy hitters of an arbitrarily long stream in
+    bounded memory; by default every group is kept and counts are exact.
+    """
+
+    def __init__(self, max_groups: Optional[int] = None):
+        self.max_groups = max_groups
+        self.groups = {}
+        self.pruned = 0
+
+    def add(self, points: Iterable[Dict[str, Any]]):
+        for point in points:
+            text = point['text']
+            key = text[:50]  # Use first 50 chars as key for grouping
+            group = self.groups.get(key)
+            if group is None:
+                self.groups[key] = {
+                    'text': text,
+                    'count': 1,
+                    'frustration_score': point['frustration_score']
+                }
+            else:
+                group['count'] += 1
+                group['frustration_score'] += (
+                    (point['frustration_score'] - group['frustration_score']) / group['count']
+                )
+        if self.max_groups and len(self.groups) > self.max_groups:
+            self._prune()
+
+    def _prune(self):
+        ranked = sorted(self.groups.items(), key=lambda item: item[1]['count'], reverse=True)
+        keep = ranked[:self.max_groups // 2]
+        self.pruned += len(ranked) - len(keep)
+        self.groups = dict(keep)
+
+    def top(self, n: int = 20) -> List[Dict[str, Any]]:
+        result = sorted(self.groups.values(), key=lambda x: x['count'], reverse=True)
+        return result[:n]
+
+
+def merge_topic_clusters(chunk_topics: Iterable[Dict[str, Any]], num_topics: int = 5,
+                         min_shared_words: int = 3) -> List[Dict[str, Any]]:
+    """Merge per-chunk LDA topics that share top words into corpus-level topics.
+
+    Each chunk topic joins the merged topic it shares the most top words
+    with, or starts a new one. Word scores are summed by rank, weights are
+    summed, and the ``num_topics`` heaviest merged topics are returned.
+    """
+    merged = []
+    for topic in chunk_topics:
+        words = topic['words']
+        best, best_shared = None, 0
+        for candidate in merged:
+            shared = len(candidate['word_set'].intersection(words))
+            if shared > best_shared:
+                best, best_shared = candidate, shared
+        if best is None or best_shared < min_shared_words:
+            best = {'word_scores': {}, 'word_set': set(), 'weight': 0.0, 'chunks': 0}
+            merged.append(best)
+        for rank, word in enumerate(words):
+            best['word_scores'][word] = best['word_scores'].get(word, 0) + len(words) - rank
+        best['word_set'].update(words)
+        best['weight'] += topic['weight']
+        best['chunks'] += 1
+
+    merged.sort(key=lambda m: m['weight'], reverse=True)
+    return [
+        {
+            'id': topic_idx,
+            'words': sorted(m['word_scores'], key=m['word_scores'].get, reverse=True)[:10],
+            'weight': m['weight'],
+            'chunks': m['chunks']
+        }
+        for topic_idx, m in enumerate(merged[:num_topics])
+    ]
+
+
+def stream_pain_points(lines: Iterable[Any], find_pain: Callable[[List[str]], List[List[Dict[str, Any]]]],
+                       chunk_size: int = DEFAULT_CHUNK_SIZE, top_n: int = 20) -> Iterator[str]:
+    """Yield one NDJSON line of pain points per chunk, then the grouped top ``top_n``.
+
+    ``find_pain`` maps a chunk of texts to their pain sentences, one list per text.
+    """
+    grouper = PainPointGrouper(DEFAULT_MAX_GROUPS)
+    total = 0
+    try:
+        for index, chunk in enumerate(chunked(iter_ndjson_texts(lines), chunk_size)):
+            points = [point for text_points in find_pain(chunk) for point in text_points]
+            grouper.add(points)
+            total += len(chunk)
+            yield ndjson_line({'chunk': index, 'texts': len(chunk), 'pain_points': points})
+    except ValueError as e:
+        yield ndjson_line({'error': str(e)})
+        return
+    yield ndjson_line({'summary': {'texts': total, 'pain_points': grouper.top(top_n)}})
+
+
+def stream_topics(lines: Iterable[Any],
+                  fit: Callable[[List[str], int], List[Dict[str, Any]]] = text_analysis.extract_lda_topics,
+                  num_topics: int = 5, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+    """Yield one NDJSON line of LDA topics per chunk, then the merged corpus topics.
+
+    ``fit`` fits one chunk of texts; if it raises ExecutorBusy or times out,
+    the stream ends with an error line for that chunk.
+    """
+    chunk_topics = []
+    total = 0
+    try:
+        for index, chunk in enumerate(chunked(iter_ndjson_texts(lines), chunk_size)):
+            total += len(chunk)
+            try:
+                topics = fit(chunk, num_topics)
+            except ValueError as e:
+                # Too few documents or terms in this chunk to fit a model
+                yield ndjson_line({'chunk': index, 'texts': len(chunk), 'topics': [], 'skipped': str(e)})
+                continue
+            except ExecutorBusy:
+                yield ndjson_line({'chunk': index, 'error': 'Too many analyses in progress, retry shortly'})
+                return
+            except TimeoutError:
+                yield ndjson_line({'chunk': index, 'error': 'Analysis timed out'})
+                return
+            # Only the top words are kept between chunks, never the texts
+            chunk_topics.extend(topics)
+            yield ndjson_line({'chunk': index, 'texts': len(chunk), 'topics': topics})
+    except ValueError as e:
+        yield ndjson_line({'error': str(e)})
+        return
+    yield ndjson_line({'summary': {'texts': total, 'topics': merge_topic_clusters(chunk_topics, num_topics)}})
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+import unittest
+import os
+import tempfile
+from analysis_cache import AnalysisCache, cache_key
+
+class TestAnalysisCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'cache.db')
+        self.cache = AnalysisCache(self.path)
+        self.calls = []
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp.cleanup()
+
+    def analyze(self, text):
+        self.calls.append(text)
+        return {'length': len(text.split()), 'pain_points': []}
+
+    def test_only_unseen_texts_are_analyzed(self):
+        first = self.cache.map('analyze_text', self.analyze, ['crm tool  is slow', 'cafe\u0301 app'])
+        self.assertEqual(self.calls, ['crm tool  is slow', 'caf\u00e9 app'])
+
+        # Another process (here: another instance) sees the same results for NFC-equivalent texts
+        other = AnalysisCache(self.path)
+        try:
+            second = other.map('analyze_text', self.analyze, ['crm tool  is slow', 'new post', 'caf\u00e9 app'])
+        finally:
+            other.close()
+        self.assertEqual(self.calls, ['crm tool  is slow', 'caf\u00e9 app', 'new post'])
+        self.assertEqual(second, [first[0], {'length': 2, 'pain_points': []}, first[1]])
+        self.assertEqual(other.stats()['hits'], 2)
+
+    def test_whitespace_is_part_of_the_key(self):
+        # Sentence extractors return text verbatim, so reformatted texts are analyzed again
+        self.assertNotEqual(cache_key('pain_sentences', 'slow  sync'), cache_key('pain_sentences', 'slow sync'))
+
+    def test_kind_and_version_are_part_of_the_key(self):
+        self.assertNotEqual(cache_key('polarity', 'text'), cache_key('pain_sentences', 'text'))
+        self.assertNotEqual(cache_key('polarity', 'text', '1'), cache_key('polarity', 'text', '2'))
+        self.cache.put_many('polarity', ['text'], [{'polarity': 0.5}])
+        bumped = AnalysisCache(self.path, version='next')
+        try:
+            self.assertEqual(bumped.get_many('polarity', ['text']), [None])
+        finally:
+            bumped.close()
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = AnalysisCache(self.path, max_bytes=2000)
+        try:
+            for i in range(40):
+                cache.put_many('polarity', [f"text {i}"], [{'polarity': i / 100, 'pad': 'x' * 50}])
+            stats = cache.stats()
+            self.assertLessEqual(stats['bytes'], 2000)
+            self.assertGreater(stats['evicted'], 0)
+            self.assertIsNotNone(cache.get_many('polarity', ['text 39'])[0])
+            self.assertIsNone(cache.get_many('polarity', ['text 0'])[0])
+        finally:
+            cache.close()
+
+    def test_disabled_cache_always_computes(self):
+        cache = AnalysisCache(None)
+        self.assertEqual(cache.map('analyze_text', self.analyze, ['a b', 'a b']), [{'length': 2, 'pain_points': []}] * 2)
+        self.assertEqual(len(self.calls), 2)
+        self.assertFalse(cache.stats()['enabled'])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+import unittest
+import concurrent.futures
+import time
+import text_analysis
+from analysis_pool import AnalysisExecutor, BoundedExecutor, ExecutorBusy
+
+TEXTS = [
+    f"Looking for a project management tool #{i}. I'm struggling with tracking tasks!"
+    if i % 2 else f"Great weather today {i}"
+    for i in range(40)
+]
+
+class TestAnalysisExecutor(unittest.TestCase):
+    def test_pool_matches_inline_results(self):
+        inline = AnalysisExecutor(workers=1).map(text_analysis.analyze_text, TEXTS)
+        with AnalysisExecutor(workers=2, batch_size=8, min_parallel=0) as executor:
+            pooled = executor.map(text_analysis.analyze_text, TEXTS)
+        self.assertEqual(pooled, inline)
+    
+    def test_small_inputs_run_inline(self):
+        executor = AnalysisExecutor(workers=4, batch_size=16)
+        executor.map(text_analysis.extract_pain_points, TEXTS[:5])
+        self.assertIsNone(executor._pool)
+    
+    def test_analyze_text_skips_texts_without_topics(self):
+        self.assertEqual(text_analysis.analyze_text("Great weather today"), {'topics': []})
+        analysis = text_analysis.analyze_text(TEXTS[1])
+        self.assertTrue(analysis['topics'])
+        self.assertEqual(analysis['pain_points'][0]['text'], "tracking tasks")
+
+class TestBoundedExecutor(unittest.TestCase):
+    def setUp(self):
+        self.executor = BoundedExecutor(workers=1, max_queue=1, timeout=10, backends=[])
+    
+    def tearDown(self):
+        self.executor.shutdown()
+    
+    def test_rejects_work_beyond_the_queue(self):
+        running = [self.executor.submit(time.sleep, 0.5) for _ in range(2)]
+        with self.assertRaises(ExecutorBusy):
+            self.executor.submit(time.sleep, 0.5)
+        concurrent.futures.wait(running)
+        self.assertEqual(self.executor.run(max, 2, 3), 3)
+        self.assertEqual(self.executor.stats()['rejected'], 1)
+        self.assertEqual(self.executor.stats()['pending'], 0)
+    
+    def test_timed_out_calls_keep_their_slot(self):
+        with self.assertRaises(concurrent.futures.TimeoutError):
+            self.executor.run(time.sleep, 1, timeout=0.1)
+        self.assertEqual(self.executor.stats()['timed_out'], 1)
+        self.assertEqual(self.executor.stats()['pending'], 1)
+
+if __name__ == "__main__":
+    unittest.main() 
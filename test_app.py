@@ -0,0 +1,406 @@
+#!/usr/bin/env python
+import unittest
+from unittest.mock import patch
+import concurrent.futures
+import csv
+import io
+import json
+import os
+import sqlite3
+import tempfile
+import app as app_module
+import sql_trace
+import stream_analysis
+import text_analysis
+import topic_listing
+from analysis_cache import AnalysisCache
+from analysis_pool import ExecutorBusy
+from response_cache import ResponseCache
+from text_store import TextStore
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.client = app_module.app.test_client()
+        self.cache = app_module.response_cache
+        self.cache.clear()
+        self.cache.hits = self.cache.misses = self.cache.not_modified = 0
+        self.cache.ttl = 60
+        # /cache/stats opens the analysis cache, which must not be the real one under data/
+        self.analysis_cache_patcher = patch.object(app_module, 'analysis_cache', AnalysisCache(None))
+        self.analysis_cache_patcher.start()
+    
+    def tearDown(self):
+        self.analysis_cache_patcher.stop()
+    
+    def post_score(self, body, **kwargs):
+        return self.client.post('/api/python/stats/opportunity-score', json=body, **kwargs)
+    
+    def test_identical_bodies_hit_the_cache(self):
+        first = self.post_score({'growth_rate': 10, 'mention_count': 500})
+        second = self.post_score({'mention_count': 500, 'growth_rate': 10})
+        
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.get_json(), second.get_json())
+        self.assertEqual(first.headers['ETag'], second.headers['ETag'])
+        stats = self.client.get('/api/python/cache/stats').get_json()['response_cache']
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+        self.assertEqual(stats['hit_rate'], 0.5)
+    
+    def test_if_none_match_returns_304(self):
+        etag = self.post_score({'growth_rate': 5}).headers['ETag']
+        response = self.post_score({'growth_rate': 5}, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.get_data(), b'')
+        
+        changed = self.post_score({'growth_rate': 6}, headers={'If-None-Match': etag})
+        self.assertEqual(changed.status_code, 200)
+    
+    def test_errors_are_not_cached(self):
+        response = self.client.post('/api/python/analyze/sentiment', json={})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.cache.stats()['entries'], 0)
+    
+    def test_expired_entries_are_recomputed(self):
+        self.cache.ttl = 0
+        self.post_score({'growth_rate': 1})
+        self.post_score({'growth_rate': 1})
+        self.assertEqual(self.cache.stats()['hits'], 0)
+    
+    def test_memory_is_bounded(self):
+        cache = ResponseCache(max_entries=10, max_bytes=100)
+        for i in range(20):
+            cache.put(str(i), b'x' * 30, 'etag', 'application/json')
+        stats = cache.stats()
+        self.assertLessEqual(stats['bytes'], 100)
+        self.assertEqual(stats['entries'], 3)
+        self.assertIsNotNone(cache.get('19'))
+        self.assertIsNone(cache.get('0'))
+
+class TestOpportunityScores(unittest.TestCase):
+    def setUp(self):
+        self.client = app_module.app.test_client()
+        app_module.response_cache.clear()
+    
+    def test_bulk_scores_match_single_scores(self):
+        topics = [
+            {'pain_points': [{'count': 4}], 'growth_rate': 15, 'mention_count': 300},
+            {'mention_count': 2000, 'engagement_metrics': {'upvotes': 50, 'comments': 9}}
+        ]
+        bulk = self.client.post('/api/python/stats/opportunity-scores', json={'topics': topics})
+        self.assertEqual(bulk.status_code, 200)
+        for topic, scores in zip(topics, bulk.get_json()['opportunity_scores']):
+            single = self.client.post('/api/python/stats/opportunity-score', json=topic)
+            self.assertEqual(single.get_json()['opportunity_scores'], scores)
+    
+    def test_bulk_scores_reject_bad_input(self):
+        response = self.client.post('/api/python/stats/opportunity-scores', json={'topics': 'x'})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post('/api/python/stats/opportunity-scores',
+                                    json={'topics': [{}], 'weights': {'pain': 0, 'growth': 0, 'market': 0,
+                                                                      'engagement': 0, 'urgency': 0}})
+        self.assertEqual(response.status_code, 400)
+
+class TopicDatabaseTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        conn = sqlite3.connect(os.path.join(self.tmp.name, 'ideaengine.db'))
+        with open('schema.sql') as f:
+            conn.executescript(f.read())
+        conn.executemany("""
+            INSERT INTO reddit_topics (name, category, mention_count, growth_percentage,
+                                       opportunity_scores, engagement_metrics)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, [
+            (f"topic {i}", 'AI' if i % 2 else 'Finance', i % 7, float(i),
+             json.dumps({'total_score': i % 5, 'pain_score': i}),
+             json.dumps({'upvotes': 100 - i}))
+            for i in range(25)
+        ])
+        conn.commit()
+        conn.close()
+        
+        self.patcher = patch.object(app_module, 'data_dir', self.tmp.name)
+        self.patcher.start()
+        app_module._topic_indexes_ready = False
+        app_module.response_cache.clear()
+        self.client = app_module.app.test_client()
+    
+    def tearDown(self):
+        self.patcher.stop()
+        self.tmp.cleanup()
+
+class TestTopicListing(TopicDatabaseTestCase):
+    def fetch_all_pages(self, **params):
+        ids, cursor = [], None
+        while True:
+            query = dict(params, limit=4)
+            if cursor:
+                query['cursor'] = cursor
+            body = self.client.get('/api/python/topics', query_string=query).get_json()
+            ids.extend(topic['id'] for topic in body['topics'])
+            cursor = body['next_cursor']
+            if not cursor:
+                return ids, body
+    
+    def test_keyset_pages_cover_every_topic_once_in_order(self):
+        ids, _ = self.fetch_all_pages(sort='mentions', order='desc', fields='id')
+        self.assertEqual(len(ids), 25)
+        expected = sorted(range(1, 26), key=lambda i: ((i - 1) % 7, i), reverse=True)
+        self.assertEqual(ids, expected)
+    
+    def test_pages_continue_past_missing_sort_values(self):
+        conn = sqlite3.connect(os.path.join(self.tmp.name, 'ideaengine.db'))
+        conn.execute("UPDATE reddit_topics SET opportunity_scores = '{}' WHERE id IN (4, 9, 13, 20)")
+        conn.commit()
+        conn.close()
+
+        ids, _ = self.fetch_all_pages(sort='score', order='desc', fields='id')
+        self.assertEqual(len(ids), 25)
+        self.assertEqual(ids[-4:], [20, 13, 9, 4])
+        ids, _ = self.fetch_all_pages(sort='score', order='asc', fields='id')
+        self.assertEqual(ids[:4], [4, 9, 13, 20])
+        self.assertEqual(len(set(ids)), 25)
+
+    def test_indexes_without_coalesce_are_rebuilt(self):
+        conn = sqlite3.connect(os.path.join(self.tmp.name, 'ideaengine.db'))
+        conn.execute("DROP INDEX idx_topics_growth")
+        conn.execute("CREATE INDEX idx_topics_growth ON reddit_topics(growth_percentage, id)")
+        topic_listing.ensure_indexes(conn)
+        sql = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'idx_topics_growth'").fetchone()[0]
+        plan = ' '.join(row[3] for row in conn.execute(
+            f"EXPLAIN QUERY PLAN SELECT id FROM reddit_topics ORDER BY {topic_listing.SORT_KEYS['growth']} DESC, id DESC"))
+        conn.close()
+        self.assertIn('COALESCE', sql)
+        self.assertIn('idx_topics_growth', plan)
+
+    def test_projection_and_category_filter(self):
+        body = self.client.get('/api/python/topics', query_string={
+            'sort': 'score', 'fields': 'name,opportunity_scores', 'category': 'AI', 'limit': 50
+        }).get_json()
+        self.assertEqual(len(body['topics']), 12)
+        self.assertEqual(set(body['topics'][0]), {'id', 'name', 'opportunity_scores'})
+        self.assertIsInstance(body['topics'][0]['opportunity_scores'], dict)
+        self.assertIsNone(body['next_cursor'])
+    
+    def test_invalid_parameters(self):
+        for query in [{'sort': 'name'}, {'fields': 'password'}, {'cursor': 'garbage'}, {'order': 'up'}]:
+            response = self.client.get('/api/python/topics', query_string=query)
+            self.assertEqual(response.status_code, 400, query)
+    
+    def test_top_k(self):
+        body = self.client.get('/api/python/topics/top', query_string={'k': 3, 'by': 'upvotes'}).get_json()
+        self.assertEqual([t['id'] for t in body['topics']], [1, 2, 3])
+        body = self.client.get('/api/python/topics/top', query_string={'k': 2, 'by': 'growth'}).get_json()
+        self.assertEqual([t['id'] for t in body['topics']], [25, 24])
+
+class TestQueryTracing(TopicDatabaseTestCase):
+    def test_listing_queries_are_traced(self):
+        self.assertFalse(self.client.get('/api/python/db/queries').get_json()['enabled'])
+        with patch.object(app_module, 'query_log', sql_trace.QueryLog(slow_ms=0)):
+            self.client.get('/api/python/topics', query_string={'sort': 'growth', 'limit': 5})
+            body = self.client.get('/api/python/db/queries').get_json()
+        self.assertTrue(body['enabled'])
+        listing = [entry for entry in body['statements'] if 'ORDER BY COALESCE(growth_percentage' in entry['sql']]
+        self.assertEqual(listing[0]['calls'], 1)
+        self.assertTrue(any(query['sql'].endswith('LIMIT 6') for query in body['slow']))
+
+class TestExport(TopicDatabaseTestCase):
+    def test_ndjson_topics_export(self):
+        response = self.client.get('/api/python/export/topics', query_string={'category': 'AI'})
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        self.assertTrue(response.is_streamed)
+        lines = response.get_data(as_text=True).splitlines()
+        self.assertEqual(len(lines), 12)
+        self.assertIsInstance(json.loads(lines[0])['opportunity_scores'], dict)
+    
+    def test_csv_phrase_export(self):
+        conn = sqlite3.connect(os.path.join(self.tmp.name, 'ideaengine.db'))
+        conn.execute(
+            "UPDATE reddit_topics SET pain_points = ?, updated_at = '2030-01-01 00:00:00' WHERE id = 1",
+            (json.dumps([{'text': 'slow, clunky sync', 'count': 3, 'frustration_score': 80}]),)
+        )
+        conn.commit()
+        conn.close()
+        
+        response = self.client.get('/api/python/export/pain_points',
+                                   query_string={'format': 'csv', 'since': '2029-12-31'})
+        rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['text'], 'slow, clunky sync')
+        self.assertEqual(rows[0]['frustration_score'], '80')
+        self.assertEqual(rows[0]['topic_id'], '1')
+    
+    def test_phrase_export_accepts_bare_values(self):
+        conn = sqlite3.connect(os.path.join(self.tmp.name, 'ideaengine.db'))
+        conn.execute(
+            "UPDATE reddit_topics SET app_ideas = ?, updated_at = '2030-01-01 00:00:00' WHERE id = 2",
+            (json.dumps([{'text': 'shared inbox', 'count': 2}, '{not json', 42]),)
+        )
+        conn.commit()
+        conn.close()
+
+        response = self.client.get('/api/python/export/app_ideas', query_string={'since': '2029-12-31'})
+        items = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        self.assertEqual([(item['text'], item.get('count')) for item in items],
+                         [('shared inbox', 2), ('{not json', None), (42, None)])
+
+    def test_unknown_kind(self):
+        self.assertEqual(self.client.get('/api/python/export/users').status_code, 400)
+        self.assertEqual(self.client.get('/api/python/export/topics?format=xml').status_code, 400)
+    
+    def test_since_is_validated(self):
+        response = self.client.get('/api/python/export/topics', query_string={'since': 'last week'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('since', response.get_json()['error'])
+
+        conn = sqlite3.connect(os.path.join(self.tmp.name, 'ideaengine.db'))
+        conn.execute("UPDATE reddit_topics SET updated_at = '2030-01-01 00:30:00' WHERE id = 3")
+        conn.commit()
+        conn.close()
+        # Offsets are converted to the UTC timestamps SQLite stores
+        response = self.client.get('/api/python/export/topics', query_string={'since': '2030-01-01T01:00:00+01:00'})
+        self.assertEqual([json.loads(line)['id'] for line in response.get_data(as_text=True).splitlines()], [3])
+
+class TestPhraseSources(TopicDatabaseTestCase):
+    def test_drills_down_from_phrase_to_posts(self):
+        store = TextStore(os.path.join(self.tmp.name, 'texts'))
+        store.append([
+            {'id': 'p1', 'text': 'Our invoice software keeps crashing', 'subreddit': 'SaaS',
+             'created_utc': 10, 'phrases': [('topics', 'invoice software'), ('pain_points', 'keeps crashing')]},
+            {'id': 'p2', 'text': 'Which invoice software do you use?', 'subreddit': 'smallbusiness',
+             'created_utc': 20, 'phrases': [('topics', 'invoice software')]}
+        ])
+        store.close()
+        
+        data = self.client.get('/api/python/sources?phrase=Invoice%20Software').get_json()
+        self.assertEqual([source['id'] for source in data['sources']], ['p2', 'p1'])
+        data = self.client.get('/api/python/sources?phrase=keeps crashing&kind=pain_points&max_chars=8').get_json()
+        self.assertEqual(data['sources'], [
+            {'id': 'p1', 'subreddit': 'SaaS', 'created_utc': 10, 'text': 'Our invo'}
+        ])
+        self.assertEqual(self.client.get('/api/python/sources?phrase=x&kind=users').status_code, 400)
+        self.assertEqual(self.client.get('/api/python/sources').status_code, 400)
+
+class TestServing(unittest.TestCase):
+    def setUp(self):
+        self.client = app_module.app.test_client()
+        app_module.response_cache.clear()
+    
+    def test_health_reports_warm_up_state(self):
+        with patch.dict(app_module.warmup, state='warming'):
+            response = self.client.get('/health')
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response.get_json()['status'], 'warming')
+        data = self.client.get('/health').get_json()
+        self.assertEqual(data['status'], 'ready')
+        self.assertIn('pending', data['heavy_executor'])
+    
+    def test_busy_and_slow_analyses_are_rejected(self):
+        body = {'texts': ['crm tool keeps crashing'], 'num_topics': 2}
+        with patch.object(app_module.heavy_executor, 'submit', side_effect=ExecutorBusy('full')):
+            response = self.client.post('/api/python/analyze/topics', json=body)
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response.headers['Retry-After'], '1')
+        with patch.object(app_module.heavy_executor, 'run', side_effect=concurrent.futures.TimeoutError()):
+            self.assertEqual(self.client.post('/api/python/analyze/topics', json=body).status_code, 504)
+    
+    def test_corpus_topics_does_not_create_the_store(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = os.path.join(tmp, 'dtm')
+            with patch.dict(os.environ, DTM_STORE=store):
+                response = self.client.get('/api/python/analyze/corpus-topics')
+            self.assertEqual(response.get_json(), {'documents': 0, 'topics': []})
+            self.assertFalse(os.path.exists(store))
+
+class TestStreamingAnalysis(unittest.TestCase):
+    def setUp(self):
+        self.client = app_module.app.test_client()
+        app_module.response_cache.clear()
+        # Analyses are faked here, so nothing may come from or go to the persistent cache
+        self.cache_patcher = patch.object(app_module, 'analysis_cache', AnalysisCache(None))
+        self.cache_patcher.start()
+    
+    def tearDown(self):
+        self.cache_patcher.stop()
+    
+    def post_ndjson(self, path, lines, **query):
+        body = ''.join(json.dumps(line) + '\n' for line in lines)
+        response = self.client.post(path, data=body, content_type='application/x-ndjson', query_string=query)
+        return response, [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    
+    def test_pain_points_are_streamed_per_chunk(self):
+        def fake_pain_sentences(text):
+            return [{'text': text, 'frustration_score': 50.0 + len(text)}] if 'hate' in text else []
+        
+        texts = ['i hate invoicing'] * 5 + [{'text': 'fine'}] + ['i hate syncing'] * 2
+        with patch.object(text_analysis, 'find_pain_sentences', fake_pain_sentences):
+            response, lines = self.post_ndjson('/api/python/analyze/pain-points', texts, chunk_size=3)
+        
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        self.assertEqual([line['texts'] for line in lines[:-1]], [3, 3, 2])
+        summary = lines[-1]['summary']
+        self.assertEqual(summary['texts'], 8)
+        self.assertEqual([(p['text'], p['count']) for p in summary['pain_points']],
+                         [('i hate invoicing', 5), ('i hate syncing', 2)])
+        self.assertEqual(app_module.response_cache.stats()['entries'], 0)
+    
+    def test_topics_are_merged_across_chunks(self):
+        texts = [
+            'invoice billing payments accounting software',
+            'billing invoice payments for freelancers',
+            'project tracking tasks deadlines team',
+            'team tasks project deadlines planning'
+        ] * 4
+        _, lines = self.post_ndjson('/api/python/analyze/topics', texts, chunk_size=8, num_topics=2)
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(len(lines[0]['topics']), 2)
+        summary = lines[-1]['summary']
+        self.assertEqual(summary['texts'], 16)
+        self.assertLessEqual(len(summary['topics']), 2)
+        self.assertEqual(sum(t['chunks'] for t in summary['topics']), 4)
+    
+    def test_topic_chunks_run_in_the_heavy_executor(self):
+        texts = ['invoice billing payments accounting software', 'billing invoice payments'] * 3
+        fits = []
+        def run(func, *args):
+            fits.append(len(args[0]))
+            return func(*args)
+        with patch.object(app_module.heavy_executor, 'run', side_effect=run):
+            _, lines = self.post_ndjson('/api/python/analyze/topics', texts, chunk_size=4, num_topics=2)
+        self.assertEqual(fits, [4, 2])
+        self.assertIn('summary', lines[-1])
+        
+        with patch.object(app_module.heavy_executor, 'run', side_effect=ExecutorBusy('full')):
+            _, lines = self.post_ndjson('/api/python/analyze/topics', texts, chunk_size=4, num_topics=2)
+        self.assertEqual(lines, [{'chunk': 0, 'error': 'Too many analyses in progress, retry shortly'}])
+        with patch.object(app_module.heavy_executor, 'run', side_effect=concurrent.futures.TimeoutError()):
+            _, lines = self.post_ndjson('/api/python/analyze/topics', texts, chunk_size=4, num_topics=2)
+        self.assertEqual(lines, [{'chunk': 0, 'error': 'Analysis timed out'}])
+    
+    def test_invalid_line_ends_stream_with_error(self):
+        body = '"ok"\n{not json}\n'
+        response = self.client.post('/api/python/analyze/topics', data=body,
+                                    content_type='application/x-ndjson')
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        self.assertEqual(lines, [{'error': 'Line 2 is not valid JSON'}])
+    
+    def test_grouper_prunes_rare_groups(self):
+        grouper = stream_analysis.PainPointGrouper(max_groups=10)
+        grouper.add([{'text': 'common', 'frustration_score': 90}] * 3)
+        grouper.add({'text': f"rare {i}", 'frustration_score': 10} for i in range(20))
+        self.assertLessEqual(len(grouper.groups), 10)
+        self.assertEqual(grouper.top(1)[0], {'text': 'common', 'count': 3, 'frustration_score': 90})
+    
+    def test_json_pain_points_are_never_pruned(self):
+        texts = [f"i hate syncing file {i}" for i in range(30)]
+        with patch.object(stream_analysis, 'DEFAULT_MAX_GROUPS', 10), \
+                patch.object(text_analysis, 'find_pain_sentences', lambda text: [{'text': text, 'frustration_score': 60.0}]):
+            grouper = stream_analysis.PainPointGrouper()
+            grouper.add({'text': text, 'frustration_score': 60.0} for text in texts)
+            self.assertEqual(len(grouper.groups), 30)
+            response = self.client.post('/api/python/analyze/pain-points', json={'texts': texts})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.get_json()['pain_points']), 20)
+
+if __name__ == "__main__":
+    unittest.main() 
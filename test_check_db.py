@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+import unittest
+import json
+import os
+import sqlite3
+import tempfile
+import check_db
+
+class TestHealthReport(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'health.db')
+        self.conn = sqlite3.connect(self.path)
+        with open('schema.sql') as f:
+            self.conn.executescript(f.read())
+        self.conn.executemany(
+            "INSERT INTO reddit_topics (name, category, mention_count, pain_points, opportunity_scores) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [
+                (f"topic {i}", 'Productivity', i, json.dumps([{'text': 'x' * i, 'count': 1}]),
+                 json.dumps({'total_score': i}))
+                for i in range(200)
+            ]
+        )
+        self.conn.commit()
+
+    def tearDown(self):
+        self.conn.close()
+        self.tmp.cleanup()
+
+    def reconnect(self):
+        # A connection's cached EXPLAIN statements outlive schema changes
+        self.conn.close()
+        self.conn = sqlite3.connect(self.path)
+
+    def test_counts_and_column_sizes(self):
+        report = check_db.health_report(self.conn)
+        self.assertEqual(report['rows']['reddit_topics'], 200)
+        sizes = report['column_sizes']['reddit_topics']['pain_points']
+        self.assertEqual(sizes['rows'], 200)
+        self.assertEqual(sizes['max'], len(json.dumps([{'text': 'x' * 199, 'count': 1}])))
+        self.assertLessEqual(sizes['p50'], sizes['p95'])
+
+    def test_api_queries_use_the_listing_indexes(self):
+        plans = {plan['query']: plan for plan in check_db.query_plans(self.conn)}
+        self.assertIn('idx_topics_score', ' '.join(plans['topics?sort=score']['plan']))
+        self.assertFalse(plans['topics?sort=mentions']['full_scan'])
+        self.assertTrue(plans['topics/top?by=pain_score']['full_scan'])
+
+        self.conn.execute("DROP INDEX idx_topics_growth")
+        self.reconnect()
+        report = check_db.health_report(self.conn)
+        plans = {plan['query']: plan for plan in report['plans']}
+        self.assertTrue(plans['topics?sort=growth']['temp_sort'])
+        self.assertTrue(any('idx_topics_growth' in advice for advice in report['recommendations']))
+
+    def test_recommends_analyze_until_statistics_exist(self):
+        report = check_db.health_report(self.conn)
+        self.assertEqual(report['statistics']['reddit_topics'], 'missing')
+        self.assertTrue(any(advice.startswith('Run ANALYZE') for advice in report['recommendations']))
+
+        self.conn.execute("ANALYZE")
+        report = check_db.health_report(self.conn)
+        self.assertEqual(report['statistics']['reddit_topics'], 'ok')
+        self.assertFalse(any(advice.startswith('Run ANALYZE') for advice in report['recommendations']))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+import unittest
+import configparser
+from unittest.mock import MagicMock
+from comment_mining import CommentBudget, praw_comments, select_comments
+
+def comment(id, score, depth=0, body=None):
+    return {'id': id, 'author': 'user', 'body': body if body is not None else f"comment {id}",
+            'score': score, 'depth': depth}
+
+class FakeComment:
+    def __init__(self, id, score, replies=()):
+        self.id = id
+        self.score = score
+        self.body = f"comment {id}"
+        self.author = MagicMock()
+        self.author.name = f"user_{id}"
+        self.replies = list(replies)
+
+class FakeForest(list):
+    def __init__(self, comments):
+        super().__init__(comments)
+        self.replace_more = MagicMock(return_value=[])
+
+class TestSelectComments(unittest.TestCase):
+    def test_highest_scores_within_depth(self):
+        comments = [comment('a', 5), comment('b', 50, depth=1), comment('c', 500, depth=3),
+                    comment('d', 20), comment('e', 1)]
+        selected = select_comments(comments, CommentBudget(max_depth=2, max_comments=3))
+        self.assertEqual([c['id'] for c in selected], ['b', 'd', 'a'])
+
+    def test_skips_comments_without_text(self):
+        comments = [comment('a', 9, body='[deleted]'), comment('b', 8, body='[removed]'),
+                    comment('c', 7, body='  '), comment('d', 1), {'author': 'user1'}]
+        self.assertEqual([c['id'] for c in select_comments(comments, CommentBudget())], ['d'])
+
+    def test_zero_budget_selects_nothing(self):
+        self.assertEqual(select_comments([comment('a', 1)], CommentBudget(max_comments=0)), [])
+
+class TestPrawComments(unittest.TestCase):
+    def test_bounded_traversal(self):
+        deep = FakeComment('deep', 100)
+        tree = FakeForest([
+            FakeComment('a', 3, [FakeComment('a1', 7, [FakeComment('a11', 1, [deep])])]),
+            FakeComment('b', 10)
+        ])
+        submission = MagicMock()
+        submission.comments = tree
+
+        comments = praw_comments(submission, CommentBudget(replace_more=4, max_depth=2))
+        tree.replace_more.assert_called_once_with(limit=4)
+        self.assertEqual(submission.comment_sort, 'top')
+        self.assertEqual([(c['id'], c['depth']) for c in comments],
+                         [('a', 0), ('b', 0), ('a1', 1), ('a11', 2)])
+        self.assertEqual(comments[0]['author'], 'user_a')
+
+class TestCommentBudget(unittest.TestCase):
+    def test_from_config(self):
+        config = configparser.ConfigParser()
+        config.read_string("[CRAWLER]\ncomment_max_depth = 0\ncomment_max_per_post = 5\n")
+        self.assertEqual(CommentBudget.from_config(config), CommentBudget(0, 0, 5))
+        self.assertEqual(CommentBudget.from_config(configparser.ConfigParser()), CommentBudget())
+
+if __name__ == '__main__':
+    unittest.main()
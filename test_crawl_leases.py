@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+import unittest
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import time
+from crawl_leases import LeaseCoordinator
+
+def run_worker(db_path, owner):
+    """Claim and 'crawl' shards until none are due, recording each crawl in the fenced transaction"""
+    db = sqlite3.connect(db_path, timeout=30)
+    coordinator = LeaseCoordinator(db, owner=owner, lease_seconds=30, recrawl_interval=3600)
+    while True:
+        leases = coordinator.claim(2)
+        if not leases:
+            break
+        for lease in leases:
+            time.sleep(0.01)
+            db.execute("BEGIN IMMEDIATE")
+            if coordinator.owns(lease):
+                db.execute("INSERT INTO crawled (subreddit, owner) VALUES (?, ?)", (lease.subreddit, owner))
+                coordinator.complete(lease, commit=False)
+                db.commit()
+            else:
+                db.rollback()
+    db.close()
+
+class TestLeaseCoordinator(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, 'shards.db')
+        self.now = 1_000_000.0
+        self.db = sqlite3.connect(self.db_path)
+        self.a = LeaseCoordinator(self.db, owner='a', lease_seconds=60, clock=lambda: self.now)
+        self.other_db = sqlite3.connect(self.db_path)
+        self.b = LeaseCoordinator(self.other_db, owner='b', lease_seconds=60, clock=lambda: self.now)
+        self.a.register(['SaaS', 'startups', 'webdev'])
+
+    def tearDown(self):
+        self.db.close()
+        self.other_db.close()
+        self.tmp.cleanup()
+
+    def test_claims_are_disjoint_and_completion_reschedules(self):
+        first = self.a.claim(2)
+        second = self.b.claim(5)
+        self.assertEqual(len(first), 2)
+        self.assertEqual(len(second), 1)
+        self.assertFalse({l.subreddit for l in first} & {l.subreddit for l in second})
+
+        self.assertTrue(self.b.complete(second[0]))
+        self.assertEqual(self.b.claim(5), [])
+        self.assertEqual(self.b.next_due_in(), 60)
+
+        for lease in first:
+            self.assertTrue(self.a.complete(lease))
+        self.now += 3599
+        self.assertEqual(self.b.claim(5), [])
+        self.now += 1
+        self.assertEqual(len(self.b.claim(5)), 3)
+
+    def test_expired_lease_is_taken_over_and_fenced(self):
+        lease = self.a.claim(1)[0]
+        self.now += 30
+        self.assertTrue(self.a.renew(lease))
+        others = self.b.claim(3)
+        self.assertEqual(len(others), 2)
+        self.assertNotIn(lease.subreddit, [l.subreddit for l in others])
+
+        self.now += 61
+        takeover = [l for l in self.b.claim(3) if l.subreddit == lease.subreddit]
+        self.assertEqual(len(takeover), 1)
+        self.assertGreater(takeover[0].generation, lease.generation)
+        self.assertFalse(self.a.renew(lease))
+        self.assertFalse(self.a.complete(lease))
+        self.assertTrue(self.b.complete(takeover[0]))
+
+    def test_release_schedules_a_retry(self):
+        lease = self.a.claim(1)[0]
+        self.assertTrue(self.a.release(lease))
+        self.assertNotIn(lease.subreddit, [l.subreddit for l in self.b.claim(3)])
+        self.assertEqual(self.a.status()['leased'], 2)
+
+    def test_concurrent_workers_crawl_each_shard_once(self):
+        self.db.execute("CREATE TABLE crawled (subreddit TEXT, owner TEXT)")
+        self.a.register([f"sub{i}" for i in range(60)])
+        self.db.execute("UPDATE crawl_shards SET next_due = 0")
+        self.db.commit()
+
+        workers = [
+            multiprocessing.Process(target=run_worker, args=(self.db_path, f"worker{i}"))
+            for i in range(3)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(60)
+
+        rows = self.db.execute("SELECT subreddit, COUNT(*) FROM crawled GROUP BY subreddit").fetchall()
+        self.assertEqual(len(rows), 63)
+        self.assertTrue(all(count == 1 for _, count in rows))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+import unittest
+import sqlite3
+from crawl_scheduler import CrawlScheduler
+
+HOUR = 3600
+
+def posts(count, start, spacing):
+    return [{'created_utc': start + i * spacing} for i in range(count)]
+
+class TestCrawlScheduler(unittest.TestCase):
+    def setUp(self):
+        self.db = sqlite3.connect(':memory:')
+        self.now = 1_000_000.0
+        self.listings = {}
+        self.scheduler = CrawlScheduler(
+            self.db, lambda name: self.listings[name], ['busy', 'quiet'],
+            min_interval=60, max_interval=12 * HOUR, target_new_posts=20,
+            clock=lambda: self.now
+        )
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_busy_subreddits_are_polled_more_often(self):
+        # 100 posts per hour versus 2 posts per hour
+        busy = self.scheduler.observe('busy', posts(100, self.now - HOUR, 36))
+        quiet = self.scheduler.observe('quiet', posts(2, self.now - HOUR, 1800))
+        self.assertAlmostEqual(busy, 20 * 36, delta=20)
+        self.assertEqual(quiet, 10 * HOUR)
+        self.assertLess(busy, quiet)
+
+    def test_velocity_counts_only_new_posts_and_is_smoothed(self):
+        self.scheduler.observe('busy', posts(10, self.now - HOUR, 360))
+        self.now += HOUR
+        # The same listing again: no new posts, so velocity halves
+        interval = self.scheduler.observe('busy', posts(10, self.now - 2 * HOUR, 360))
+        state = self.scheduler.state('busy')
+        self.assertAlmostEqual(state['posts_per_hour'], 5.0, places=1)
+        self.assertAlmostEqual(interval, 4 * HOUR, delta=60)
+
+    def test_interval_is_clamped_and_persisted(self):
+        self.assertEqual(self.scheduler.observe('quiet', []), 12 * HOUR)
+        self.assertEqual(self.scheduler.observe('busy', posts(100, self.now - 60, 0.6)), 60)
+
+        restarted = CrawlScheduler(self.db, None, ['busy'], clock=lambda: self.now)
+        self.assertEqual(restarted.state('busy')['interval_seconds'], 60)
+
+    def test_run_reschedules_on_new_interval_and_survives_errors(self):
+        self.listings['busy'] = posts(100, self.now - HOUR, 36)
+        self.scheduler.run_subreddit('busy')
+        self.scheduler.run_subreddit('quiet')  # KeyError from the crawl is logged
+        jobs = {next(iter(job.tags)): job.interval for job in self.scheduler.scheduler.get_jobs()}
+        self.assertEqual(jobs['busy'], 720)
+        self.assertEqual(jobs['quiet'], 1800)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,9 +2,16 @@
 import unittest
 from unittest.mock import patch, MagicMock
 import os
+import time
 import json
 import sqlite3
+import tempfile
+import threading
 from DataCrawler import DataCrawler
+from crawl_leases import LeaseCoordinator
+from analysis_cache import AnalysisCache
+from dtm_store import DTMStore
+from text_store import TextStore
 
 class TestDataCrawler(unittest.TestCase):
     def setUp(self):
@@ -17,7 +24,7 @@ class TestDataCrawler(unittest.TestCase):
         self.mock_logging = self.logging_patcher.start()
         
         # Mock the Reddit API
-        self.praw_patcher = patch('DataCrawler.praw')
+        self.praw_patcher = patch('praw.Reddit')
         self.mock_praw = self.praw_patcher.start()
         
         # Create a test instance with in-memory database
@@ -50,11 +57,24 @@ class TestDataCrawler(unittest.TestCase):
         
         # Mock the Reddit client
         self.crawler.reddit = MagicMock()
+        
+        # Cached analyses, vectors and texts go to a scratch directory, never the real data/ stores
+        self.tmp = tempfile.TemporaryDirectory()
+        for store in (self.crawler.analysis_cache, self.crawler.dtm_store, self.crawler.text_store):
+            if store is not None:
+                store.close()
+        self.crawler.analysis_cache = AnalysisCache(os.path.join(self.tmp.name, 'analysis_cache.db'))
+        self.crawler.dtm_store = DTMStore(os.path.join(self.tmp.name, 'dtm'))
+        self.crawler.text_store = TextStore(os.path.join(self.tmp.name, 'texts'))
+        self.crawler.topic_spill_dir = self.tmp.name
     
     def tearDown(self):
         self.logging_patcher.stop()
         self.praw_patcher.stop()
         self.crawler.db.close()
+        for store in (self.crawler.analysis_cache, self.crawler.dtm_store, self.crawler.text_store):
+            store.close()
+        self.tmp.cleanup()
     
     def test_extract_potential_topics(self):
         text = "I'm looking for a management tool that can help with task tracking"
@@ -96,6 +116,137 @@ class TestDataCrawler(unittest.TestCase):
         self.assertEqual(metrics['comments'], 10)
         self.assertEqual(metrics['unique_users'], 2)
     
+    def test_analyze_records(self):
+        record = {
+            'id': 'abc',
+            'title': "Looking for a project management tool",
+            'selftext': "I'm struggling with tracking tasks",
+            'score': 12,
+            'num_comments': 2,
+            'created_utc': time.time(),
+            'comments': [{'author': 'user1'}, {'author': 'user1'}]
+        }
+
+        with patch('text_analysis.extract_topic_clusters', return_value=[]):
+            topics_data = self.crawler.analyze_records([record])
+        self.assertTrue(topics_data)
+        for data in topics_data.values():
+            self.assertEqual(data['mention_count'], 1)
+            self.assertEqual(data['engagement_metrics']['upvotes'], 12)
+            self.assertEqual(data['engagement_metrics']['unique_users'], 1)
+            self.assertEqual(data['pain_points'][0]['text'], "tracking tasks")
+
+    def test_analyze_records_mines_comments(self):
+        record = {
+            'id': 'def',
+            'title': "Looking for a project management tool",
+            'selftext': "",
+            'score': 3,
+            'num_comments': 2,
+            'created_utc': time.time(),
+            'comments': [
+                {'id': 'c1', 'author': 'user1', 'body': "I'm struggling with invoicing clients", 'score': 4, 'depth': 0},
+                {'id': 'c2', 'author': 'user2', 'body': "I'm struggling with deep threads", 'score': 9, 'depth': 5}
+            ]
+        }
+
+        with patch('text_analysis.extract_topic_clusters', return_value=[]):
+            topics_data = self.crawler.analyze_records([record])
+        self.assertTrue(topics_data)
+        for data in topics_data.values():
+            self.assertEqual([point['text'] for point in data['pain_points']], ["invoicing clients"])
+
+    def use_file_database(self, timeout=30):
+        """Swap the in-memory database for a file other connections can lock"""
+        db_path = os.path.join(self.tmp.name, 'ideaengine.db')
+        self.crawler.db.close()
+        self.crawler.db = sqlite3.connect(db_path, timeout=timeout)
+        with open('schema.sql') as f:
+            self.crawler.db.executescript(f.read())
+        return db_path
+    
+    def shard_record(self):
+        return {
+            'id': 'ghi',
+            'title': "Looking for a project management tool",
+            'selftext': "I'm struggling with tracking tasks",
+            'score': 5,
+            'num_comments': 0,
+            'created_utc': time.time(),
+            'comments': []
+        }
+    
+    def test_crawl_shard_clusters_before_taking_the_write_lock(self):
+        db_path = self.use_file_database()
+        coordinator = LeaseCoordinator(self.crawler.db, owner='a')
+        coordinator.register(['SaaS'])
+        lease = coordinator.claim(1)[0]
+        record = self.shard_record()
+        
+        locked = []
+        def clusters(texts):
+            # Another worker must still be able to write while topics are clustered
+            other = sqlite3.connect(db_path, timeout=0)
+            try:
+                other.execute("BEGIN IMMEDIATE")
+                other.rollback()
+                locked.append(False)
+            except sqlite3.OperationalError:
+                locked.append(True)
+            finally:
+                other.close()
+            return []
+        
+        with patch('DataCrawler.DB_PATH', db_path), patch('text_analysis.extract_topic_clusters', clusters):
+            self.assertTrue(self.crawler.crawl_shard(coordinator, lease, lambda subreddit: [record]))
+        self.assertTrue(locked)
+        self.assertNotIn(True, locked)
+        self.assertGreater(self.crawler.db.execute("SELECT COUNT(*) FROM reddit_topics").fetchone()[0], 0)
+        self.assertEqual(coordinator.claim(1), [])
+    
+    def test_crawl_shard_releases_lease_when_database_is_locked(self):
+        db_path = self.use_file_database(timeout=0.05)
+        coordinator = LeaseCoordinator(self.crawler.db, owner='a')
+        coordinator.register(['SaaS'])
+        lease = coordinator.claim(1)[0]
+        other = sqlite3.connect(db_path, timeout=0.05)
+        LeaseCoordinator(other, owner='b')
+        other.execute("BEGIN IMMEDIATE")
+        
+        release = coordinator.release
+        def release_after_other_commits(lease):
+            other.commit()
+            return release(lease)
+        
+        with patch('DataCrawler.DB_PATH', db_path), patch('text_analysis.extract_topic_clusters', return_value=[]), \
+                patch.object(coordinator, 'release', side_effect=release_after_other_commits):
+            self.assertFalse(self.crawler.crawl_shard(coordinator, lease, lambda subreddit: [self.shard_record()]))
+        other.close()
+        self.assertFalse(self.crawler.db.in_transaction)
+        self.assertEqual(self.crawler.db.execute("SELECT COUNT(*) FROM reddit_topics").fetchone()[0], 0)
+        self.assertIsNone(self.crawler.db.execute(
+            "SELECT owner FROM crawl_shards WHERE subreddit = 'SaaS'").fetchone()[0])
+    
+    def test_worker_backs_off_while_another_holds_the_write_lock(self):
+        db_path = self.use_file_database(timeout=0.05)
+        # The other worker takes the lock once this one has registered, and lets go of it from a timer thread
+        other = sqlite3.connect(db_path, timeout=0.05, check_same_thread=False)
+        unlock = threading.Timer(0.5, other.commit)
+        def lock(*args):
+            other.execute("BEGIN IMMEDIATE")
+            unlock.start()
+        
+        self.crawler.create_fetch = lambda *args: (lambda subreddit: [self.shard_record()])
+        with patch('DataCrawler.DB_PATH', db_path), patch('DataCrawler.CLAIM_RETRY_SECONDS', 0.05), \
+                patch('DataCrawler.signal.signal'), patch('analysis_backends.warm_up', side_effect=lock), \
+                patch('text_analysis.extract_topic_clusters', return_value=[]):
+            self.crawler.run_worker(['SaaS'], once=True)
+        unlock.join()
+        other.close()
+        self.assertTrue(any('Could not claim shards' in call.args[0]
+                            for call in self.mock_logging.warning.call_args_list))
+        self.assertGreater(self.crawler.db.execute("SELECT COUNT(*) FROM reddit_topics").fetchone()[0], 0)
+    
     def test_update_database(self):
         # Clear any existing data
         cursor = self.crawler.db.cursor()
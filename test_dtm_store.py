@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+import unittest
+import os
+import sqlite3
+import tempfile
+from sklearn.feature_extraction.text import CountVectorizer
+import dtm_store
+from dtm_store import DTMStore, parse_time
+
+DOCS = [
+    {'id': 'a1', 'text': 'Invoice software keeps crashing on invoice export', 'subreddit': 'SaaS',
+     'created_utc': 1000, 'topics': ['invoice software']},
+    {'id': 'a2', 'text': 'Looking for a CRM tool with invoice sync', 'subreddit': 'SaaS',
+     'created_utc': 2000, 'topics': ['crm tool', 'invoice software']},
+    {'id': 'a3', 'text': 'Project tracking app for remote teams', 'subreddit': 'startups',
+     'created_utc': 3000, 'topics': ['project tracking app']},
+]
+
+class TestDTMStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = DTMStore(self.tmp.name)
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def test_rows_match_count_vectorizer(self):
+        self.assertEqual(self.store.append(DOCS[:2]), 2)
+        self.assertEqual(self.store.append(DOCS), 1)  # a1 and a2 are already stored
+
+        matrix, doc_ids = self.store.load()
+        self.assertEqual(doc_ids, ['a2', 'a1', 'a3'])
+        vectorizer = CountVectorizer(stop_words='english')
+        expected = vectorizer.fit_transform([DOCS[1]['text'], DOCS[0]['text'], DOCS[2]['text']])
+        for i, row in enumerate(matrix):
+            stored = {self.store.terms[j]: v for j, v in zip(row.indices, row.data)}
+            names = vectorizer.get_feature_names_out()
+            reference = {names[j]: v for j, v in zip(expected[i].indices, expected[i].data)}
+            self.assertEqual(stored, reference)
+
+    def test_vocabulary_is_stable_across_instances(self):
+        self.store.append(DOCS[:1])
+        first_terms = list(self.store.terms)
+        reopened = DTMStore(self.tmp.name)
+        try:
+            reopened.append(DOCS[1:])
+            self.assertEqual(reopened.terms[:len(first_terms)], first_terms)
+            matrix, _ = reopened.load()
+            self.assertEqual(matrix.shape, (3, len(reopened.terms)))
+        finally:
+            reopened.close()
+        self.assertEqual(self.store.stats(), {'segments': 2, 'documents': 3, 'terms': len(reopened.terms)})
+
+    def test_read_only_store_creates_nothing(self):
+        missing = os.path.join(self.tmp.name, 'missing')
+        self.assertEqual(dtm_store.cluster_store(missing, 2), (0, []))
+        self.assertFalse(os.path.exists(missing))
+        with self.assertRaises(sqlite3.OperationalError):
+            DTMStore(missing, read_only=True)
+        self.assertFalse(os.path.exists(missing))
+
+        self.store.append(DOCS)
+        reader = DTMStore(self.tmp.name, read_only=True)
+        try:
+            self.assertEqual(reader.load()[1], ['a3', 'a2', 'a1'])
+            with self.assertRaises(sqlite3.OperationalError):
+                reader.index.execute("DELETE FROM docs")
+        finally:
+            reader.close()
+
+    def test_select_by_topic_time_and_subreddit(self):
+        self.store.append(DOCS)
+        _, by_topic = self.store.load(topic='invoice software')
+        self.assertEqual(sorted(by_topic), ['a1', 'a2'])
+        _, by_time = self.store.load(since=1500, until=parse_time('1970-01-01T00:50:00'))
+        self.assertEqual(by_time, ['a2'])
+        _, by_subreddit = self.store.load(subreddit='startups')
+        self.assertEqual(by_subreddit, ['a3'])
+
+    def test_clusters_from_stored_rows(self):
+        self.store.append(
+            {'id': f"d{i}", 'text': DOCS[i % 3]['text'], 'created_utc': i} for i in range(12)
+        )
+        clusters = self.store.topic_clusters(n_components=2)
+        self.assertEqual(len(clusters), 2)
+        self.assertTrue(all(cluster['words'] for cluster in clusters))
+        self.assertEqual(self.store.topic_clusters(topic='missing'), [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+import unittest
+import json
+import sqlite3
+import init_db
+
+def schema_connection():
+    conn = sqlite3.connect(':memory:')
+    with open('schema.sql') as f:
+        conn.executescript(f.read())
+    return conn
+
+class TestSyntheticSeeding(unittest.TestCase):
+    def test_topics_are_deterministic_and_distinct(self):
+        first = list(init_db.synthetic_topics(500, seed=7))
+        second = list(init_db.synthetic_topics(500, seed=7))
+        strip = lambda topics: [{k: v for k, v in t.items() if k not in ('created_at', 'updated_at', 'trend_data')}
+                                for t in topics]
+        self.assertEqual(strip(first), strip(second))
+        self.assertEqual(len({t['name'] for t in first}), 500)
+        self.assertNotEqual(strip(first), strip(init_db.synthetic_topics(500, seed=8)))
+
+    def test_distributions(self):
+        topics = list(init_db.synthetic_topics(5000))
+        mentions = sorted((t['mention_count'] for t in topics), reverse=True)
+        # Heavy tail: the top 1% of topics hold far more than 1% of the mentions
+        self.assertGreater(sum(mentions[:50]), 0.1 * sum(mentions))
+        self.assertGreater(len({len(t['pain_points']) for t in topics}), 5)
+        self.assertGreater(len({len(t['trend_data']) for t in topics}), 10)
+        self.assertTrue(all(t['trend_data'][-1]['mentions'] == t['mention_count'] for t in topics))
+
+    def test_bulk_load_rebuilds_indexes(self):
+        conn = schema_connection()
+        indexes = conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'index' ORDER BY name").fetchall()
+        self.assertEqual(init_db.seed_topics(conn, 2500, batch_size=1000), 2500)
+
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM reddit_topics").fetchone()[0], 2500)
+        self.assertEqual(conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'index' ORDER BY name").fetchall(),
+                         indexes)
+        self.assertEqual(conn.execute("PRAGMA integrity_check").fetchone()[0], 'ok')
+        scores = json.loads(conn.execute("SELECT opportunity_scores FROM reddit_topics LIMIT 1").fetchone()[0])
+        self.assertEqual(list(scores)[0], 'total_score')
+        self.assertTrue(conn.execute("SELECT 1 FROM sqlite_stat1 WHERE tbl = 'reddit_topics'").fetchone())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+import unittest
+import threading
+from werkzeug.serving import make_server
+import app as app_module
+import load_test
+
+class TestLoadTest(unittest.TestCase):
+    def test_percentiles_use_nearest_rank(self):
+        values = [i / 1000 for i in range(1, 101)]
+        self.assertEqual(load_test.percentile(values, 50), 0.05)
+        self.assertEqual(load_test.percentile(values, 99), 0.099)
+        self.assertEqual(load_test.percentile([0.2], 95), 0.2)
+        self.assertEqual(load_test.percentile([], 50), 0.0)
+
+    def test_parse_mix(self):
+        self.assertEqual(load_test.parse_mix('sentiment=3, score'), [('sentiment', 3.0), ('score', 1.0)])
+        with self.assertRaises(ValueError):
+            load_test.parse_mix('missing=1')
+
+    def test_run_level_against_local_server(self):
+        server = make_server('127.0.0.1', 0, app_module.app, threaded=True)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            base_url = f"http://127.0.0.1:{server.server_port}"
+            level = load_test.run_level(base_url, load_test.parse_mix('test=1,score=1,app-ideas=1'),
+                                        concurrency=3, duration=5, max_requests=30)
+        finally:
+            server.shutdown()
+        self.assertEqual(level['requests'], 30)
+        self.assertEqual(level['errors'], 0)
+        self.assertEqual(set(level['endpoints']), {'test', 'score', 'app-ideas'})
+        self.assertLessEqual(level['p50_ms'], level['p95_ms'])
+        self.assertLessEqual(level['p95_ms'], level['p99_ms'])
+
+        report = load_test.compare({'levels': [dict(level, throughput=level['throughput'] * 2)]},
+                                   {'revision': 'abc', 'levels': [level]})
+        self.assertIn('throughput', report[1])
+        self.assertIn('+100.0%', report[1])
+
+if __name__ == "__main__":
+    unittest.main()
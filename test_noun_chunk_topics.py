@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+import unittest
+from unittest.mock import patch
+import text_analysis
+import noun_chunk_topics
+
+try:
+    import spacy
+    from spacy.tokens import Doc
+except ImportError:
+    spacy = None
+
+def parsed(words, pos, deps, heads, lemmas=None):
+    """A Doc annotated by hand as the parser would, so noun_chunks works without a model"""
+    return Doc(spacy.blank('en').vocab, words=words, pos=pos, deps=deps, heads=heads,
+               lemmas=lemmas or [word.lower() for word in words])
+
+@unittest.skipUnless(spacy, "spaCy is not installed")
+class TestNounChunkTopics(unittest.TestCase):
+    def test_cleans_chunks_headed_by_saas_nouns(self):
+        # "I need a good invoicing app and my team hates our old email marketing tools"
+        doc = parsed(
+            ['I', 'need', 'a', 'good', 'invoicing', 'app', 'and', 'my', 'team', 'hates',
+             'our', 'old', 'email', 'marketing', 'tools'],
+            ['PRON', 'VERB', 'DET', 'ADJ', 'NOUN', 'NOUN', 'CCONJ', 'PRON', 'NOUN', 'VERB',
+             'PRON', 'ADJ', 'NOUN', 'NOUN', 'NOUN'],
+            ['nsubj', 'ROOT', 'det', 'amod', 'compound', 'dobj', 'cc', 'poss', 'nsubj', 'conj',
+             'poss', 'amod', 'compound', 'compound', 'dobj'],
+            [1, 1, 5, 5, 5, 1, 1, 8, 9, 1, 14, 14, 13, 14, 9],
+            lemmas=['I', 'need', 'a', 'good', 'invoicing', 'app', 'and', 'my', 'team', 'hate',
+                    'our', 'old', 'email', 'marketing', 'tool']
+        )
+        self.assertEqual(noun_chunk_topics.doc_topics(doc), ['invoicing app', 'email marketing tool'])
+
+    def test_bare_and_non_saas_chunks_are_dropped(self):
+        # "The app broke my workflow"
+        doc = parsed(['The', 'app', 'broke', 'my', 'workflow'],
+                     ['DET', 'NOUN', 'VERB', 'PRON', 'NOUN'],
+                     ['det', 'nsubj', 'ROOT', 'poss', 'dobj'],
+                     [1, 2, 2, 4, 2])
+        self.assertEqual(noun_chunk_topics.doc_topics(doc), [])
+
+class TestBatchTopics(unittest.TestCase):
+    def test_supplied_topics_replace_the_regex(self):
+        text = "I am struggling with the sync. Our crm platform is slow."
+        with patch.object(text_analysis, 'analyze_sentiment', return_value={}):
+            analysis = text_analysis.analyze_text_with_topics((text, ['crm platform']))
+            self.assertEqual(analysis['topics'], ['crm platform'])
+            self.assertEqual(text_analysis.analyze_text_with_topics((text, []))['topics'], [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+import unittest
+import threading
+import time
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+import prawcore
+import requests
+import rate_limit
+from rate_limit import RateLimiter, LISTING, COMMENTS
+from reddit_fetch import AsyncRedditFetcher
+from reddit_standin import StandinRedditServer, generate_posts
+from crawler_transport import CrawlerTransport
+
+def http_error(status, headers=None):
+    error = Exception(f"HTTP {status}")
+    error.response = MagicMock(status_code=status, headers=headers or {})
+    return error
+
+class TestRateLimiter(unittest.TestCase):
+    def test_headers_spread_remaining_budget_over_window(self):
+        limiter = RateLimiter(requests_per_minute=60, burst=5)
+        limiter.update({'X-Ratelimit-Remaining': '30', 'X-Ratelimit-Reset': '10', 'X-Ratelimit-Used': '70'})
+        self.assertEqual(limiter.stats()['requests_per_minute'], 180)
+
+        limiter.update({'X-Ratelimit-Remaining': '0', 'X-Ratelimit-Reset': '1', 'X-Ratelimit-Used': '100'})
+        start = time.monotonic()
+        self.assertTrue(limiter.acquire(timeout=3))
+        self.assertGreaterEqual(time.monotonic() - start, 0.9)
+
+    def test_comments_yield_to_listings_when_budget_is_low(self):
+        limiter = RateLimiter(burst=5, reserve=0.1)
+        limiter.update({'X-Ratelimit-Remaining': '5', 'X-Ratelimit-Reset': '60', 'X-Ratelimit-Used': '95'})
+        limiter.tokens = 5
+        self.assertFalse(limiter.acquire(COMMENTS, timeout=0.1))
+        self.assertTrue(limiter.acquire(LISTING, timeout=0.1))
+
+        with limiter.priority(COMMENTS):
+            self.assertFalse(limiter.acquire(timeout=0.1))
+        self.assertEqual(limiter.stats()['comment_requests'], 0)
+
+    def test_waiting_listing_goes_first(self):
+        limiter = RateLimiter(requests_per_minute=600, burst=1)
+        limiter.tokens = 0
+        order = []
+        comment = threading.Thread(target=lambda: limiter.acquire(COMMENTS) and order.append('comment'))
+        listing = threading.Thread(target=lambda: limiter.acquire(LISTING) and order.append('listing'))
+        listing.start()
+        time.sleep(0.02)
+        comment.start()
+        comment.join()
+        listing.join()
+        self.assertEqual(order, ['listing', 'comment'])
+
+    def test_retries_throttled_calls_only(self):
+        sleeps = []
+        calls = iter([http_error(429, {'Retry-After': '2'}), http_error(503), 'ok'])
+
+        def flaky():
+            result = next(calls)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        self.assertEqual(rate_limit.call_with_retries(flaky, base_delay=0.5, sleep=sleeps.append), 'ok')
+        self.assertEqual(len(sleeps), 2)
+        self.assertGreaterEqual(sleeps[0], 2)
+        self.assertLessEqual(sleeps[1], 1.0)
+
+        with self.assertRaises(Exception):
+            rate_limit.call_with_retries(lambda: (_ for _ in ()).throw(http_error(404)), sleep=sleeps.append)
+        self.assertEqual(len(sleeps), 2)
+
+    def test_retry_after_accepts_http_dates(self):
+        when = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+        self.assertAlmostEqual(rate_limit.parse_retry_after(when), 30, delta=2)
+        self.assertEqual(rate_limit.parse_retry_after('soon', 1.0), 1.0)
+        self.assertAlmostEqual(rate_limit.retry_after(http_error(429, {'Retry-After': when})), 30, delta=2)
+
+        limiter = RateLimiter(requests_per_minute=60, burst=5)
+        limiter.update({'Retry-After': when}, status=429)
+        self.assertFalse(limiter.acquire(timeout=0.1))
+        limiter.update({'Retry-After': 'Wed, 99 Foo'}, status=429)
+        self.assertEqual(limiter.stats()['throttled'], 2)
+
+    def test_only_transient_request_errors_are_retried(self):
+        for error in (requests.ConnectionError(), requests.ReadTimeout(),
+                      requests.exceptions.ChunkedEncodingError(), http_error(502)):
+            self.assertTrue(rate_limit.is_retryable(error), error)
+        for error in (requests.exceptions.InvalidURL(), requests.exceptions.MissingSchema(),
+                      requests.exceptions.InvalidHeader(), OSError(), http_error(403)):
+            self.assertFalse(rate_limit.is_retryable(error), error)
+        # praw wraps the underlying requests error
+        self.assertTrue(rate_limit.is_retryable(prawcore.RequestException(requests.Timeout(), (), {})))
+        self.assertFalse(rate_limit.is_retryable(prawcore.RequestException(requests.exceptions.InvalidURL(), (), {})))
+
+        sleeps = []
+        with self.assertRaises(requests.exceptions.MissingSchema):
+            rate_limit.call_with_retries(requests.get, 'example.com', sleep=sleeps.append)
+        self.assertEqual(sleeps, [])
+
+class TestRateLimitedFetch(unittest.TestCase):
+    def test_fetch_stays_under_server_budget_without_dropping_subreddits(self):
+        subreddits = {name: generate_posts(name, 10, comments_per_post=1) for name in ['SaaS', 'startups', 'webdev']}
+        with StandinRedditServer(subreddits, rate_limit=(12, 1.0)) as server:
+            transport = CrawlerTransport(proxy=None, limiter=RateLimiter(requests_per_minute=600, burst=12))
+            fetcher = AsyncRedditFetcher('test-agent', base_url=server.base_url, concurrency=8,
+                                         transport=transport, retry_base_delay=0.2)
+            fetched = fetcher.fetch_all(list(subreddits), limit=10)
+            throttled = server.throttled_count
+
+        self.assertEqual(sorted(fetched), sorted(subreddits))
+        self.assertTrue(all(len(record['comments']) == 1 for records in fetched.values() for record in records))
+        self.assertEqual(throttled, 0)
+        self.assertEqual(transport.limiter.stats()['comment_requests'], 30)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,42 +1,21 @@
 import praw
 import configparser
-import requests
 import urllib3
-from requests.adapters import HTTPAdapter
-import socks
-import socket
-import ssl
-import certifi
-from urllib3.contrib.socks import SOCKSProxyManager
+from crawler_transport import CrawlerTransport
 
 # Disable SSL warnings
 urllib3.disable_warnings()
 
 def main():
-    # Configure SOCKS proxy (Tor)
-    socks.set_default_proxy(socks.SOCKS5, "127.0.0.1", 9150)
-    socket.socket = socks.socksocket
-
     # Load configuration
     config = configparser.ConfigParser()
     config.read('config.ini')
-    
-    # Create a proxy manager with custom SSL context
-    proxy_url = 'socks5h://127.0.0.1:9150'
-    proxy_manager = SOCKSProxyManager(
-        proxy_url,
-        cert_reqs='CERT_NONE',
-        ca_certs=certifi.where()
-    )
-    
-    # Create a session with the proxy manager
-    session = requests.Session()
+
+    # Create a pooled session with the proxy (Tor by default) scoped to Reddit hosts
+    transport = CrawlerTransport.from_config()
+    session = transport.session()
     session.verify = False  # Disable SSL verification for testing
-    session.proxies = {
-        'http': proxy_url,
-        'https': proxy_url
-    }
-    
+
     # Initialize the Reddit API client
     reddit = praw.Reddit(
         client_id=config['REDDIT']['client_id'],
@@ -44,9 +23,9 @@ def main():
         user_agent=config['REDDIT']['user_agent'],
         requestor_kwargs={'session': session}
     )
-    
-    print("Attempting to connect to Reddit API through Tor...")
-    
+
+    print(f"Attempting to connect to Reddit API through {transport.proxy or 'a direct connection'}...")
+
     try:
         # Try to get the top post from r/python
         subreddit = reddit.subreddit("python")
@@ -56,9 +35,11 @@ def main():
             print(f"Score: {submission.score}")
             print(f"URL: {submission.url}")
             break
-            
+
     except Exception as e:
         print(f"Error: {str(e)}")
 
+    print(f"Transport stats: {transport.stats()}")
+
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+import unittest
+import time
+import threading
+from reddit_fetch import AsyncRedditFetcher, flatten_comments
+from reddit_standin import StandinRedditServer, generate_posts
+from crawler_transport import CrawlerTransport
+
+class TestAsyncRedditFetcher(unittest.TestCase):
+    def test_fetch_all_returns_plain_records(self):
+        subreddits = {'SaaS': generate_posts('SaaS', 5, comments_per_post=3)}
+        with StandinRedditServer(subreddits) as server:
+            fetcher = AsyncRedditFetcher('test-agent', base_url=server.base_url, concurrency=4)
+            fetched = fetcher.fetch_all(['SaaS'], limit=5)
+        
+        records = fetched['SaaS']
+        self.assertEqual(len(records), 5)
+        self.assertEqual(records[0]['title'], "Looking for a project management tool #0")
+        self.assertEqual(len(records[0]['comments']), 3)
+        self.assertEqual(records[0]['engagement']['unique_users'], 3)
+        self.assertEqual(records[0]['engagement']['upvotes'], 10)
+    
+    def test_listing_pagination(self):
+        subreddits = {'startups': generate_posts('startups', 150, comments_per_post=0)}
+        with StandinRedditServer(subreddits) as server:
+            fetcher = AsyncRedditFetcher('test-agent', base_url=server.base_url)
+            records = fetcher.fetch_all(['startups'], limit=120)['startups']
+        
+        self.assertEqual(len(records), 120)
+        self.assertEqual(len({r['id'] for r in records}), 120)
+    
+    def test_missing_subreddit_is_skipped(self):
+        subreddits = {'SaaS': generate_posts('SaaS', 2)}
+        with StandinRedditServer(subreddits) as server:
+            fetcher = AsyncRedditFetcher('test-agent', base_url=server.base_url)
+            fetched = fetcher.fetch_all(['SaaS', 'doesnotexist'], limit=2)
+        
+        self.assertEqual(list(fetched), ['SaaS'])
+    
+    def test_latency_bounded_by_concurrency(self):
+        latency = 0.2
+        subreddits = {
+            name: generate_posts(name, 10, comments_per_post=1)
+            for name in ['SaaS', 'startups']
+        }
+        with StandinRedditServer(subreddits, latency=latency) as server:
+            fetcher = AsyncRedditFetcher('test-agent', base_url=server.base_url, concurrency=20)
+            start = time.monotonic()
+            fetcher.fetch_all(list(subreddits), limit=10)
+            elapsed = time.monotonic() - start
+            requests_made = server.request_count
+        
+        # 2 listings + 20 comment trees; serial fetching would take ~4.4s
+        self.assertEqual(requests_made, 22)
+        self.assertLess(elapsed, requests_made * latency / 2)
+    
+    def test_expired_token_is_refreshed(self):
+        subreddits = {'SaaS': generate_posts('SaaS', 3, comments_per_post=1)}
+        with StandinRedditServer(subreddits, token_ttl=0.5) as server:
+            fetcher = AsyncRedditFetcher('test-agent', client_id='id', client_secret='secret',
+                                         base_url=server.base_url, token_url=f"{server.base_url}/api/v1/access_token")
+            self.assertEqual(len(fetcher.fetch_all(['SaaS'], limit=3)['SaaS']), 3)
+            time.sleep(0.6)
+            records = fetcher.fetch_all(['SaaS'], limit=3)['SaaS']
+            self.assertEqual(server.tokens_issued, 2)
+            self.assertEqual(server.unauthorized_count, 0)
+        self.assertTrue(all(len(record['comments']) == 1 for record in records))
+    
+    def test_rejected_token_is_replaced_once(self):
+        subreddits = {'SaaS': generate_posts('SaaS', 6, comments_per_post=1)}
+        with StandinRedditServer(subreddits, token_ttl=3600) as server:
+            fetcher = AsyncRedditFetcher('test-agent', client_id='id', client_secret='secret',
+                                         base_url=server.base_url, token_url=f"{server.base_url}/api/v1/access_token",
+                                         concurrency=4)
+            fetcher.authenticate()
+            server.revoke_tokens()
+            records = fetcher.fetch_all(['SaaS'], limit=6)['SaaS']
+            self.assertEqual(server.tokens_issued, 2)
+        self.assertEqual(len(records), 6)
+        self.assertTrue(all(len(record['comments']) == 1 for record in records))
+    
+    def test_flatten_nested_comments(self):
+        children = [{
+            'kind': 't1',
+            'data': {
+                'id': 'a', 'author': 'user1', 'body': 'top', 'score': 5,
+                'replies': {'kind': 'Listing', 'data': {'children': [
+                    {'kind': 't1', 'data': {'id': 'b', 'author': 'user2', 'body': 'reply', 'score': 1, 'replies': ''}},
+                    {'kind': 'more', 'data': {'children': ['c']}}
+                ]}}
+            }
+        }]
+        comments = flatten_comments(children)
+        self.assertEqual([c['id'] for c in comments], ['a', 'b'])
+        self.assertEqual([c['depth'] for c in comments], [0, 1])
+
+class TestCrawlerTransport(unittest.TestCase):
+    def test_connections_are_reused(self):
+        subreddits = {'SaaS': generate_posts('SaaS', 10, comments_per_post=1)}
+        transport = CrawlerTransport(proxy=None, pool_size=2)
+        with StandinRedditServer(subreddits) as server:
+            fetcher = AsyncRedditFetcher('test-agent', base_url=server.base_url,
+                                         concurrency=2, transport=transport)
+            fetcher.fetch_all(['SaaS'], limit=10)
+        
+        stats = transport.stats()
+        self.assertEqual(stats['requests'], 11)
+        self.assertLessEqual(stats['connections'], 2 * stats['sessions'])
+        self.assertEqual(stats['reused_connections'], stats['requests'] - stats['connections'])
+        self.assertEqual(stats['tls_handshakes'], 0)
+    
+    def test_proxy_scoped_to_reddit_hosts(self):
+        transport = CrawlerTransport(proxy='socks5h://localhost:9150')
+        session = transport.session()
+        self.assertEqual(session.proxies['https://oauth.reddit.com'], 'socks5h://localhost:9150')
+        self.assertNotIn('https', session.proxies)
+        self.assertTrue(transport.is_proxied('https://www.reddit.com/api/v1/access_token'))
+        self.assertFalse(transport.is_proxied('http://127.0.0.1:5001/api/python/test'))
+    
+    def test_session_per_worker_thread(self):
+        transport = CrawlerTransport(proxy=None)
+        sessions = []
+        worker = threading.Thread(target=lambda: sessions.append(transport.session()))
+        worker.start()
+        worker.join()
+        self.assertIs(transport.session(), transport.session())
+        self.assertIsNot(sessions[0], transport.session())
+
+if __name__ == "__main__":
+    unittest.main() 
@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+import unittest
+import json
+import sqlite3
+import scoring
+
+class TestScoring(unittest.TestCase):
+    def setUp(self):
+        self.db = sqlite3.connect(':memory:')
+        with open('schema.sql') as f:
+            self.db.executescript(f.read())
+    
+    def tearDown(self):
+        self.db.close()
+    
+    def test_score_topics_matches_components(self):
+        scores = scoring.score_topics([
+            {'pain_points': [{'count': 3}, {}], 'growth_rate': 10, 'mention_count': 500},
+            {'mention_count': 5000, 'sentiment_scores': {'urgency': 0.5}}
+        ])
+        self.assertEqual(scores[0]['pain_score'], 4.0)
+        self.assertEqual(scores[0]['growth_score'], 20.0)
+        self.assertEqual(scores[0]['market_score'], 50.0)
+        self.assertEqual(scores[1]['market_score'], 100.0)
+        self.assertEqual(scores[1]['urgency_score'], 50.0)
+        expected = round(4 * 0.35 + 20 * 0.25 + 50 * 0.2, 1)
+        self.assertAlmostEqual(scores[0]['total_score'], expected, places=1)
+    
+    def test_weights_are_normalized(self):
+        topic = [{'mention_count': 1000}]
+        only_market = scoring.score_topics(topic, {'pain': 0, 'growth': 0, 'engagement': 0,
+                                                   'urgency': 0, 'market': 5})
+        self.assertEqual(only_market[0]['total_score'], 100.0)
+        with self.assertRaises(ValueError):
+            scoring.normalize_weights({c: 0 for c in scoring.COMPONENTS})
+    
+    def test_rescore_database(self):
+        rows = [
+            ('crm tool', 'Business', 800, 20.0, json.dumps([{'text': 'slow', 'count': 7}]),
+             json.dumps({'upvotes': 99, 'comments': 0, 'unique_users': 0}),
+             json.dumps({'frustration': 0, 'urgency': 0.2, 'impact': 0})),
+            ('empty tool', 'Other', 0, 0.0, '[]',
+             json.dumps({'upvotes': 0, 'comments': 0, 'unique_users': 0}),
+             json.dumps({'frustration': 0, 'urgency': 0, 'impact': 0}))
+        ]
+        self.db.executemany("""
+            INSERT INTO reddit_topics (name, category, mention_count, growth_percentage,
+                                       pain_points, engagement_metrics, sentiment_scores)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+        
+        self.assertEqual(scoring.rescore_database(self.db), 2)
+        
+        stored = [
+            json.loads(row[0]) for row in
+            self.db.execute("SELECT opportunity_scores FROM reddit_topics ORDER BY id")
+        ]
+        expected = scoring.score_topics([
+            {'pain_points': [{'count': 7}], 'growth_percentage': 20.0, 'mention_count': 800,
+             'engagement_metrics': {'upvotes': 99}, 'sentiment_scores': {'urgency': 0.2}},
+            {}
+        ])
+        self.assertEqual(stored, expected)
+        self.assertEqual(stored[1]['total_score'], 0.0)
+
+if __name__ == "__main__":
+    unittest.main() 
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+import unittest
+import os
+import re
+import signal
+import subprocess
+import sys
+import threading
+import time
+import requests
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+class TestPreforkServer(unittest.TestCase):
+    def setUp(self):
+        # ANALYSIS_CACHE='' keeps the workers off the real cache under data/
+        env = dict(os.environ, ANALYSIS_CACHE='')
+        self.proc = subprocess.Popen(
+            [sys.executable, 'serve.py', '--workers', '2', '--port', '0'],
+            cwd=ROOT, env=env, stderr=subprocess.PIPE, text=True
+        )
+        self.lines = []
+        self.ready = threading.Event()
+        self.reader = threading.Thread(target=self.read_log, daemon=True)
+        self.reader.start()
+
+    def tearDown(self):
+        if self.proc.poll() is None:
+            self.proc.kill()
+            self.proc.wait()
+        self.proc.stderr.close()
+
+    def read_log(self):
+        for line in self.proc.stderr:
+            self.lines.append(line)
+            if len(self.worker_pids()) == 2:
+                self.ready.set()
+
+    def worker_pids(self):
+        return [int(match.group(1)) for line in list(self.lines)
+                for match in [re.search(r'Started worker (\d+)', line)] if match]
+
+    def test_workers_serve_and_are_reaped_on_sigterm(self):
+        self.assertTrue(self.ready.wait(60), ''.join(self.lines))
+        port = next(int(match.group(1)) for line in self.lines
+                    for match in [re.search(r'Serving on http://[^:]+:(\d+)', line)] if match)
+        base_url = f"http://127.0.0.1:{port}"
+
+        deadline = time.monotonic() + 10
+        while True:
+            try:
+                health = requests.get(f"{base_url}/health", timeout=5).json()
+                break
+            except requests.ConnectionError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.1)
+        self.assertEqual((health['status'], health['warmup']), ('ready', 'warm'))
+
+        texts = ['invoice reminders for freelancers', 'project management for small teams',
+                 'automated invoice follow ups', 'team task tracking software'] * 3
+        response = requests.post(f"{base_url}/api/python/analyze/topics",
+                                 json={'texts': texts, 'num_topics': 2}, timeout=30)
+        self.assertEqual(response.status_code, 200, response.text)
+        self.assertEqual(len(response.json()['topics']), 2)
+
+        children = self.worker_pids()
+        self.proc.send_signal(signal.SIGTERM)
+        self.assertEqual(self.proc.wait(timeout=30), 0)
+        for pid in children:
+            with self.assertRaises(ProcessLookupError):
+                os.kill(pid, 0)
+        self.reader.join(5)
+        self.assertFalse(any('restarting' in line for line in self.lines))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+import unittest
+from unittest.mock import patch
+import sqlite3
+import sql_trace
+from sql_trace import QueryLog
+
+class TestQueryTracing(unittest.TestCase):
+    def setUp(self):
+        self.log = QueryLog(slow_ms=1000)
+        self.conn = sql_trace.connect(':memory:', self.log)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("CREATE TABLE t (a INTEGER)")
+        self.conn.executemany("INSERT INTO t VALUES (?)", [(i,) for i in range(100)])
+        self.conn.commit()
+
+    def statement(self, sql):
+        return next(entry for entry in self.log.stats()['statements'] if entry['sql'] == sql)
+
+    def test_statements_are_aggregated_by_sql(self):
+        for value in range(3):
+            self.conn.execute("SELECT a FROM t WHERE a = ?", (value,)).fetchone()
+        for _ in self.conn.execute("SELECT a FROM t"):
+            pass
+        self.assertEqual(self.statement("SELECT a FROM t WHERE a = ?")['calls'], 3)
+        self.assertEqual(self.statement("SELECT a FROM t")['calls'], 1)
+        self.assertEqual(self.statement("INSERT INTO t VALUES (?)")['calls'], 1)
+        self.assertEqual(self.statement("COMMIT")['calls'], 1)
+        self.assertEqual(self.log.stats()['slow'], [])
+
+    def test_slow_queries_show_bound_values(self):
+        self.log.slow_ms = 0
+        self.conn.execute("SELECT a FROM t WHERE a > ?", (42,)).fetchall()
+        self.assertEqual(self.log.stats()['slow'][-1]['sql'], "SELECT a FROM t WHERE a > 42")
+
+    def test_untraced_connections_are_plain(self):
+        self.assertIs(type(sql_trace.connect(':memory:')), sqlite3.Connection)
+
+    def test_tracing_is_off_by_default(self):
+        with patch.dict('os.environ', {'SQL_TRACE': ''}):
+            self.assertIsNone(QueryLog.from_env())
+        with patch.dict('os.environ', {'SQL_TRACE': '1', 'SQL_SLOW_MS': '5'}):
+            self.assertEqual(QueryLog.from_env().slow_ms, 5)
+
+if __name__ == '__main__':
+    unittest.main()
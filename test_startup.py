@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+import unittest
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Cumulative import budgets in microseconds; the heavy analysis stack alone is ~2.5s
+IMPORT_BUDGETS = {
+    'DataCrawler': 500000,
+    'app': 1000000,
+}
+
+HEAVY_MODULES = ['textblob', 'nltk', 'sklearn', 'scipy', 'numpy', 'pandas', 'praw']
+
+def import_times(module):
+    """Run `python -X importtime -c 'import module'` and parse its report"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+class TestStartupTime(unittest.TestCase):
+    def test_no_heavy_imports_at_startup(self):
+        for module in IMPORT_BUDGETS:
+            times = import_times(module)
+            loaded = [name for name in HEAVY_MODULES if name in times]
+            self.assertEqual(loaded, [], f"{module} imports heavy modules at startup: {loaded}")
+    
+    def test_import_time_budget(self):
+        for module, budget in IMPORT_BUDGETS.items():
+            # Take the best of a few runs to keep the check stable on a busy machine
+            cumulative = min(import_times(module)[module] for _ in range(3))
+            self.assertLess(
+                cumulative, budget,
+                f"Importing {module} took {cumulative / 1000:.0f}ms (budget {budget / 1000:.0f}ms)"
+            )
+    
+    def test_topic_keys_is_standalone(self):
+        times = import_times('topic_keys')
+        for module in ('noun_chunk_topics', 'text_store', 'text_analysis'):
+            self.assertNotIn(module, times)
+
+    def test_check_db_needs_no_client_dependencies(self):
+        times = import_times('check_db')
+        self.assertEqual([name for name in ('requests', 'load_test') if name in times], [])
+
+if __name__ == "__main__":
+    unittest.main() 
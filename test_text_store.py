@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+import unittest
+import tempfile
+from text_store import TextStore, phrases_of
+
+class TestTextStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = TextStore(self.tmp.name)
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def test_random_access_across_appends(self):
+        self.assertEqual(self.store.append([
+            {'id': 'a', 'text': 'first post'},
+            {'id': 'b', 'text': 'zweiter Beitrag über Rechnungen'}
+        ]), 2)
+        view = self.store.view('a')
+        self.assertEqual(self.store.get('b'), 'zweiter Beitrag über Rechnungen')
+
+        # A second writer grows the file; the reader remaps while the old view stays valid
+        writer = TextStore(self.tmp.name)
+        try:
+            self.assertEqual(writer.append([{'id': 'a', 'text': 'duplicate'}, {'id': 'c', 'text': ''},
+                                            {'id': 'd', 'text': 'third'}]), 2)
+        finally:
+            writer.close()
+        self.assertEqual(self.store.get('d'), 'third')
+        self.assertEqual(self.store.get('c'), '')
+        self.assertEqual(bytes(view), b'first post')
+        self.assertIsNone(self.store.get('missing'))
+        self.assertEqual(self.store.get('b', max_chars=17), 'zweiter Beitrag ü')
+        self.assertEqual([doc_id for doc_id, _ in self.store.scan()], ['a', 'b', 'c', 'd'])
+
+    def test_postings_link_phrases_to_sources(self):
+        analysis = {
+            'topics': ['invoice tool'],
+            'pain_points': [{'text': 'It  Keeps crashing', 'count': 1}],
+            'solution_requests': [],
+            'app_ideas': []
+        }
+        self.store.append([
+            {'id': 'old', 'text': 'old post', 'created_utc': 1, 'phrases': phrases_of(analysis)},
+            {'id': 'new', 'text': 'new post', 'created_utc': 2, 'subreddit': 'SaaS',
+             'phrases': [('topics', 'invoice tool')]}
+        ])
+        self.assertEqual(self.store.postings('Invoice Tool'), ['new', 'old'])
+        self.assertEqual(self.store.postings('it keeps crashing', kind='pain_points'), ['old'])
+        self.assertEqual(self.store.postings('it keeps crashing', kind='app_ideas'), [])
+        self.assertEqual(self.store.sources('invoice tool', limit=1),
+                         [{'id': 'new', 'subreddit': 'SaaS', 'created_utc': 2, 'text': 'new post'}])
+        self.assertEqual(self.store.stats(), {'texts': 2, 'bytes': 16, 'postings': 3})
+        with self.assertRaises(ValueError):
+            self.store.postings('invoice tool', kind='users')
+
+if __name__ == "__main__":
+    unittest.main()
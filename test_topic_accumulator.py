@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+import unittest
+import os
+import tempfile
+import topic_accumulator
+import topic_keys
+from topic_accumulator import TopicAccumulator
+
+class TestTopicAccumulator(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def aggregate(self, posts, **kwargs):
+        with TopicAccumulator(**kwargs) as accumulator:
+            for topics, sentiment, engagement, pain in posts:
+                accumulator.add(topics, sentiment, engagement, pain, [], [])
+            return accumulator.to_dict(), accumulator
+
+    def test_matches_nested_dict_aggregation(self):
+        posts = list(topic_accumulator.synthetic_posts(500, vocabulary=20))
+        legacy = topic_accumulator._legacy_aggregate(posts)
+        compact, _ = self.aggregate(posts)
+        self.assertEqual(set(compact), set(legacy))
+        for name, data in legacy.items():
+            self.assertEqual(compact[name]['mention_count'], data['mention_count'])
+            self.assertEqual(compact[name]['engagement_metrics'], data['engagement_metrics'])
+            self.assertEqual(compact[name]['sentiment_scores'], data['sentiment_scores'])
+            self.assertEqual(compact[name]['pain_points'], data['pain_points'])
+
+    def test_spilled_topics_are_merged_back(self):
+        posts = list(topic_accumulator.synthetic_posts(500, vocabulary=20))
+        legacy = topic_accumulator._legacy_aggregate(posts)
+        compact, accumulator = self.aggregate(posts, max_topics=50, spill_dir=self.tmp.name)
+
+        self.assertGreater(accumulator.spilled, 0)
+        self.assertEqual({name: data['mention_count'] for name, data in compact.items()},
+                         {name: data['mention_count'] for name, data in legacy.items()})
+        self.assertEqual(sum(len(d['pain_points']) for d in compact.values()),
+                         sum(len(d['pain_points']) for d in legacy.values()))
+        self.assertEqual(os.listdir(self.tmp.name), [])
+
+    def test_items_stream_in_key_order_for_merging(self):
+        posts = list(topic_accumulator.synthetic_posts(500, vocabulary=20))
+        expected = topic_keys.merge_variants(topic_accumulator._legacy_aggregate(posts))
+        with TopicAccumulator(max_topics=50, spill_dir=self.tmp.name) as accumulator:
+            for topics, sentiment, engagement, pain in posts:
+                accumulator.add(topics, sentiment, engagement, pain, [], [])
+            items = list(accumulator.items(key=topic_keys.canonical_key))
+            # Everything is read back from the spill file, none of it held in memory
+            self.assertEqual(len(accumulator), 0)
+        keys = [topic_keys.canonical_key(name) for name, _ in items]
+        self.assertEqual(keys, sorted(keys))
+
+        merged = dict(topic_keys.merge_sorted_variants(items))
+        self.assertEqual({name: data['mention_count'] for name, data in merged.items()},
+                         {name: data['mention_count'] for name, data in expected.items()})
+
+    def test_spill_files_are_private_to_each_run(self):
+        posts = [([f"rare {i} tool"], {}, {'upvotes': 1}, []) for i in range(20)]
+        first = TopicAccumulator(max_topics=4, spill_dir=self.tmp.name)
+        second = TopicAccumulator(max_topics=4, spill_dir=self.tmp.name)
+        for accumulator in (first, second):
+            for topics, sentiment, engagement, pain in posts:
+                accumulator.add(topics, sentiment, engagement, pain, [], [])
+        self.assertNotEqual(first.spill_path, second.spill_path)
+        # An abandoned run's file is never read by the next one
+        first._spill.close()
+        first._spill = None
+        self.assertEqual({data['mention_count'] for data in second.to_dict().values()}, {1})
+        second.close()
+        self.assertEqual(os.listdir(self.tmp.name), [os.path.basename(first.spill_path)])
+
+    def test_cap_without_spill_evicts_rare_topics(self):
+        posts = [(['popular app'], {'frustration': 0.5}, {'upvotes': 1}, [])] * 3
+        posts += [([f"rare {i} tool"], {}, {}, []) for i in range(20)]
+        compact, accumulator = self.aggregate(posts, max_topics=10)
+        self.assertLessEqual(len(compact), 10)
+        self.assertEqual(compact['popular app']['mention_count'], 3)
+        self.assertEqual(compact['popular app']['sentiment_scores']['frustration'], 0.5)
+        self.assertGreater(accumulator.evicted, 0)
+
+if __name__ == "__main__":
+    unittest.main()
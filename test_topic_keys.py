@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+import unittest
+import json
+import sqlite3
+import topic_keys
+from topic_keys import canonical_key
+
+def topic(mentions, upvotes=0, frustration=0.0, pain=None):
+    return {
+        'mention_count': mentions,
+        'pain_points': [{'text': pain, 'count': 1}] if pain else [],
+        'solution_requests': [],
+        'app_ideas': [],
+        'trend_data': [],
+        'sentiment_scores': {'frustration': frustration, 'urgency': 0.0, 'impact': 0.0},
+        'engagement_metrics': {'upvotes': upvotes, 'comments': 0, 'unique_users': 1}
+    }
+
+class TestCanonicalKey(unittest.TestCase):
+    def test_variants_share_a_key(self):
+        variants = ['project management tool', 'Project Management Software',
+                    'the project management apps', 'a good project-management  tool']
+        self.assertEqual({canonical_key(name) for name in variants}, {'project management'})
+        self.assertEqual(canonical_key('CRM tools'), canonical_key('crm app'))
+        self.assertEqual(canonical_key('small businesses analytics'), 'small business analytics')
+        self.assertNotEqual(canonical_key('invoice tool'), canonical_key('invoice reminder tool'))
+
+    def test_plurals_fold_to_their_singular(self):
+        self.assertEqual(canonical_key('data analyses tool'), 'data analysis')
+        self.assertEqual(canonical_key('cost analysis tool'), canonical_key('cost analyses app'))
+        self.assertEqual(canonical_key('medical diagnoses'), 'medical diagnosis')
+        self.assertEqual(canonical_key('caches'), 'cache')
+        self.assertEqual(canonical_key('companies'), 'company')
+        self.assertEqual(canonical_key('classes'), 'class')
+
+    def test_bare_product_nouns_keep_a_key(self):
+        self.assertEqual(canonical_key('the app'), 'app')
+        self.assertEqual(canonical_key('this'), 'this')
+
+    def test_merge_variants_keeps_the_most_mentioned_name(self):
+        merged = topic_keys.merge_variants({
+            'crm tool': topic(2, upvotes=5, frustration=0.5, pain='slow sync'),
+            'crm software': topic(7, upvotes=1, frustration=0.1),
+            'invoice app': topic(1)
+        })
+        self.assertEqual(sorted(merged), ['crm software', 'invoice app'])
+        crm = merged['crm software']
+        self.assertEqual(crm['mention_count'], 9)
+        self.assertEqual(crm['engagement_metrics']['upvotes'], 6)
+        self.assertEqual(crm['sentiment_scores']['frustration'], 0.5)
+        self.assertEqual(crm['pain_points'], [{'text': 'slow sync', 'count': 1}])
+
+class TestAliases(unittest.TestCase):
+    def setUp(self):
+        self.db = sqlite3.connect(':memory:')
+        with open('schema.sql') as f:
+            self.db.executescript(f.read())
+
+    def tearDown(self):
+        self.db.close()
+
+    def insert(self, name, mentions, upvotes=0, pain=None):
+        data = topic(mentions, upvotes, pain=pain)
+        return self.db.execute("""
+            INSERT INTO reddit_topics (name, category, mention_count, pain_points, engagement_metrics)
+            VALUES (?, 'Other', ?, ?, ?)
+        """, (name, mentions, json.dumps(data['pain_points']), json.dumps(data['engagement_metrics']))).lastrowid
+
+    def test_resolve_by_alias_key_or_legacy_name(self):
+        legacy = self.insert('invoice app', 3)
+        self.assertEqual(topic_keys.resolve(self.db, 'invoice app'), legacy)
+        self.assertEqual(topic_keys.resolve(self.db, 'Invoice Apps'), legacy)
+        self.assertEqual(topic_keys.aliases(self.db, legacy), ['Invoice Apps', 'invoice app'])
+        self.assertIsNone(topic_keys.resolve(self.db, 'crm tool'))
+
+    def test_compact_merges_duplicate_rows(self):
+        keep = self.insert('project management tool', 10, upvotes=4, pain='too many clicks')
+        first = self.insert('project management software', 2, upvotes=1, pain='no gantt chart')
+        self.insert('the project management apps', 1)
+        other = self.insert('crm tool', 5)
+        topic_keys.add_alias(self.db, 'pm software', first)
+        self.db.commit()
+
+        self.assertEqual(topic_keys.compact(self.db, dry_run=True), {'topics': 4, 'groups': 1, 'merged': 2})
+        self.assertEqual(self.db.execute("SELECT COUNT(*) FROM reddit_topics").fetchone()[0], 4)
+        topic_keys.compact(self.db)
+
+        rows = self.db.execute("SELECT id, mention_count, pain_points, engagement_metrics FROM reddit_topics ORDER BY id").fetchall()
+        self.assertEqual([row[0] for row in rows], [keep, other])
+        self.assertEqual(rows[0][1], 13)
+        self.assertEqual([point['text'] for point in json.loads(rows[0][2])], ['too many clicks', 'no gantt chart'])
+        self.assertEqual(json.loads(rows[0][3])['upvotes'], 5)
+        self.assertEqual(topic_keys.resolve(self.db, 'pm software'), keep)
+        self.assertEqual(topic_keys.resolve(self.db, 'the project management apps'), keep)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,238 @@
+#!/usr/bin/env python
+"""Stateless text analysis shared by DataCrawler, app.py and worker processes.
+
+Everything here is a module-level function of plain strings so it can be
+pickled into an analysis worker process.
+"""
+import re
+from typing import List, Dict, Any, Optional, Tuple
+import analysis_backends
+
+# Bump whenever an extractor's output changes, so cached analyses are recomputed
+ANALYZER_VERSION = '1'
+
+# Frustration keywords for sentiment analysis
+FRUSTRATION_KEYWORDS = [
+    'hate', 'annoying', 'struggling', 'difficult', 'frustrated',
+    'tired of', 'sick of', 'pain point', 'problem', 'issue',
+    'challenge', 'headache', 'nightmare', 'waste', 'inefficient'
+]
+
+URGENCY_WORDS = ['asap', 'urgent', 'immediately', 'critical', 'emergency']
+IMPACT_WORDS = ['everyone', 'all', 'major', 'significant', 'huge']
+
+# Common SaaS-related keywords
+SAAS_KEYWORDS = r'(app|platform|software|tool|solution|system|service|automation|management|analytics)'
+
+# Pattern to match potential SaaS topics
+TOPIC_PATTERN = re.compile(r'(\b\w+(?:\s+\w+)*)\s+(' + SAAS_KEYWORDS + r')\b')
+
+PAIN_PATTERNS = [re.compile(p) for p in [
+    r'(?:struggling|frustrated|difficult|hard|impossible|annoying|hate)\s+(?:with|to|when|that|how)\s+([^.!?]+)',
+    r'(?:wish|need|want)\s+(?:there\s+was|to\s+find|to\s+have)\s+([^.!?]+)',
+    r'(?:problem|issue|challenge)\s+(?:with|is|when)\s+([^.!?]+)'
+]]
+
+SOLUTION_PATTERNS = [re.compile(p) for p in [
+    r'(?:looking\s+for|need|want)\s+(?:a|an|some)\s+(?:way|tool|solution|app)\s+to\s+([^.!?]+)',
+    r'(?:how\s+can\s+I|what\'s\s+the\s+best\s+way\s+to)\s+([^.!?]+)',
+    r'(?:recommend|suggest)\s+(?:a|an|any)\s+(?:tool|app|solution|software)\s+for\s+([^.!?]+)'
+]]
+
+IDEA_PATTERNS = [re.compile(p) for p in [
+    r'(?:should\s+build|could\s+create|idea\s+for)\s+(?:a|an|some)\s+(?:app|tool|platform|solution)\s+(?:that|to|for)\s+([^.!?]+)',
+    r'(?:what\s+if|imagine)\s+(?:there\s+was|we\s+had)\s+(?:a|an|some)\s+(?:app|tool|platform)\s+that\s+([^.!?]+)',
+    r'(?:potential|opportunity)\s+for\s+(?:a|an|some)\s+(?:app|tool|platform)\s+to\s+([^.!?]+)'
+]]
+
+
+def extract_potential_topics(text: str) -> List[str]:
+    """Extract potential SaaS topics from text using regex patterns"""
+    matches = TOPIC_PATTERN.findall(text.lower())
+    # Extract the topic name from the match tuples and combine with the keyword
+    topics = [f"{match[0]} {match[1]}" for match in matches]
+    return list(set(topics))
+
+
+def _extract(patterns, text: str) -> List[Dict[str, Any]]:
+    results = []
+    seen = set()
+    for pattern in patterns:
+        for match in pattern.findall(text.lower()):
+            if match.strip() not in seen:
+                seen.add(match.strip())
+                results.append({'text': match.strip(), 'count': 1})
+    return results
+
+
+def extract_pain_points(text: str) -> List[Dict[str, Any]]:
+    """Extract pain points from text"""
+    return _extract(PAIN_PATTERNS, text)
+
+
+def extract_solution_requests(text: str) -> List[Dict[str, Any]]:
+    """Extract solution requests from text"""
+    return _extract(SOLUTION_PATTERNS, text)
+
+
+def extract_app_ideas(text: str) -> List[Dict[str, Any]]:
+    """Extract app ideas from text"""
+    return _extract(IDEA_PATTERNS, text)
+
+
+def analyze_sentiment(text: str) -> Dict[str, float]:
+    """Analyze sentiment and frustration levels in text."""
+    TextBlob = analysis_backends.get('textblob')
+    blob = TextBlob(text.lower())
+
+    # Calculate base sentiment
+    sentiment = blob.sentiment.polarity
+
+    # Calculate frustration score
+    frustration_score = sum(
+        1 for keyword in FRUSTRATION_KEYWORDS
+        if keyword in text.lower()
+    ) / len(FRUSTRATION_KEYWORDS)
+
+    # Calculate urgency based on time-related words and exclamation marks
+    urgency_score = (
+        sum(1 for word in URGENCY_WORDS if word in text.lower()) +
+        text.count('!')
+    ) / (len(URGENCY_WORDS) + 1)
+
+    # Calculate impact based on mentions of scale/importance
+    impact_score = sum(1 for word in IMPACT_WORDS if word in text.lower()) / len(IMPACT_WORDS)
+
+    return {
+        "frustration": min(frustration_score, 1.0),
+        "urgency": min(urgency_score, 1.0),
+        "impact": min(impact_score, 1.0)
+    }
+
+
+def analyze_text(text: str, topics: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Run every crawler extractor over one submission text.
+
+    Topics are extracted first, unless a batch extractor already supplied
+    them; texts without a topic are never aggregated, so the expensive
+    sentiment pass is skipped for them.
+    """
+    if topics is None:
+        topics = extract_potential_topics(text)
+    if not topics:
+        return {'topics': []}
+    return {
+        'topics': topics,
+        'sentiment': analyze_sentiment(text),
+        'pain_points': extract_pain_points(text),
+        'solution_requests': extract_solution_requests(text),
+        'app_ideas': extract_app_ideas(text)
+    }
+
+
+def analyze_text_with_topics(item: Tuple[str, List[str]]) -> Dict[str, Any]:
+    """analyze_text over a (text, topics) pair, for AnalysisExecutor.map"""
+    text, topics = item
+    return analyze_text(text, topics)
+
+
+def analyze_comment(text: str) -> Dict[str, Any]:
+    """Extract phrases from one comment; topics and sentiment come from its submission"""
+    return {
+        'pain_points': extract_pain_points(text),
+        'solution_requests': extract_solution_requests(text),
+        'app_ideas': extract_app_ideas(text)
+    }
+
+
+def extract_topic_clusters(texts: List[str], n_components: int = 5) -> List[Dict[str, Any]]:
+    """Use LDA to identify topic clusters in the texts."""
+    if not texts:
+        return []
+
+    CountVectorizer, LatentDirichletAllocation = analysis_backends.get('topic_model')
+    vectorizer = CountVectorizer(
+        max_df=0.95, min_df=2, stop_words='english'
+    )
+    lda = LatentDirichletAllocation(
+        n_components=n_components, random_state=42
+    )
+
+    # Prepare the document-term matrix; too few distinct terms leaves nothing to cluster
+    try:
+        dtm = vectorizer.fit_transform(texts)
+    except ValueError:
+        return []
+
+    # Fit LDA model
+    lda_output = lda.fit_transform(dtm)
+
+    # Get feature names (words)
+    feature_names = vectorizer.get_feature_names_out()
+
+    # Extract topics
+    topics = []
+    for topic_idx, topic in enumerate(lda.components_):
+        top_words = [
+            feature_names[i]
+            for i in topic.argsort()[:-10 - 1:-1]
+        ]
+        topics.append({
+            "id": topic_idx,
+            "words": top_words,
+            "weight": float(lda_output[:, topic_idx].mean())
+        })
+
+    return topics
+
+
+def extract_lda_topics(texts: List[str], num_topics: int = 5) -> List[Dict[str, Any]]:
+    """Fit LDA to the texts and return each topic's top words and total weight"""
+    CountVectorizer, LatentDirichletAllocation = analysis_backends.get('topic_model')
+    vectorizer = CountVectorizer(
+        max_df=0.95, min_df=2, stop_words='english'
+    )
+    dtm = vectorizer.fit_transform(texts)
+
+    lda = LatentDirichletAllocation(
+        n_components=num_topics, random_state=42
+    )
+    lda.fit(dtm)
+
+    feature_names = vectorizer.get_feature_names_out()
+    topics = []
+    for topic_idx, topic in enumerate(lda.components_):
+        top_words_idx = topic.argsort()[:-10 - 1:-1]
+        topics.append({
+            'id': topic_idx,
+            'words': [feature_names[i] for i in top_words_idx],
+            'weight': float(topic.sum())
+        })
+    return topics
+
+
+def polarity(text: str) -> Dict[str, float]:
+    """TextBlob polarity and subjectivity of a text"""
+    TextBlob = analysis_backends.get('textblob')
+    sentiment = TextBlob(text).sentiment
+    return {'polarity': sentiment.polarity, 'subjectivity': sentiment.subjectivity}
+
+
+def find_pain_sentences(text: str, pain_keywords: List[str] = FRUSTRATION_KEYWORDS) -> List[Dict[str, Any]]:
+    """Return the sentences of a text that mention a pain keyword, with frustration scores"""
+    if not any(keyword in text.lower() for keyword in pain_keywords):
+        return []
+
+    TextBlob = analysis_backends.get('textblob')
+    blob = TextBlob(text.lower())
+    pain_points = []
+    # Extract sentences containing pain keywords
+    for sentence in blob.sentences:
+        if any(keyword in sentence.string.lower() for keyword in pain_keywords):
+            # Calculate frustration score
+            frustration = max(0, min(100, (1 - sentence.sentiment.polarity) * 100))
+            pain_points.append({
+                'text': sentence.string,
+                'frustration_score': round(frustration, 1)
+            })
+    return pain_points
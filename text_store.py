@@ -0,0 +1,200 @@
+#!/usr/bin/env python
+"""Append-only store of crawled submission text.
+
+Texts are concatenated into one data file that readers memory-map, so a
+lookup is a slice of the mapping rather than a copy out of a SQLite row.
+A SQLite index maps each submission id to its (offset, length) in the
+file, and postings map every extracted phrase (topic, pain point,
+solution request, app idea) back to the submissions it came from, which is
+what lets the API drill down from a pain point to its source posts.
+
+Layout under the store directory::
+
+    texts.dat      UTF-8 texts back to back
+    index.db       texts and postings tables
+"""
+import logging
+import mmap
+import os
+import sqlite3
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Posting kinds, named like the phrase lists of a topic and the export kinds
+KINDS = ['topics', 'pain_points', 'solution_requests', 'app_ideas']
+
+INDEX_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS texts (
+        doc_id TEXT PRIMARY KEY,
+        offset INTEGER NOT NULL,
+        length INTEGER NOT NULL,
+        subreddit TEXT,
+        created_utc REAL
+    );
+    CREATE TABLE IF NOT EXISTS postings (
+        phrase TEXT NOT NULL,
+        kind TEXT NOT NULL,
+        doc_id TEXT NOT NULL,
+        PRIMARY KEY (phrase, kind, doc_id)
+    ) WITHOUT ROWID;
+"""
+
+
+def normalize_phrase(phrase: str) -> str:
+    """Postings are keyed case- and whitespace-insensitively"""
+    return ' '.join(phrase.lower().split())
+
+
+def phrases_of(analysis: Dict[str, Any]) -> Iterator[Tuple[str, str]]:
+    """(kind, phrase) pairs extracted from one text_analysis.analyze_text result"""
+    for topic in analysis.get('topics') or []:
+        yield 'topics', topic
+    for kind in KINDS[1:]:
+        for point in analysis.get(kind) or []:
+            yield kind, point['text']
+
+
+class TextStore:
+    """Memory-mapped submission texts with an id-to-offset index and phrase postings"""
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.data_path = os.path.join(path, 'texts.dat')
+        self.index = sqlite3.connect(os.path.join(path, 'index.db'), timeout=30)
+        self.index.executescript(INDEX_SCHEMA)
+        self.index.commit()
+        self._map = None
+
+    def append(self, docs: Iterable[Dict[str, Any]]) -> int:
+        """Store texts not stored yet and their phrase postings; returns the texts written.
+
+        Each doc has ``id`` and ``text`` and optionally ``subreddit``,
+        ``created_utc`` and ``phrases``, an iterable of (kind, phrase).
+        Postings are added for known ids too, so re-crawls keep them current.
+        """
+        docs = list(docs)
+        if not docs:
+            return 0
+
+        self.index.execute("BEGIN IMMEDIATE")
+        try:
+            known = set()
+            ids = [doc['id'] for doc in docs]
+            for i in range(0, len(ids), 500):
+                chunk = ids[i:i + 500]
+                known.update(row[0] for row in self.index.execute(
+                    f"SELECT doc_id FROM texts WHERE doc_id IN ({','.join('?' * len(chunk))})", chunk))
+
+            rows = []
+            # The index write lock is held, so nobody else is appending to the file
+            with open(self.data_path, 'ab') as f:
+                offset = f.seek(0, os.SEEK_END)
+                for doc in docs:
+                    if doc['id'] in known:
+                        continue
+                    known.add(doc['id'])
+                    data = doc['text'].encode('utf-8')
+                    f.write(data)
+                    rows.append((doc['id'], offset, len(data), doc.get('subreddit'), doc.get('created_utc')))
+                    offset += len(data)
+                f.flush()
+                os.fsync(f.fileno())
+
+            self.index.executemany(
+                "INSERT INTO texts (doc_id, offset, length, subreddit, created_utc) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            self.index.executemany(
+                "INSERT OR IGNORE INTO postings (phrase, kind, doc_id) VALUES (?, ?, ?)",
+                ((normalize_phrase(phrase), kind, doc['id'])
+                 for doc in docs for kind, phrase in doc.get('phrases') or [])
+            )
+            self.index.commit()
+        except Exception:
+            self.index.rollback()
+            raise
+        if rows:
+            logging.info(f"Appended {len(rows)} texts to the text store")
+        return len(rows)
+
+    def _view(self, offset: int, length: int) -> memoryview:
+        """Zero-copy view of a byte range, remapping once the file has grown past the mapping"""
+        end = offset + length
+        if self._map is None or end > len(self._map):
+            # Views handed out earlier keep the old mapping alive until they are released
+            with open(self.data_path, 'rb') as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return memoryview(self._map)[offset:end]
+
+    def view(self, doc_id: str) -> Optional[memoryview]:
+        """The raw UTF-8 bytes of a stored text, without copying them"""
+        row = self.index.execute("SELECT offset, length FROM texts WHERE doc_id = ?", (doc_id,)).fetchone()
+        if row is None:
+            return None
+        return self._view(*row) if row[1] else memoryview(b'')
+
+    def get(self, doc_id: str, max_chars: Optional[int] = None) -> Optional[str]:
+        """Decode one stored text, optionally truncated to about ``max_chars``"""
+        data = self.view(doc_id)
+        if data is None:
+            return None
+        if max_chars is not None:
+            # UTF-8 needs at most four bytes per character; a cut-off character is dropped
+            return str(data[:max_chars * 4], 'utf-8', 'ignore')[:max_chars]
+        return str(data, 'utf-8')
+
+    def postings(self, phrase: str, kind: Optional[str] = None, limit: Optional[int] = None) -> List[str]:
+        """Ids of the submissions a phrase was extracted from, newest first"""
+        query = """
+            SELECT DISTINCT p.doc_id FROM postings p
+            LEFT JOIN texts t ON t.doc_id = p.doc_id
+            WHERE p.phrase = ?
+        """
+        params = [normalize_phrase(phrase)]
+        if kind:
+            if kind not in KINDS:
+                raise ValueError(f"Unknown phrase kind: {kind}")
+            query += " AND p.kind = ?"
+            params.append(kind)
+        query += " ORDER BY t.created_utc DESC"
+        if limit:
+            query += " LIMIT ?"
+            params.append(int(limit))
+        return [row[0] for row in self.index.execute(query, params)]
+
+    def sources(self, phrase: str, kind: Optional[str] = None, limit: int = 20,
+                max_chars: Optional[int] = None) -> List[Dict[str, Any]]:
+        """The stored submissions a phrase came from, with their text"""
+        sources = []
+        for doc_id in self.postings(phrase, kind, limit):
+            row = self.index.execute(
+                "SELECT subreddit, created_utc FROM texts WHERE doc_id = ?", (doc_id,)
+            ).fetchone()
+            if row is None:
+                continue
+            sources.append({
+                'id': doc_id,
+                'subreddit': row[0],
+                'created_utc': row[1],
+                'text': self.get(doc_id, max_chars)
+            })
+        return sources
+
+    def scan(self, since: Optional[float] = None) -> Iterator[Tuple[str, str]]:
+        """(doc_id, text) of every stored text in file order, for re-analysis"""
+        query = "SELECT doc_id, offset, length FROM texts"
+        params = []
+        if since is not None:
+            query += " WHERE created_utc >= ?"
+            params.append(since)
+        for doc_id, offset, length in self.index.execute(query + " ORDER BY offset", params).fetchall():
+            yield doc_id, str(self._view(offset, length), 'utf-8') if length else ''
+
+    def stats(self) -> Dict[str, int]:
+        texts, size = self.index.execute("SELECT COUNT(*), COALESCE(SUM(length), 0) FROM texts").fetchone()
+        postings = self.index.execute("SELECT COUNT(*) FROM postings").fetchone()[0]
+        return {'texts': texts, 'bytes': size, 'postings': postings}
+
+    def close(self):
+        self._map = None
+        self.index.close()
@@ -0,0 +1,340 @@
+#!/usr/bin/env python
+"""Compact per-run aggregation of topic mentions.
+
+Each topic name is interned and mapped to a small integer slot. Numeric
+counters live in flat ``array`` columns indexed by slot instead of one dict
+per topic, and phrase lists are only allocated once a topic actually has
+phrases. With ``max_topics`` set, the least mentioned topics are evicted
+whenever the cap is exceeded, and spilled to a private SQLite file in
+``spill_dir`` if one is given so their counts are merged back before the
+write phase. ``items(key)`` then streams every topic back from that file
+in key order, so the write phase never holds more than one key's variants.
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import tracemalloc
+from array import array
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import topic_keys
+
+SENTIMENT_KEYS = ['frustration', 'urgency', 'impact']
+ENGAGEMENT_KEYS = ['upvotes', 'comments', 'unique_users']
+PHRASE_KINDS = ['pain_points', 'solution_requests', 'app_ideas']
+
+SPILL_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS spill_topics (
+        name TEXT PRIMARY KEY,
+        mention_count INTEGER NOT NULL,
+        upvotes INTEGER NOT NULL,
+        comments INTEGER NOT NULL,
+        unique_users INTEGER NOT NULL,
+        frustration REAL NOT NULL,
+        urgency REAL NOT NULL,
+        impact REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS spill_phrases (
+        name TEXT NOT NULL,
+        kind TEXT NOT NULL,
+        value TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_spill_phrases_name ON spill_phrases(name);
+"""
+
+
+class TopicPhrases:
+    """Phrase lists of one topic, allocated only when the topic has phrases"""
+    __slots__ = ('pain_points', 'solution_requests', 'app_ideas')
+
+    def __init__(self):
+        self.pain_points = []
+        self.solution_requests = []
+        self.app_ideas = []
+
+
+class TopicAccumulator:
+    """Aggregate topic mentions, sentiment, engagement and phrases for one run"""
+
+    def __init__(self, max_topics: Optional[int] = None, spill_dir: Optional[str] = None):
+        self.max_topics = max_topics
+        self.spill_dir = spill_dir
+        self.spill_path = None
+        self._ids = {}
+        self._names = []
+        self._free = []
+        self._phrases = []
+        self._mentions = array('q')
+        self._engagement = {key: array('q') for key in ENGAGEMENT_KEYS}
+        self._sentiment = {key: array('d') for key in SENTIMENT_KEYS}
+        self._spill = None
+        self.evicted = 0
+        self.spilled = 0
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _slot(self, name: str) -> int:
+        slot = self._ids.get(name)
+        if slot is not None:
+            return slot
+        name = sys.intern(name)
+        if self._free:
+            slot = self._free.pop()
+            self._names[slot] = name
+        else:
+            slot = len(self._names)
+            self._names.append(name)
+            self._phrases.append(None)
+            self._mentions.append(0)
+            for column in self._engagement.values():
+                column.append(0)
+            for column in self._sentiment.values():
+                column.append(0.0)
+        self._ids[name] = slot
+        return slot
+
+    def add(self, topics: Iterable[str], sentiment: Dict[str, float], engagement: Dict[str, int],
+            pain_points: List[Dict[str, Any]], solution_requests: List[Dict[str, Any]],
+            app_ideas: List[Dict[str, Any]]):
+        """Record one post mentioning ``topics``"""
+        for topic in topics:
+            slot = self._slot(topic)
+            self._mentions[slot] += 1
+            for key, value in sentiment.items():
+                column = self._sentiment[key]
+                if value > column[slot]:
+                    column[slot] = value
+            for key, value in engagement.items():
+                self._engagement[key][slot] += value
+            if pain_points or solution_requests or app_ideas:
+                phrases = self._phrases[slot]
+                if phrases is None:
+                    phrases = self._phrases[slot] = TopicPhrases()
+                phrases.pain_points.extend(pain_points)
+                phrases.solution_requests.extend(solution_requests)
+                phrases.app_ideas.extend(app_ideas)
+        if self.max_topics and len(self._ids) > self.max_topics:
+            self._evict()
+
+    def _evict(self):
+        """Drop the least mentioned topics down to half the cap, spilling them if enabled"""
+        keep = max(1, self.max_topics // 2)
+        ranked = sorted(self._ids.values(), key=self._mentions.__getitem__, reverse=True)
+        victims = ranked[keep:]
+        if self.spill_dir:
+            self._spill_slots(victims)
+            self.spilled += len(victims)
+        else:
+            self.evicted += len(victims)
+        self._drop(victims)
+        logging.info(f"Evicted {len(victims)} low-count topics ({len(self._ids)} kept in memory)")
+
+    def _drop(self, slots: List[int]):
+        for slot in slots:
+            del self._ids[self._names[slot]]
+            self._names[slot] = None
+            self._phrases[slot] = None
+            self._mentions[slot] = 0
+            for column in self._engagement.values():
+                column[slot] = 0
+            for column in self._sentiment.values():
+                column[slot] = 0.0
+            self._free.append(slot)
+
+    def _spill_db(self):
+        if self._spill is None:
+            # A fresh file per run: nothing left by a crashed run or another worker is merged in
+            fd, self.spill_path = tempfile.mkstemp(prefix='topic_spill_', suffix='.db', dir=self.spill_dir)
+            os.close(fd)
+            self._spill = sqlite3.connect(self.spill_path)
+            self._spill.executescript(SPILL_SCHEMA)
+        return self._spill
+
+    def _spill_slots(self, slots: List[int]):
+        db = self._spill_db()
+        db.executemany("""
+            INSERT INTO spill_topics VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(name) DO UPDATE SET
+                mention_count = mention_count + excluded.mention_count,
+                upvotes = upvotes + excluded.upvotes,
+                comments = comments + excluded.comments,
+                unique_users = unique_users + excluded.unique_users,
+                frustration = max(frustration, excluded.frustration),
+                urgency = max(urgency, excluded.urgency),
+                impact = max(impact, excluded.impact)
+        """, (
+            (self._names[slot], self._mentions[slot],
+             *(self._engagement[key][slot] for key in ENGAGEMENT_KEYS),
+             *(self._sentiment[key][slot] for key in SENTIMENT_KEYS))
+            for slot in slots
+        ))
+        db.executemany(
+            "INSERT INTO spill_phrases (name, kind, value) VALUES (?, ?, ?)",
+            (
+                (self._names[slot], kind, json.dumps(phrase))
+                for slot in slots if self._phrases[slot] is not None
+                for kind in PHRASE_KINDS
+                for phrase in getattr(self._phrases[slot], kind)
+            )
+        )
+        db.commit()
+
+    def _slot_data(self, slot: int) -> Dict[str, Any]:
+        phrases = self._phrases[slot]
+        return {
+            'mention_count': self._mentions[slot],
+            'pain_points': list(phrases.pain_points) if phrases else [],
+            'solution_requests': list(phrases.solution_requests) if phrases else [],
+            'app_ideas': list(phrases.app_ideas) if phrases else [],
+            'trend_data': [],
+            'sentiment_scores': {key: self._sentiment[key][slot] for key in SENTIMENT_KEYS},
+            'engagement_metrics': {key: self._engagement[key][slot] for key in ENGAGEMENT_KEYS}
+        }
+
+    def _spilled_data(self, row) -> Dict[str, Any]:
+        name, mentions, upvotes, comments, unique_users, frustration, urgency, impact = row
+        data = {
+            'mention_count': mentions,
+            'pain_points': [],
+            'solution_requests': [],
+            'app_ideas': [],
+            'trend_data': [],
+            'sentiment_scores': {'frustration': frustration, 'urgency': urgency, 'impact': impact},
+            'engagement_metrics': {'upvotes': upvotes, 'comments': comments, 'unique_users': unique_users}
+        }
+        for kind, value in self._spill.execute(
+                "SELECT kind, value FROM spill_phrases WHERE name = ? ORDER BY rowid", (name,)):
+            data[kind].append(json.loads(value))
+        return data
+
+    def items(self, key: Optional[Callable[[str], str]] = None) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yield (topic, data) for every topic, ordered by ``key(topic)`` if given.
+
+        Once anything was spilled, the topics still in memory are spilled too
+        and all of them are read back one at a time, sorted by SQLite.
+        """
+        if self._spill is None:
+            names = sorted(self._ids, key=key) if key else list(self._ids)
+            for name in names:
+                yield name, self._slot_data(self._ids[name])
+            return
+
+        slots = list(self._ids.values())
+        self._spill_slots(slots)
+        self._drop(slots)
+        self._spill.create_function('sort_key', 1, key or (lambda name: name), deterministic=True)
+        for row in self._spill.execute("SELECT * FROM spill_topics ORDER BY sort_key(name), name"):
+            yield row[0], self._spilled_data(row)
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        return dict(self.items())
+
+    def close(self):
+        """Discard the spill file"""
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+            os.remove(self.spill_path)
+            self.spill_path = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _legacy_aggregate(posts):
+    """The nested-dict aggregation the crawler used before TopicAccumulator"""
+    from collections import defaultdict
+    topics_data = defaultdict(lambda: {
+        'mention_count': 0,
+        'pain_points': [],
+        'solution_requests': [],
+        'app_ideas': [],
+        'trend_data': [],
+        'sentiment_scores': {"frustration": 0, "urgency": 0, "impact": 0},
+        'engagement_metrics': {"upvotes": 0, "comments": 0, "unique_users": 0}
+    })
+    for topics, sentiment, engagement, pain_points in posts:
+        for topic in topics:
+            data = topics_data[topic]
+            data['mention_count'] += 1
+            for key in sentiment:
+                data['sentiment_scores'][key] = max(data['sentiment_scores'][key], sentiment[key])
+            for key in engagement:
+                data['engagement_metrics'][key] += engagement[key]
+            data['pain_points'].extend(pain_points)
+    return topics_data
+
+
+def synthetic_posts(count: int, vocabulary: int = 5000, seed: int = 42):
+    """Posts with a Zipf-like topic distribution, where most topic strings appear once"""
+    rng = random.Random(seed)
+    for i in range(count):
+        topics = [f"{rng.choice(['crm', 'invoice', 'scheduling', 'backup'])} tool {int(rng.paretovariate(0.8)) % vocabulary}",
+                  f"one off phrase {i} management app"]
+        pain = [{'text': f"struggling with sync {i}", 'pattern': 'struggling with'}] if i % 10 == 0 else []
+        yield (topics, {'frustration': rng.random(), 'urgency': 0.0, 'impact': 0.0},
+               {'upvotes': rng.randint(0, 50), 'comments': rng.randint(0, 10), 'unique_users': 1}, pain)
+
+
+def _write_topics(items: Iterable[Tuple[str, Dict[str, Any]]], path: str) -> int:
+    """The write phase: one row per merged topic, as the crawler's update_database writes them"""
+    db = sqlite3.connect(path)
+    db.execute("CREATE TABLE topics (name TEXT PRIMARY KEY, mention_count INTEGER, data TEXT)")
+    count = 0
+    for name, data in items:
+        db.execute("INSERT INTO topics VALUES (?, ?, ?)", (name, data['mention_count'], json.dumps(data)))
+        count += 1
+    db.commit()
+    db.close()
+    return count
+
+
+def benchmark(posts: int, max_topics: Optional[int] = None, spill_dir: Optional[str] = None) -> Dict[str, float]:
+    """Peak traced memory (MB) of the legacy and compact aggregations over ``posts`` posts,
+    through merging name variants and writing the topics out"""
+    results = {}
+    with tempfile.TemporaryDirectory() as out:
+        tracemalloc.start()
+        legacy = _legacy_aggregate(synthetic_posts(posts))
+        results['legacy_topics'] = _write_topics(
+            topic_keys.merge_variants(legacy).items(), os.path.join(out, 'legacy.db'))
+        results['legacy_mb'] = tracemalloc.get_traced_memory()[1] / 1e6
+        del legacy
+        tracemalloc.stop()
+
+        tracemalloc.start()
+        with TopicAccumulator(max_topics=max_topics, spill_dir=spill_dir) as accumulator:
+            for topics, sentiment, engagement, pain in synthetic_posts(posts):
+                accumulator.add(topics, sentiment, engagement, pain, [], [])
+            results['kept_topics'] = len(accumulator)
+            merged = topic_keys.merge_sorted_variants(accumulator.items(key=topic_keys.canonical_key))
+            results['compact_topics'] = _write_topics(merged, os.path.join(out, 'compact.db'))
+            results['compact_mb'] = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure topic aggregation and write memory per N posts')
+    parser.add_argument('--posts', type=int, default=100000, help='Synthetic posts to aggregate (default: 100000)')
+    parser.add_argument('--max-topics', type=int, default=None, help='Cap on topics held in memory')
+    parser.add_argument('--spill-dir', default=None, help='Spill evicted topics to a temporary file in this directory')
+    args = parser.parse_args()
+
+    results = benchmark(args.posts, args.max_topics, args.spill_dir)
+    print(f"{args.posts} posts")
+    print(f"  nested dicts:     {results['legacy_mb']:8.1f} MB peak, {results['legacy_topics']} topics written")
+    print(f"  TopicAccumulator: {results['compact_mb']:8.1f} MB peak, {results['compact_topics']} topics written, "
+          f"{results['kept_topics']} held in memory")
+
+
+if __name__ == "__main__":
+    main()
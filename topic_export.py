@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+import argparse
+import csv
+import io
+import json
+import os
+import sqlite3
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+KINDS = ['topics', 'pain_points', 'solution_requests', 'app_ideas']
+FORMATS = ['ndjson', 'csv']
+
+TOPIC_COLUMNS = [
+    'id', 'name', 'category', 'mention_count', 'growth_percentage', 'pain_points',
+    'solution_requests', 'app_ideas', 'trend_data', 'sentiment_scores', 'topic_clusters',
+    'engagement_metrics', 'opportunity_scores', 'average_budget', 'created_at', 'updated_at'
+]
+
+JSON_COLUMNS = {
+    'pain_points', 'solution_requests', 'app_ideas', 'trend_data', 'sentiment_scores',
+    'topic_clusters', 'engagement_metrics', 'opportunity_scores'
+}
+
+PHRASE_COLUMNS = ['topic_id', 'topic_name', 'category', 'updated_at', 'text', 'count']
+
+# Extra per-kind fields kept in CSV output (NDJSON keeps every field)
+PHRASE_EXTRA_COLUMNS = {
+    'pain_points': ['frustration_score'],
+    'solution_requests': [],
+    'app_ideas': ['title', 'description'],
+}
+
+
+def columns_for(kind: str) -> List[str]:
+    if kind == 'topics':
+        return list(TOPIC_COLUMNS)
+    return PHRASE_COLUMNS + PHRASE_EXTRA_COLUMNS[kind]
+
+
+def parse_since(value: Optional[str]) -> Optional[str]:
+    """Validate an ISO date/time and return it in the 'YYYY-MM-DD HH:MM:SS' UTC form of updated_at.
+
+    Raises ValueError for anything else; SQLite's datetime() would turn it
+    into NULL and silently filter out every row.
+    """
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed.isoformat(sep=' ', timespec='seconds')
+
+
+def _filters(category: Optional[str], updated_since: Optional[str], alias: str = ''):
+    where, params = [], []
+    if category:
+        where.append(f"{alias}category = ?")
+        params.append(category)
+    if updated_since:
+        # Normalizes both 'YYYY-MM-DD HH:MM:SS' and ISO 'T' timestamps
+        where.append(f"datetime({alias}updated_at) >= datetime(?)")
+        params.append(updated_since)
+    return where, params
+
+
+def iter_records(conn, kind: str, category: Optional[str] = None,
+                 updated_since: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Yield export records one at a time straight from the SQLite cursor"""
+    if kind not in KINDS:
+        raise ValueError(f"Unknown export kind: {kind}")
+    updated_since = parse_since(updated_since)
+
+    if kind == 'topics':
+        where, params = _filters(category, updated_since)
+        query = f"SELECT {', '.join(TOPIC_COLUMNS)} FROM reddit_topics"
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        query += " ORDER BY id"
+        for row in conn.execute(query, params):
+            record = dict(zip(TOPIC_COLUMNS, row))
+            for column in JSON_COLUMNS:
+                if record[column]:
+                    record[column] = json.loads(record[column])
+            yield record
+        return
+
+    # Phrase lists are flattened by SQLite so no topic's whole blob is held in Python.
+    # json_each already yields array order; ordering by j.key would force a temp B-tree.
+    where, params = _filters(category, updated_since, alias='t.')
+    where.insert(0, f"json_valid(t.{kind})")
+    query = f"""
+        SELECT t.id, t.name, t.category, t.updated_at, j.type, j.value
+        FROM reddit_topics t, json_each(t.{kind}) j
+        WHERE {' AND '.join(where)}
+        ORDER BY t.id
+    """
+    for topic_id, name, topic_category, updated_at, value_type, value in conn.execute(query, params):
+        # Objects come back as JSON text; strings and numbers are bare phrases
+        item = json.loads(value) if value_type == 'object' else {'text': value}
+        record = {
+            'topic_id': topic_id,
+            'topic_name': name,
+            'category': topic_category,
+            'updated_at': updated_at
+        }
+        record.update(item)
+        yield record
+
+
+def ndjson_lines(records: Iterator[Dict[str, Any]]) -> Iterator[str]:
+    for record in records:
+        yield json.dumps(record) + '\n'
+
+
+def csv_lines(records: Iterator[Dict[str, Any]], columns: List[str]) -> Iterator[str]:
+    """Encode records as CSV one line at a time; nested values become JSON strings"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction='ignore')
+    writer.writeheader()
+    for record in records:
+        writer.writerow({
+            key: json.dumps(value) if isinstance(value, (dict, list)) else value
+            for key, value in record.items()
+        })
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def export_lines(conn, kind: str, fmt: str = 'ndjson', category: Optional[str] = None,
+                 updated_since: Optional[str] = None) -> Iterator[str]:
+    """Stream an export as text lines in the requested format"""
+    if kind not in KINDS:
+        raise ValueError(f"Unknown export kind: {kind}")
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    records = iter_records(conn, kind, category, updated_since)
+    if fmt == 'csv':
+        return csv_lines(records, columns_for(kind))
+    return ndjson_lines(records)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export topics and extracted phrases as NDJSON or CSV')
+    parser.add_argument('kind', choices=KINDS, help='What to export')
+    parser.add_argument('--format', choices=FORMATS, default='ndjson', help='Output format (default: ndjson)')
+    parser.add_argument('--category', help='Only export topics in this category')
+    parser.add_argument('--since', type=parse_since, help='Only export topics updated at or after this date/time')
+    parser.add_argument('--db', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'ideaengine.db'),
+                        help='Path to the SQLite database')
+    parser.add_argument('-o', '--output', help='Output file (default: stdout)')
+
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    out = open(args.output, 'w', newline='') if args.output else sys.stdout
+    try:
+        for line in export_lines(conn, args.kind, args.format, args.category, args.since):
+            out.write(line)
+    finally:
+        if args.output:
+            out.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+#!/usr/bin/env python
+"""Canonical keys that merge near-duplicate topic names.
+
+"project management tool", "Project Management Software" and "the project
+management apps" are one topic. ``canonical_key`` reduces a name to its
+last few content words, singularized, with stopwords, generic adjectives
+and trailing product nouns (app, tool, software, ...) removed: all three
+become "project management".
+
+``topic_aliases`` maps every name seen to the reddit_topics row of its
+key, so the crawler finds a topic by alias or key instead of exact name.
+Run this module with ``--compact`` to merge duplicate rows written before
+the alias table existed.
+"""
+import argparse
+import itertools
+import json
+import logging
+import re
+import sqlite3
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+ALIASES_TABLE = """
+    CREATE TABLE IF NOT EXISTS topic_aliases (
+        alias TEXT PRIMARY KEY,
+        key TEXT NOT NULL,
+        topic_id INTEGER NOT NULL
+    )
+"""
+
+ALIASES_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_topic_aliases_key ON topic_aliases(key)",
+    "CREATE INDEX IF NOT EXISTS idx_topic_aliases_topic ON topic_aliases(topic_id)"
+]
+
+# Nouns naming the kind of product rather than what it does
+PRODUCT_NOUNS = {
+    'app', 'application', 'platform', 'software', 'tool', 'solution', 'system',
+    'service', 'program', 'suite', 'product', 'website', 'site'
+}
+
+STOPWORDS = {
+    'a', 'an', 'the', 'i', 'me', 'my', 'we', 'our', 'you', 'your', 'he', 'she', 'it', 'its',
+    'they', 'them', 'their', 'this', 'that', 'these', 'those', 'is', 'are', 'was', 'were', 'be',
+    'been', 'being', 'have', 'has', 'had', 'do', 'does', 'did', 'and', 'or', 'but', 'if', 'of',
+    'at', 'by', 'for', 'with', 'about', 'to', 'from', 'in', 'on', 'into', 'as', 'so', 'any',
+    'some', 'all', 'just', 'very', 'can', 'could', 'would', 'should', 'will', 'use', 'using',
+    'need', 'want', 'looking', 'like', 'really', 'also', 'there', 'what', 'which', 'who', 'how'
+}
+
+# Modifiers that say nothing about what the product does (also dropped by noun_chunk_topics)
+GENERIC_MODIFIERS = {
+    'good', 'best', 'better', 'great', 'new', 'other', 'same', 'simple', 'easy', 'free',
+    'cheap', 'nice', 'cool', 'current', 'existing', 'different', 'many', 'several', 'own',
+    'old', 'whole', 'main', 'specific', 'similar', 'various', 'certain', 'single', 'only', 'real'
+}
+
+# Words ending in "s" that are not plurals
+SINGULAR_S = {'analytics', 'saas', 'news', 'business', 'series', 'status', 'access', 'process'}
+
+# Plurals the suffix rules get wrong
+IRREGULAR_PLURALS = {
+    'diagnoses': 'diagnosis', 'hypotheses': 'hypothesis', 'syntheses': 'synthesis',
+    'theses': 'thesis', 'crises': 'crisis',
+    'caches': 'cache', 'niches': 'niche', 'headaches': 'headache',
+    'indices': 'index', 'criteria': 'criterion', 'people': 'person', 'children': 'child'
+}
+
+MAX_KEY_WORDS = 3
+WORD_PATTERN = re.compile(r"[a-z0-9]+(?:'[a-z0-9]+)*")
+DATA_KINDS = ['pain_points', 'solution_requests', 'app_ideas']
+
+
+def singular(word: str) -> str:
+    """Cheap plural folding, enough for topic names ("tools", "companies", "classes", "analyses")
+
+    Deliberately rule based rather than spaCy's lemmatizer: keys are stored in
+    topic_aliases and must come out the same in every process, whether or not
+    a spaCy model is installed, and this runs once per topic in the merge sort.
+    """
+    if word in IRREGULAR_PLURALS:
+        return IRREGULAR_PLURALS[word]
+    if word in SINGULAR_S or len(word) <= 3:
+        return word
+    if word.endswith('yses'):
+        return word[:-2] + 'is'
+    if word.endswith('ies'):
+        return word[:-3] + 'y'
+    if word.endswith(('sses', 'shes', 'ches', 'xes')):
+        return word[:-2]
+    if word.endswith('s') and not word.endswith(('ss', 'us', 'is')):
+        return word[:-1]
+    return word
+
+
+def canonical_key(name: str) -> str:
+    """Normalized key shared by variants of a topic name"""
+    words = [singular(word) for word in WORD_PATTERN.findall(name.lower())]
+    words = [word for word in words if word not in STOPWORDS and word not in GENERIC_MODIFIERS]
+    # Collapse the head: "crm app", "crm tools" and "crm software" are all "crm"
+    head = None
+    while words and words[-1] in PRODUCT_NOUNS:
+        head = words.pop()
+    if not words:
+        return head or ' '.join(name.lower().split())
+    return ' '.join(words[-MAX_KEY_WORDS:])
+
+
+def merge_topic_data(target: Dict[str, Any], other: Dict[str, Any]):
+    """Fold one topic's aggregated data into another's, like TopicAccumulator does"""
+    target['mention_count'] = target.get('mention_count', 0) + other.get('mention_count', 0)
+    for key, value in other.get('engagement_metrics', {}).items():
+        target.setdefault('engagement_metrics', {})[key] = target['engagement_metrics'].get(key, 0) + value
+    for key, value in other.get('sentiment_scores', {}).items():
+        target.setdefault('sentiment_scores', {})[key] = max(target['sentiment_scores'].get(key, 0), value)
+    for kind in DATA_KINDS:
+        target[kind] = list(target.get(kind) or []) + list(other.get(kind) or [])
+
+
+def merge_sorted_variants(items: Iterable[Tuple[str, Dict[str, Any]]]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """merge_variants over (name, data) pairs already ordered by canonical key, one key at a time"""
+    for _, group in itertools.groupby(items, key=lambda item: canonical_key(item[0])):
+        variants = sorted(group, key=lambda variant: -variant[1]['mention_count'])
+        name, data = variants[0]
+        for _, other in variants[1:]:
+            merge_topic_data(data, other)
+        yield name, data
+
+
+def merge_variants(topics_data: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Merge the topics of one run that share a key under their most mentioned name"""
+    ordered = sorted(topics_data.items(), key=lambda item: canonical_key(item[0]))
+    return dict(merge_sorted_variants(ordered))
+
+
+def ensure_aliases(db):
+    """Create the alias table and its indexes (no-op once they exist; does not commit)"""
+    db.execute(ALIASES_TABLE)
+    for statement in ALIASES_INDEXES:
+        db.execute(statement)
+
+
+def add_alias(db, name: str, topic_id: int):
+    db.execute(
+        "INSERT OR REPLACE INTO topic_aliases (alias, key, topic_id) VALUES (?, ?, ?)",
+        (name, canonical_key(name), topic_id)
+    )
+
+
+def resolve(db, name: str) -> Optional[int]:
+    """The id of the topic ``name`` belongs to, recording it as an alias if it is new"""
+    row = db.execute("SELECT topic_id FROM topic_aliases WHERE alias = ?", (name,)).fetchone()
+    if row:
+        return row[0]
+
+    key = canonical_key(name)
+    row = db.execute("SELECT topic_id FROM topic_aliases WHERE key = ? LIMIT 1", (key,)).fetchone()
+    if row is None:
+        # Topics written before aliases existed are still found by exact name
+        row = db.execute("SELECT id FROM reddit_topics WHERE name = ? LIMIT 1", (name,)).fetchone()
+    if row is None:
+        return None
+    add_alias(db, name, row[0])
+    return row[0]
+
+
+def aliases(db, topic_id: int) -> List[str]:
+    """Every name recorded for a topic"""
+    return [row[0] for row in db.execute(
+        "SELECT alias FROM topic_aliases WHERE topic_id = ? ORDER BY alias", (topic_id,))]
+
+
+def _load_json(value, default):
+    try:
+        return json.loads(value) if value else default
+    except (TypeError, ValueError):
+        return default
+
+
+def compact(db, dry_run: bool = False) -> Dict[str, int]:
+    """Merge reddit_topics rows whose names share a canonical key into the most mentioned one.
+
+    Counts, engagement and phrase lists are combined, every merged name
+    becomes an alias of the surviving row, and the other rows are deleted,
+    all in one transaction.
+    """
+    ensure_aliases(db)
+    db.commit()
+    groups = {}
+    for topic_id, name, mentions in db.execute("SELECT id, name, mention_count FROM reddit_topics"):
+        groups.setdefault(canonical_key(name), []).append((topic_id, name, mentions or 0))
+    duplicates = {key: rows for key, rows in groups.items() if len(rows) > 1}
+    merged_rows = sum(len(rows) - 1 for rows in duplicates.values())
+    stats = {'topics': sum(len(rows) for rows in groups.values()), 'groups': len(duplicates),
+             'merged': merged_rows}
+    if dry_run:
+        return stats
+
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        for rows in groups.values():
+            rows.sort(key=lambda row: (-row[2], row[0]))
+            keep_id = rows[0][0]
+            for _, name, _ in rows:
+                add_alias(db, name, keep_id)
+            if len(rows) == 1:
+                continue
+
+            ids = [row[0] for row in rows]
+            records = {
+                row[0]: {
+                    'mention_count': row[1] or 0,
+                    'pain_points': _load_json(row[2], []),
+                    'solution_requests': _load_json(row[3], []),
+                    'app_ideas': _load_json(row[4], []),
+                    'sentiment_scores': _load_json(row[5], {}),
+                    'engagement_metrics': _load_json(row[6], {})
+                }
+                for row in db.execute(f"""
+                    SELECT id, mention_count, pain_points, solution_requests, app_ideas,
+                           sentiment_scores, engagement_metrics
+                    FROM reddit_topics WHERE id IN ({','.join('?' * len(ids))})
+                """, ids)
+            }
+            data = records[keep_id]
+            for other_id in ids[1:]:
+                merge_topic_data(data, records[other_id])
+            db.execute("""
+                UPDATE reddit_topics
+                SET mention_count = ?, pain_points = ?, solution_requests = ?, app_ideas = ?,
+                    sentiment_scores = ?, engagement_metrics = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            """, (
+                data['mention_count'],
+                json.dumps(data['pain_points']),
+                json.dumps(data['solution_requests']),
+                json.dumps(data['app_ideas']),
+                json.dumps(data['sentiment_scores']),
+                json.dumps(data['engagement_metrics']),
+                keep_id
+            ))
+            db.execute(f"DELETE FROM reddit_topics WHERE id IN ({','.join('?' * (len(ids) - 1))})", ids[1:])
+            db.execute(
+                f"UPDATE topic_aliases SET topic_id = ? WHERE topic_id IN ({','.join('?' * (len(ids) - 1))})",
+                [keep_id] + ids[1:]
+            )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    logging.info(f"Merged {merged_rows} duplicate topics into {len(duplicates)} canonical topics")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Merge near-duplicate topics under canonical keys')
+    parser.add_argument('--compact', action='store_true', help='Merge duplicate reddit_topics rows')
+    parser.add_argument('--dry-run', action='store_true', help='Only report what --compact would merge')
+    parser.add_argument('--db', default='data/ideaengine.db', help='Database path (default: data/ideaengine.db)')
+    args = parser.parse_args()
+
+    if not args.compact:
+        parser.print_help()
+        return
+    db = sqlite3.connect(args.db, timeout=30)
+    try:
+        stats = compact(db, dry_run=args.dry_run)
+    finally:
+        db.close()
+    action = 'Would merge' if args.dry_run else 'Merged'
+    print(f"{action} {stats['merged']} of {stats['topics']} topics into {stats['groups']} canonical topics")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+import base64
+import heapq
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+# Sort keys exposed by the listing API, each backed by an index on (key, id).
+# Missing values sort as -1e300, below any real one: a NULL in a cursor would
+# compare false against every row and end the listing early.
+SORT_KEYS = {
+    'mentions': 'COALESCE(mention_count, -1e300)',
+    'growth': 'COALESCE(growth_percentage, -1e300)',
+    'score': "COALESCE(json_extract(opportunity_scores, '$.total_score'), -1e300)",
+}
+
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_topics_mentions ON reddit_topics(COALESCE(mention_count, -1e300), id)",
+    "CREATE INDEX IF NOT EXISTS idx_topics_growth ON reddit_topics(COALESCE(growth_percentage, -1e300), id)",
+    "CREATE INDEX IF NOT EXISTS idx_topics_score "
+    "ON reddit_topics(COALESCE(json_extract(opportunity_scores, '$.total_score'), -1e300), id)",
+]
+
+JSON_FIELDS = {
+    'pain_points', 'solution_requests', 'app_ideas', 'trend_data', 'sentiment_scores',
+    'topic_clusters', 'engagement_metrics', 'opportunity_scores'
+}
+
+FIELDS = [
+    'id', 'name', 'category', 'mention_count', 'growth_percentage', 'pain_points',
+    'solution_requests', 'app_ideas', 'trend_data', 'sentiment_scores', 'topic_clusters',
+    'engagement_metrics', 'opportunity_scores', 'average_budget', 'created_at', 'updated_at'
+]
+
+DEFAULT_FIELDS = ['id', 'name', 'category', 'mention_count', 'growth_percentage', 'opportunity_scores']
+
+# Keys that can rank a top-K query without an index, read straight from the JSON columns
+TOP_K_KEYS = {
+    'pain_score': "json_extract(opportunity_scores, '$.pain_score')",
+    'market_score': "json_extract(opportunity_scores, '$.market_score')",
+    'engagement_score': "json_extract(opportunity_scores, '$.engagement_score')",
+    'urgency_score': "json_extract(opportunity_scores, '$.urgency_score')",
+    'upvotes': "json_extract(engagement_metrics, '$.upvotes')",
+    'unique_users': "json_extract(engagement_metrics, '$.unique_users')",
+    'frustration': "json_extract(sentiment_scores, '$.frustration')",
+}
+
+MAX_LIMIT = 500
+
+
+def ensure_indexes(conn):
+    """Create the sort-key indexes used by keyset pagination"""
+    for statement in INDEXES:
+        name = statement.split()[5]
+        row = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'index' AND name = ?", (name,)).fetchone()
+        # Indexes from before sort keys were coalesced no longer match the ORDER BY
+        if row and 'COALESCE' not in row[0]:
+            conn.execute(f"DROP INDEX {name}")
+        conn.execute(statement)
+    conn.commit()
+
+
+def encode_cursor(value: Any, topic_id: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps([value, topic_id]).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, int]:
+    try:
+        value, topic_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return value, int(topic_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def parse_fields(fields: Optional[str]) -> List[str]:
+    """Validate a comma-separated projection, always including the id"""
+    if not fields:
+        return list(DEFAULT_FIELDS)
+    requested = [f.strip() for f in fields.split(',') if f.strip()]
+    unknown = [f for f in requested if f not in FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return ['id'] + [f for f in requested if f != 'id']
+
+
+def _row_to_topic(row, fields: List[str]) -> Dict[str, Any]:
+    topic = {}
+    for field in fields:
+        value = row[field]
+        # Only projected JSON columns are parsed
+        if field in JSON_FIELDS and value is not None:
+            value = json.loads(value)
+        topic[field] = value
+    return topic
+
+
+def list_topics(conn, sort: str = 'score', order: str = 'desc', limit: int = 50,
+                cursor: Optional[str] = None, fields: Optional[List[str]] = None,
+                category: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Return one page of topics and the cursor for the next page.
+
+    Pages are selected by seeking past the (sort key, id) of the previous
+    page's last row, so every page costs an index range scan of ``limit``
+    rows no matter how deep into the listing it is.
+    """
+    if sort not in SORT_KEYS:
+        raise ValueError(f"Unknown sort key: {sort}")
+    if order not in ('asc', 'desc'):
+        raise ValueError("order must be 'asc' or 'desc'")
+    limit = max(1, min(MAX_LIMIT, int(limit)))
+    fields = fields or list(DEFAULT_FIELDS)
+
+    key = SORT_KEYS[sort]
+    columns = ', '.join(fields)
+    direction = 'DESC' if order == 'desc' else 'ASC'
+    comparison = '<' if order == 'desc' else '>'
+
+    where = []
+    params = []
+    if category:
+        where.append("category = ?")
+        params.append(category)
+    if cursor:
+        value, topic_id = decode_cursor(cursor)
+        # Spelled out rather than as a row value so SQLite seeks the expression index
+        where.append(f"{key} {comparison}= ? AND ({key} {comparison} ? OR id {comparison} ?)")
+        params.extend([value, value, topic_id])
+
+    query = f"SELECT {columns}, {key} AS sort_value FROM reddit_topics"
+    if where:
+        query += " WHERE " + " AND ".join(where)
+    query += f" ORDER BY {key} {direction}, id {direction} LIMIT ?"
+    params.append(limit + 1)
+
+    rows = conn.execute(query, params).fetchall()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]['sort_value'], rows[-1]['id'])
+    return [_row_to_topic(row, fields) for row in rows], next_cursor
+
+
+def top_topics(conn, k: int = 10, by: str = 'score', fields: Optional[List[str]] = None,
+               category: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Return the best ``k`` topics by ``by``.
+
+    Indexed keys are answered by the first page of the keyset listing. Other
+    keys are ranked with a bounded heap while streaming rows from the
+    cursor, so memory stays O(k) however large the table is.
+    """
+    k = max(1, min(MAX_LIMIT, int(k)))
+    if by in SORT_KEYS:
+        topics, _ = list_topics(conn, sort=by, limit=k, fields=fields, category=category)
+        return topics
+    if by not in TOP_K_KEYS:
+        raise ValueError(f"Unknown ranking key: {by}")
+
+    fields = fields or list(DEFAULT_FIELDS)
+    query = f"SELECT {', '.join(fields)}, {TOP_K_KEYS[by]} AS rank_value FROM reddit_topics"
+    params = []
+    if category:
+        query += " WHERE category = ?"
+        params.append(category)
+
+    rows = conn.execute(query, params)
+    best = heapq.nlargest(k, rows, key=lambda row: (row['rank_value'] or 0, row['id']))
+    return [_row_to_topic(row, fields) for row in best]